@@ -1,9 +1,78 @@
+import sys
+import numpy as np
 import pandas as pd
 from datetime import datetime
 from decimal import Decimal, ROUND_DOWN
 
+# 로그 레벨 (값이 클수록 많이 출력)
+LOG_QUIET = 0     # 출력 없음
+LOG_SUMMARY = 1   # 주기적인 상태 요약 (replay report_interval)
+LOG_TRADES = 2    # 체결마다 한 줄 + 신호 사유
+LOG_DEBUG = 3     # 전략(MACD_signal 등)이 출력하는 스텝별 메시지까지
+
+TRADE_COLUMNS = ["type", "price", "qty", "weight", "pnl", "reason", "stop_loss", "take_profit"]
+
+
+class TradeLog:
+    """
+    체결 기록을 컬럼별 numpy 배열에 저장 (체결마다 dict 를 만들지 않음).
+    type/reason 문자열은 한 번만 저장하고 정수 코드로 기록하며, 배열은 부족할 때 두 배로 늘림.
+    pnl/stop_loss/take_profit 의 None 은 NaN 으로 저장.
+    """
+    def __init__(self, capacity=1024):
+        self._size = 0
+        self._floats = np.empty((capacity, 5), dtype=np.float64)   # price, qty, pnl, stop_loss, take_profit
+        self._ints = np.empty((capacity, 3), dtype=np.int64)       # type 코드, weight, reason 코드
+        self._codes = {}
+        self._strings = []
+        self._frame = None
+
+    def _code(self, text):
+        code = self._codes.get(text)
+        if code is None:
+            code = self._codes[text] = len(self._strings)
+            self._strings.append(text)
+        return code
+
+    def append(self, trade_type, price, qty, weight, pnl, reason, stop_loss, take_profit):
+        if self._size == len(self._floats):
+            self._floats = np.concatenate([self._floats, np.empty_like(self._floats)])
+            self._ints = np.concatenate([self._ints, np.empty_like(self._ints)])
+        i = self._size
+        self._floats[i] = (price, qty,
+                           np.nan if pnl is None else pnl,
+                           np.nan if stop_loss is None else stop_loss,
+                           np.nan if take_profit is None else take_profit)
+        self._ints[i] = (self._code(trade_type), weight, self._code(reason))
+        self._size += 1
+        self._frame = None
+
+    def __len__(self):
+        return self._size
+
+    def to_frame(self):
+        """
+        기록 전체를 DataFrame 으로 (새 체결이 없으면 이전에 만든 DataFrame 재사용)
+        """
+        if self._frame is None:
+            floats = self._floats[:self._size]
+            ints = self._ints[:self._size]
+            strings = np.array(self._strings, dtype=object)
+            self._frame = pd.DataFrame({
+                "type": strings[ints[:, 0]],
+                "price": floats[:, 0],
+                "qty": floats[:, 1],
+                "weight": ints[:, 1],
+                "pnl": floats[:, 2],
+                "reason": strings[ints[:, 2]],
+                "stop_loss": floats[:, 3],
+                "take_profit": floats[:, 4],
+            }, columns=TRADE_COLUMNS)
+        return self._frame
+
+
 class BacktestEngine:
-    def __init__(self, initial_balance=1000, trading_fee=0.0004):
+    def __init__(self, initial_balance=1000, trading_fee=0.0004, log_level=LOG_TRADES, log_buffer=1000, log_file=None):
         self.initial_balance = initial_balance  # 초기 자본
         self.total_capital = initial_balance  
         self.balance = initial_balance  
@@ -12,7 +81,7 @@ class BacktestEngine:
         self.position = None  
         self.entry_price = None  
         self.current_weight = 0  
-        self.trade_history = []  
+        self.trade_history = TradeLog()
         self.trading_fee = trading_fee  
         self.total_holdings = 0  
         self.last_stop_loss_trend = None
@@ -21,6 +90,26 @@ class BacktestEngine:
         self.entry_stop_loss = None
         self.entry_take_profit = None
 
+        # 콘솔 출력: log_level 이하 메시지만 모아 두었다가 log_buffer 줄마다 한 번에 씀
+        self.log_level = log_level
+        self.log_buffer = log_buffer
+        self.log_file = log_file or sys.stdout
+        self._log_lines = []
+
+    def log(self, message, level=LOG_TRADES):
+        if level > self.log_level:
+            return
+        self._log_lines.append(message)
+        if len(self._log_lines) >= self.log_buffer:
+            self.flush_log()
+
+    def flush_log(self):
+        """모아 둔 로그를 출력 (백테스트 종료 시 호출)"""
+        if self._log_lines:
+            self.log_file.write("\n".join(self._log_lines) + "\n")
+            self.log_file.flush()
+            self._log_lines = []
+
     def get_total_value(self, current_price):
         """현재 모든 자산을 매도할 경우의 총 자산 반환"""
         estimated_value = self.balance + (self.total_holdings * current_price * (1 - self.trading_fee))
@@ -68,7 +157,8 @@ class BacktestEngine:
                 buy_amount = (self.total_capital * (trade_ratio - self.current_weight / 5)) / current_price
                 buy_amount = min(max_buy_amount, buy_amount)
                 if buy_amount < 0.00001:
-                    print(f"[{trade_type}] BUY SKIPPED (Insufficient balance) | Balance: {self.balance:.2f}")
+                    if self.log_level >= LOG_TRADES:
+                        self.log(f"[{trade_type}] BUY SKIPPED (Insufficient balance) | Balance: {self.balance:.2f}")
                     return
 
                 self.total_holdings += buy_amount
@@ -86,18 +176,11 @@ class BacktestEngine:
                 else:
                     self.entry_price = current_price
 
-                self.trade_history.append({
-                    "type": trade_type,
-                    "price": current_price,
-                    "qty": buy_amount,
-                    "weight": self.current_weight,
-                    "pnl": None,
-                    "reason": signal_info["reason"],
-                    "stop_loss": self.entry_stop_loss,
-                    "take_profit": self.entry_take_profit
-                })
-                print(f"[{trade_type}] BUY {buy_amount:.6f} at ${current_price:.2f} | weight: {self.current_weight} | holdings: {self.total_holdings:.6f} | balance: ${self.balance:.2f}")
-                print(signal_info["reason"])
+                self.trade_history.append(trade_type, current_price, buy_amount, self.current_weight, None,
+                                          signal_info["reason"], self.entry_stop_loss, self.entry_take_profit)
+                if self.log_level >= LOG_TRADES:
+                    self.log(f"[{trade_type}] BUY {buy_amount:.6f} at ${current_price:.2f} | weight: {self.current_weight} | holdings: {self.total_holdings:.6f} | balance: ${self.balance:.2f}")
+                    self.log(signal_info["reason"])
 
         elif signal == "sell" and self.entry_price is not None:
             if self.position == "long" and self.current_weight > 0 and signal_weight > 0:
@@ -111,18 +194,11 @@ class BacktestEngine:
                 self.balance += sell_amount * current_price * (1 - self.trading_fee)
                 self.current_weight -= sell_weight
 
-                self.trade_history.append({
-                    "type": trade_type,
-                    "price": current_price,
-                    "qty": sell_amount,
-                    "weight": self.current_weight,
-                    "pnl": profit,
-                    "reason": signal_info["reason"],
-                    "stop_loss": self.entry_stop_loss,
-                    "take_profit": self.entry_take_profit
-                })
-                print(f"[{trade_type}] SELL {sell_amount:.6f} at ${current_price:.2f} | profit: {profit:.2f}% | PnL: ${PnL:.2f} | weight: {signal_weight} | holdings: {self.total_holdings:.6f} | balance: ${self.balance:.2f}")
-                print(signal_info["reason"])
+                self.trade_history.append(trade_type, current_price, sell_amount, self.current_weight, profit,
+                                          signal_info["reason"], self.entry_stop_loss, self.entry_take_profit)
+                if self.log_level >= LOG_TRADES:
+                    self.log(f"[{trade_type}] SELL {sell_amount:.6f} at ${current_price:.2f} | profit: {profit:.2f}% | PnL: ${PnL:.2f} | weight: {signal_weight} | holdings: {self.total_holdings:.6f} | balance: ${self.balance:.2f}")
+                    self.log(signal_info["reason"])
                 # 포지션이 완전히 청산되면, 진입 시 손절/익절 값 초기화
                 if self.current_weight == 0:
                     self.position = None
@@ -137,8 +213,8 @@ class BacktestEngine:
         self.update_mdd(current_price)
 
     def get_trade_history(self):
-        df = pd.DataFrame(self.trade_history)
-        df["pnl"] = df["pnl"].fillna("-")  
+        df = self.trade_history.to_frame().copy()
+        df["pnl"] = df["pnl"].astype(object).where(df["pnl"].notna(), "-")
         return df
 
     def get_mdd(self):
@@ -5,54 +5,40 @@ import os
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, project_root)
 
+import contextlib
 from binance.client import Client
-from datetime import datetime, timedelta
+from datetime import timedelta
 from src.config import Config
 from src.strategy import Strategy
-from backtester.backtest_engine import BacktestEngine
-from backtester.data_loader import load_backtest_data, cal_indicator, update_data
-
-def backtester(start_date, end_date):
-    config = Config()
-    strategy = Strategy()
-    api_key = config.binance_access_key
-    api_secret = config.binance_secret_key
-    client = Client(api_key, api_secret)
-    engine = BacktestEngine(initial_balance=100000)
-    end_time = datetime.strptime(end_date, "%Y-%m-%d %H:%M:%S")
-
-    symbol = "BTC"
-
-    data_dict = {}
-
-    # 초기 데이터 저장
-    data_dict[symbol] = {}
-    for timeframe in ["1m", "5m", "1h"]:
-        data = load_backtest_data(client, symbol, timeframe, start_date, limit=300, futures=False)
-        data_dict[symbol][timeframe] = cal_indicator(data)
-
-    print("초기 데이터 저장 완료. 모의투자 진행")
-    current_time = datetime.strptime(start_date, "%Y-%m-%d %H:%M:%S")
-    last_print_time = current_time  # ✅ 마지막 출력 시간 (1시간마다 출력)
-
-    while current_time < end_time:
-        # 1m 업데이트
-        updated_data_1m = update_data(data_dict[symbol]["1m"], client, symbol, "1m", futures = False)
-        data_dict[symbol]["1m"] = cal_indicator(updated_data_1m)
-
-        # 가장 최근의 open_time 가져오기
-        last_open_time = updated_data_1m.iloc[-1]["Open Time"]
-        current_time = last_open_time  # 현재 시간 업데이트
-
-        # 5분 단위 업데이트 (예: 00:05, 00:10, 00:15 ...)
-        if last_open_time.minute % 5 == 0:
-            updated_data_5m = update_data(data_dict[symbol]["5m"], client, symbol, "5m", futures = False)
-            data_dict[symbol]["5m"] = cal_indicator(updated_data_5m)
-
-        # 1시간 단위 업데이트 (예: 01:00, 02:00 ...)
-        if last_open_time.minute == 0:
-            updated_data_1h = update_data(data_dict[symbol]["1h"], client, symbol, "1h", futures = False)
-            data_dict[symbol]["1h"] = cal_indicator(updated_data_1h)
+from backtester.backtest_engine import BacktestEngine, LOG_SUMMARY, LOG_DEBUG
+from backtester.kline_archive import KlineArchive
+from backtester.replay_feed import ReplayFeed
+from backtester.vectorized import vectorized_backtest
+from src import indicator_registry
+
+def replay(feed, strategy, engine, symbol="BTC", report_interval=timedelta(hours=12)):
+    """
+    feed(ReplayFeed)의 1분봉 스텝마다 전략 신호를 계산해 engine 에 체결.
+    report_interval 마다 현재 상태를 출력 (None이면 출력하지 않음, 파라미터 스윕 등)
+    출력은 engine.log_level 을 따름: 상태 요약은 LOG_SUMMARY 이상, 전략의 스텝별 print 는 LOG_DEBUG 일 때만
+    """
+    with contextlib.ExitStack() as stack:
+        if engine.log_level < LOG_DEBUG:
+            devnull = stack.enter_context(open(os.devnull, "w"))
+            stack.enter_context(contextlib.redirect_stdout(devnull))
+        _replay(feed, strategy, engine, symbol, report_interval)
+    engine.flush_log()
+    return engine
+
+
+def _replay(feed, strategy, engine, symbol, report_interval):
+    if engine.log_level < LOG_SUMMARY:
+        report_interval = None
+    last_print_time = None
+
+    for current_time, data_dict in feed:
+        if last_print_time is None:
+            last_print_time = current_time  # ✅ 마지막 출력 시간
 
         # 데이터 정제
         account_info = {
@@ -61,26 +47,52 @@ def backtester(start_date, end_date):
         "holdings": engine.total_holdings
         }
 
-        signal_info = strategy.signal(data_dict[symbol], False, account_info)
+        signal_info = strategy.signal(data_dict, False, account_info)
         engine.execute_trade(signal_info["signal"], signal_info)
 
-        # ✅ 1시간마다 현재 상태 출력
-        if current_time >= last_print_time + timedelta(hours=12):
+        # ✅ report_interval 마다 현재 상태 출력
+        if report_interval is not None and current_time >= last_print_time + report_interval:
             total_value = engine.get_total_value(signal_info["current_price"])  # 평가 자산
             mdd = engine.get_mdd()  # 최대 손실율
-            print("=" * 50)
-            print(f"[{current_time.strftime('%Y-%m-%d %H:%M')}] 현재 상태")
-            print(f"잔고: ${engine.balance:.2f}")
-            print(f"총 평가 자산 (보유 코인 포함): ${total_value:.2f}")
-            print(f"최대 손실율 (MDD): {mdd:.2f}%")
-            print(f"보유 코인: {engine.total_holdings:.6f} BTC")
+            engine.log("=" * 50, LOG_SUMMARY)
+            engine.log(f"[{current_time.strftime('%Y-%m-%d %H:%M')}] 현재 상태", LOG_SUMMARY)
+            engine.log(f"잔고: ${engine.balance:.2f}", LOG_SUMMARY)
+            engine.log(f"총 평가 자산 (보유 코인 포함): ${total_value:.2f}", LOG_SUMMARY)
+            engine.log(f"최대 손실율 (MDD): {mdd:.2f}%", LOG_SUMMARY)
+            engine.log(f"보유 코인: {engine.total_holdings:.6f} {symbol}", LOG_SUMMARY)
             if engine.entry_price:
-                print(f"평균 진입 가격: ${engine.entry_price:.2f}")
-            print("=" * 50)
+                engine.log(f"평균 진입 가격: ${engine.entry_price:.2f}", LOG_SUMMARY)
+            engine.log("=" * 50, LOG_SUMMARY)
             last_print_time = current_time  # ✅ 출력 시간 갱신
 
         # print(f"현재 시간: {current_time} | 잔고: {engine.balance:.2f}")
 
+def backtester(start_date, end_date, archive=None, vectorized=False, log_level=LOG_SUMMARY):
+    config = Config()
+    strategy = Strategy()
+    api_key = config.binance_access_key
+    api_secret = config.binance_secret_key
+    client = Client(api_key, api_secret)
+    # 기본은 상태 요약만 출력 (체결마다 출력하려면 LOG_TRADES, 전략 메시지까지는 LOG_DEBUG)
+    engine = BacktestEngine(initial_balance=100000, log_level=log_level)
+    archive = archive or KlineArchive()
+
+    symbol = "BTC"
+
+    # 전략이 사용하는 지표만 계산, 유지 캔들 수는 지표 lookback 기준
+    indicators = strategy.required_indicators
+    window = indicator_registry.window_length(indicators, strategy.history_length)
+
+    # 로컬 아카이브에서 전체 기간 캔들을 읽어 1분봉 단위로 재생 (없는 구간만 API로 받아 저장)
+    feed = ReplayFeed(archive, symbol, start_date, end_date, indicators=indicators, window=window, client=client)
+
+    print("초기 데이터 저장 완료. 모의투자 진행")
+    if vectorized:
+        # 신호 조건을 배열로 한 번에 계산하고 체결만 루프로 시뮬레이션 (결과는 replay 와 같음)
+        engine = vectorized_backtest(feed, strategy.params, initial_balance=engine.initial_balance)
+    else:
+        replay(feed, strategy, engine, symbol)
+
     profit_ratio = ((engine.balance - engine.initial_balance) / engine.initial_balance) * 100
     print("백테스트 종료. 최종 잔고:", engine.balance, " 수익률: {:.2f}%".format(profit_ratio))
     print("최대 손실율 (MDD): {:.2f}%".format(engine.get_mdd()))
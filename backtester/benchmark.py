@@ -0,0 +1,428 @@
+"""
+백테스트 벤치마크 / 지표 동등성 검사.
+
+지표(Data_Control.cal_*)나 BacktestEngine 을 빠르게 고칠 때 결과 숫자가 조용히 바뀌지 않았는지,
+실제로 빨라졌는지를 같은 데이터로 확인하기 위한 스크립트. (API 키/네트워크 필요 없음)
+
+  - 데이터: 변동성 국면이 바뀌는 GBM(기하 브라운 운동) 합성 1분봉 (synthetic_klines, seed 고정이면 항상 같은 값)
+  - 시간 측정: 지표 함수별, cal_indicator(기본/전체 지표), 스트리밍 지표(IndicatorState),
+              Strategy.signal(호출당), 전체 백테스트(replay / vectorized_backtest)
+  - 동등성 검사 (허용 오차: RTOL / ATOL)
+      지표 벡터화 버전(src/indicators.py) vs 기존 행 단위 함수(Data_Control(vectorized=False))
+      스트리밍 지표(IndicatorState) vs 일괄 계산
+      vectorized_backtest vs replay (거래 내역 완전 일치)
+  - 결과는 JSON 으로 저장하고(--output), 이전 결과(--compare)와 비교해 threshold 배 이상 느려진 항목을 표시.
+    동등성 실패나 느려진 항목이 있으면 종료 코드 1
+
+사용 예:
+    python backtester/benchmark.py --rows 100000 --output benchmark_baseline.json
+    python backtester/benchmark.py --rows 100000 --compare benchmark_baseline.json
+    python backtester/benchmark.py --check-only --check-rows 3000
+"""
+
+import sys
+import os
+
+# 프로젝트 루트 디렉토리의 절대 경로를 구함
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+import argparse
+import contextlib
+import itertools
+import json
+import platform
+import shutil
+import subprocess
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from src import indicator_registry
+from src.data_control import Data_Control
+from src.indicator_state import IndicatorState, INDICATOR_STATES
+from src.strategy import Strategy
+from backtester.backtest_engine import BacktestEngine, LOG_QUIET
+from backtester.backtester import replay
+from backtester.kline_archive import KlineArchive, interval_ms, to_ms, to_frame
+from backtester.replay_feed import ReplayFeed
+from backtester.vectorized import vectorized_backtest
+
+# 봉당 로그 수익률 표준편차 (저변동 / 보통 / 고변동 국면)
+DEFAULT_REGIMES = (0.0005, 0.0012, 0.003)
+
+# 동등성 허용 오차: |fast - reference| <= ATOL + RTOL * |reference|, NaN 위치는 같아야 함
+RTOL = 1e-9
+ATOL = 1e-9
+
+# 이 시간(초)보다 짧은 항목은 측정 잡음이 커서 느려짐 판정에서 제외
+MIN_COMPARE_SECONDS = 0.005
+
+BENCH_SYMBOL = "BENCH"
+
+# 백테스트 동등성 검사용 전략 파라미터.
+# 기본 설정(추세 분기 비활성)은 거래가 0건이라 두 백테스트를 비교해도 검사되는 것이 없으므로 추세 분기를 켬
+BACKTEST_PARAMS = {"trend_enabled": True}
+
+
+def synthetic_klines(rows, seed=0, start="2024-01-01", interval="1m", price=30000.0, drift=0.0,
+                     regimes=DEFAULT_REGIMES, regime_length=1440):
+    """
+    GBM 합성 캔들 {컬럼: 배열} (KlineArchive 와 같은 컬럼).
+    변동성은 평균 regime_length 봉마다 regimes 중 하나로 무작위 전환되고, 거래량은 변동성에 비례.
+    """
+    rng = np.random.default_rng(seed)
+    step = interval_ms(interval)
+
+    # 변동성 국면: 전환 시점마다 새 국면을 뽑고 다음 전환까지 유지
+    switches = rng.random(rows) < 1 / regime_length
+    switches[0] = True
+    last_switch = np.maximum.accumulate(np.where(switches, np.arange(rows), 0))
+    sigma = np.asarray(regimes, dtype=float)[rng.integers(len(regimes), size=rows)][last_switch]
+
+    log_returns = (drift - sigma ** 2 / 2) + sigma * rng.standard_normal(rows)
+    close = price * np.exp(np.cumsum(log_returns))
+    open_ = np.concatenate(([price], close[:-1]))
+    high = np.maximum(open_, close) * np.exp(sigma * np.abs(rng.standard_normal(rows)) / 2)
+    low = np.minimum(open_, close) * np.exp(-sigma * np.abs(rng.standard_normal(rows)) / 2)
+    volume = rng.lognormal(np.log(10), 0.5, rows) * (sigma / regimes[0])
+    taker_buy = volume * rng.uniform(0.3, 0.7, rows)
+
+    return {
+        "open_time": to_ms(start) // step * step + np.arange(rows, dtype=np.int64) * step,
+        "open": open_,
+        "high": high,
+        "low": low,
+        "close": close,
+        "volume": volume,
+        "quote_volume": volume * close,
+        "trades": (volume * 50).astype(np.int64) + 1,
+        "taker_buy_base": taker_buy,
+        "taker_buy_quote": taker_buy * close,
+    }
+
+
+def _best_time(func, make_args=tuple, repeat=3):
+    # make_args() 로 매번 새 입력을 만들고(시간 제외) 가장 빠른 실행 시간(초) 반환
+    best = None
+    for _ in range(repeat):
+        args = make_args()
+        started = time.perf_counter()
+        func(*args)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _timing(seconds, calls=1):
+    return {"seconds": seconds, "calls": calls, "per_call_us": seconds / calls * 1e6}
+
+
+def _without(frame, columns):
+    return frame.drop(columns=[col for col in columns if col in frame.columns])
+
+
+def _dependency_frame(data_control, frame, spec):
+    # spec 이 입력으로 쓰는 의존 지표까지 계산된 DataFrame (spec 출력 컬럼은 없음)
+    base = frame.copy()
+    if spec.depends:
+        base = indicator_registry.compute(data_control, base, spec.depends)
+    return _without(base, spec.outputs)
+
+
+# -------------------------
+#     시간 측정
+# -------------------------
+def bench_indicators(frame, repeat=3):
+    """
+    지표 함수별 / cal_indicator / 스트리밍 지표 시간
+    """
+    data_control = Data_Control(vectorized=True)
+    timings = {}
+    for spec in indicator_registry.resolve(indicator_registry.ALL_INDICATORS):
+        base = _dependency_frame(data_control, frame, spec)
+        method = getattr(data_control, spec.method)
+        timings[f"indicator.{spec.name}"] = _timing(
+            _best_time(lambda df: method(df, **spec.params), lambda: (base.copy(),), repeat), len(frame))
+
+    for label, names in (("default", indicator_registry.DEFAULT_INDICATORS),
+                         ("all", indicator_registry.ALL_INDICATORS)):
+        timings[f"cal_indicator.{label}"] = _timing(
+            _best_time(lambda df: data_control.cal_indicator(df, names), lambda: (frame.copy(),), repeat), len(frame))
+
+    streaming = [name for name in indicator_registry.ALL_INDICATORS if name in INDICATOR_STATES]
+    timings["streaming.seed"] = _timing(
+        _best_time(lambda df: IndicatorState(streaming).seed(df), lambda: (frame,), repeat), len(frame))
+    return timings
+
+
+def build_feed(arrays, archive_dir, strategy, interval="1m"):
+    """
+    합성 캔들을 임시 아카이브에 저장하고, 지표 warmup 이 끝난 시점부터 마지막 캔들까지 재생하는 ReplayFeed
+    """
+    archive = KlineArchive(archive_dir)
+    archive.store(BENCH_SYMBOL, interval, arrays)
+    indicators = strategy.required_indicators
+    window = indicator_registry.window_length(indicators, strategy.history_length)
+    timeframes = ("1m", "5m", "1h")
+    warmup_ms = (window + indicator_registry.warmup_length(indicators)) * max(interval_ms(tf) for tf in timeframes)
+    start_ms = int(arrays["open_time"][0]) + warmup_ms
+    end_ms = int(arrays["open_time"][-1]) + interval_ms(interval)
+    if start_ms >= end_ms:
+        raise ValueError(f"캔들 수가 지표 warmup({warmup_ms // interval_ms(interval)}봉)보다 적습니다.")
+    return ReplayFeed(archive, BENCH_SYMBOL, start_ms, end_ms, indicators=indicators, window=window,
+                      timeframes=timeframes)
+
+
+def bench_strategy(feed, steps=2000, repeat=3):
+    """
+    Strategy.signal 호출당 시간 (data_dict 만들기는 제외)
+    """
+    strategy = Strategy()
+    data_dicts = [data_dict for _, data_dict in itertools.islice(feed, steps)]
+    account_info = {"position": None, "entry_price": None, "holdings": 0}
+
+    def run():
+        for data_dict in data_dicts:
+            strategy.signal(data_dict, False, account_info)
+
+    # MACD_signal 의 스텝별 print 는 측정에서 제외
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        seconds = _best_time(run, repeat=repeat)
+    return {"strategy.signal": _timing(seconds, len(data_dicts))}
+
+
+def bench_backtest(feed, initial_balance=100000, repeat=1):
+    """
+    전체 백테스트 시간 (replay / vectorized_backtest). 마지막 실행의 엔진도 함께 반환.
+    실제로 거래가 일어나도록 추세 분기를 켜고(BACKTEST_PARAMS) 실행
+    """
+    engines = {}
+
+    def run_replay():
+        engines["replay"] = replay(feed, Strategy(BACKTEST_PARAMS), BacktestEngine(initial_balance, log_level=LOG_QUIET),
+                                   feed.symbol, report_interval=None)
+
+    def run_vectorized():
+        engines["vectorized"] = vectorized_backtest(feed, BACKTEST_PARAMS, initial_balance=initial_balance)
+
+    timings = {
+        "backtest.replay": _timing(_best_time(run_replay, repeat=repeat), len(feed)),
+        "backtest.vectorized": _timing(_best_time(run_vectorized, repeat=max(repeat, 3)), len(feed)),
+    }
+    return timings, engines
+
+
+# -------------------------
+#     동등성 검사
+# -------------------------
+def compare_columns(reference, candidate, columns, rtol=RTOL, atol=ATOL):
+    """
+    columns 별 {"max_abs_diff", "ok"}. NaN 위치가 다르거나 허용 오차를 넘으면 ok=False
+    """
+    result = {}
+    for col in columns:
+        ref = pd.to_numeric(reference[col], errors="coerce").to_numpy(dtype=float)
+        new = pd.to_numeric(candidate[col], errors="coerce").to_numpy(dtype=float)
+        same_nan = bool((np.isnan(ref) == np.isnan(new)).all())
+        valid = ~np.isnan(ref) & ~np.isnan(new)
+        diff = np.abs(ref[valid] - new[valid])
+        result[col] = {
+            "max_abs_diff": float(diff.max()) if len(diff) else 0.0,
+            "ok": same_nan and bool(np.all(diff <= atol + rtol * np.abs(ref[valid]))),
+        }
+    return result
+
+
+def check_indicators(frame, rtol=RTOL, atol=ATOL):
+    """
+    벡터화 지표 vs 기존 행 단위 지표 (행 단위 함수는 느리므로 짧은 frame 사용)
+    """
+    fast = Data_Control(vectorized=True)
+    slow = Data_Control(vectorized=False)
+    results = {}
+    for spec in indicator_registry.resolve(indicator_registry.ALL_INDICATORS):
+        # 두 계산이 같은 입력에서 시작하도록 의존 지표는 기준(행 단위) 값으로 채움
+        base = _dependency_frame(slow, frame, spec)
+        reference = getattr(slow, spec.method)(base.copy(), **spec.params)
+        candidate = getattr(fast, spec.method)(base.copy(), **spec.params)
+        results[f"indicator.{spec.name}"] = compare_columns(reference, candidate, spec.outputs, rtol, atol)
+    return results
+
+
+def check_streaming(frame, rtol=RTOL, atol=ATOL):
+    """
+    스트리밍 지표(IndicatorState, 캔들 하나씩 update) vs 일괄 계산
+    """
+    data_control = Data_Control(vectorized=True)
+    results = {}
+    for name in INDICATOR_STATES:
+        spec = indicator_registry.INDICATORS[name]
+        reference = data_control.cal_indicator(frame.copy(), [name])
+        state = IndicatorState([name])
+        rows = []
+        for open_time, high, low, close in zip(frame["Open Time"], frame["High"].to_numpy(dtype=float),
+                                               frame["Low"].to_numpy(dtype=float), frame["Close"].to_numpy(dtype=float)):
+            rows.append(state.update({"Open Time": open_time, "High": high, "Low": low, "Close": close}))
+        candidate = pd.DataFrame(rows, columns=state.columns)
+        columns = [col for col in spec.outputs if col in candidate.columns]
+        results[f"streaming.{name}"] = compare_columns(reference, candidate, columns, rtol, atol)
+    return results
+
+
+def check_candle_store(frame, indicators=("sma", "bollinger"), rtol=RTOL, atol=ATOL):
+    """
+    링버퍼 저장소 + 배치 지표 계산(스트리밍 상태가 없는 지표) vs 처음부터 그 시점까지 일괄 계산한 마지막 창.
+    저장소가 한 바퀴 넘게 돌도록 capacity 보다 많은 캔들을 하나씩 반영하고, 매 스텝 창 전체를 비교
+    (지표 함수는 비어 있는 값만 채우므로, 이미 계산된 과거 행이 지워지면 NaN 위치가 달라져 실패)
+    """
+    data_control = Data_Control(indicators=indicators)
+    key = ("CHECK", "1m", False)
+    capacity = data_control.window_length
+    base_columns = ["Open", "High", "Low", "Close", "Volume",
+                    "Taker Buy Base Asset Volume", "Taker Sell Base Asset Volume"]
+    data_control.init_data(key, frame.iloc[:data_control.fetch_length].reset_index(drop=True))
+    store = data_control.candle_stores[key]
+    columns = [col for col in indicator_registry.output_columns(indicators) if col in store.col_index]
+
+    worst = {col: {"max_abs_diff": 0.0, "ok": True} for col in columns}
+    end = data_control.fetch_length
+    for _, row in frame.iloc[end:end + 2 * capacity + 10].iterrows():
+        end += 1
+        store.upsert(row["Open Time"], {col: float(row[col]) for col in base_columns})
+        candidate = data_control.update_indicator(key, store.frame())
+        reference = data_control.cal_indicator(frame.iloc[:end].copy()).iloc[-len(candidate):].reset_index(drop=True)
+        for col, result in compare_columns(reference, candidate, columns, rtol, atol).items():
+            worst[col]["max_abs_diff"] = max(worst[col]["max_abs_diff"], result["max_abs_diff"])
+            worst[col]["ok"] = worst[col]["ok"] and result["ok"]
+    return {"candle_store.batch": worst}
+
+
+def check_backtest(engines):
+    """
+    vectorized_backtest 와 replay 의 거래 내역/잔고/MDD 가 완전히 같은지. 거래가 0건이면 실패
+    """
+    reference, candidate = engines["replay"], engines["vectorized"]
+    ok = (len(reference.trade_history) > 0
+          and reference.get_trade_history().equals(candidate.get_trade_history())
+          and reference.balance == candidate.balance
+          and reference.total_holdings == candidate.total_holdings
+          and reference.max_drawdown == candidate.max_drawdown)
+    return {"backtest.vectorized": {"trades": {"max_abs_diff": 0.0 if ok else float("nan"), "ok": bool(ok),
+                                               "count": len(reference.trade_history)}}}
+
+
+def _failures(checks):
+    return [f"{name}.{col}" for name, columns in checks.items() for col, result in columns.items() if not result["ok"]]
+
+
+# -------------------------
+#     결과 저장 / 비교
+# -------------------------
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=project_root,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_results(results, baseline, threshold=1.25):
+    """
+    baseline(이전 결과) 대비 threshold 배 이상 느려진 항목 [(이름, 이전 초, 현재 초, 배율), ...]
+    """
+    regressions = []
+    for name, timing in results["timings"].items():
+        previous = baseline.get("timings", {}).get(name)
+        if previous is None or previous["seconds"] < MIN_COMPARE_SECONDS:
+            continue
+        ratio = timing["seconds"] / previous["seconds"]
+        print(f"{name:28s} {previous['seconds']:10.4f}s -> {timing['seconds']:10.4f}s  x{ratio:.2f}")
+        if ratio >= threshold:
+            regressions.append((name, previous["seconds"], timing["seconds"], ratio))
+    return regressions
+
+
+def run_benchmark(rows=100000, seed=0, check_rows=2000, signal_steps=2000, repeat=3, check_only=False):
+    """
+    벤치마크 + 동등성 검사 결과 dict ({"meta", "timings", "checks"})
+    """
+    results = {
+        "meta": {
+            "rows": rows, "seed": seed, "check_rows": check_rows, "regimes": list(DEFAULT_REGIMES),
+            "rtol": RTOL, "atol": ATOL, "commit": _git_commit(),
+            "python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+            "platform": platform.platform(), "created": pd.Timestamp.now().isoformat(timespec="seconds"),
+        },
+        "timings": {},
+        "checks": {},
+    }
+
+    small = to_frame(synthetic_klines(check_rows, seed=seed))
+    results["checks"].update(check_indicators(small))
+    results["checks"].update(check_streaming(small))
+    results["checks"].update(check_candle_store(small))
+    if check_only:
+        return results
+
+    arrays = synthetic_klines(rows, seed=seed)
+    frame = to_frame(arrays)
+    results["timings"].update(bench_indicators(frame, repeat))
+
+    archive_dir = tempfile.mkdtemp(prefix="benchmark_")
+    try:
+        feed = build_feed(arrays, archive_dir, Strategy())
+        results["meta"]["backtest_steps"] = len(feed)
+        results["timings"].update(bench_strategy(feed, signal_steps, repeat))
+        timings, engines = bench_backtest(feed)
+        results["timings"].update(timings)
+        results["checks"].update(check_backtest(engines))
+    finally:
+        shutil.rmtree(archive_dir, ignore_errors=True)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="백테스트 벤치마크 / 지표 동등성 검사")
+    parser.add_argument("--rows", type=int, default=100000, help="시간 측정용 합성 1분봉 수")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--check-rows", type=int, default=2000, help="행 단위 함수와 비교할 캔들 수")
+    parser.add_argument("--signal-steps", type=int, default=2000, help="Strategy.signal 측정 호출 수")
+    parser.add_argument("--repeat", type=int, default=3, help="반복 측정 횟수 (가장 빠른 값 사용)")
+    parser.add_argument("--check-only", action="store_true", help="동등성 검사만 실행")
+    parser.add_argument("--output", default=None, help="결과 JSON 저장 경로 (기준선)")
+    parser.add_argument("--compare", default=None, help="비교할 이전 결과 JSON")
+    parser.add_argument("--threshold", type=float, default=1.25, help="이 배율 이상 느려지면 실패")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.rows, args.seed, args.check_rows, args.signal_steps, args.repeat, args.check_only)
+
+    for name, timing in results["timings"].items():
+        print(f"{name:28s} {timing['seconds']:10.4f}s  ({timing['per_call_us']:.2f}us x {timing['calls']})")
+    failures = _failures(results["checks"])
+    for name, columns in results["checks"].items():
+        worst = max(result["max_abs_diff"] for result in columns.values()) if columns else 0.0
+        status = "OK" if all(result["ok"] for result in columns.values()) else "FAIL"
+        counts = [result["count"] for result in columns.values() if "count" in result]
+        suffix = f"  (거래 {counts[0]}건)" if counts else ""
+        print(f"[{status}] {name:28s} max |diff| = {worst:.3g}{suffix}")
+
+    regressions = []
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline, args.threshold)
+        for name, previous, current, ratio in regressions:
+            print(f"⚠️ {name}: {previous:.4f}s -> {current:.4f}s (x{ratio:.2f})")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"📁 벤치마크 결과 저장 완료: {args.output}")
+
+    if failures:
+        print(f"❌ 허용 오차(rtol={RTOL}, atol={ATOL})를 넘은 항목: {', '.join(failures)}")
+    if failures or regressions:
+        sys.exit(1)
@@ -11,6 +11,7 @@ from binance.client import Client
 
 from src.config import Config
 from src.data_control import Data_Control
+from src import indicator_registry
 
 def timeframe_to_timedelta(timeframe):
     """
@@ -29,7 +30,7 @@ def timeframe_to_timedelta(timeframe):
     else:
         raise ValueError("지원하지 않는 timeframe 단위: " + timeframe)
 
-def load_backtest_data(client, symbol, timeframe, end_date, limit=300, futures=False):
+def load_backtest_data(client, symbol, timeframe, end_date, limit=300, futures=False, archive=None):
     """
     주어진 end_date(예: "2023-01-01 00:00:00")까지의 데이터 limit 개의 캔들 데이터를 로딩하여 DataFrame으로 반환.
     
@@ -40,9 +41,19 @@ def load_backtest_data(client, symbol, timeframe, end_date, limit=300, futures=F
     end_date  : 백테스트 시작 시점(해당 시점까지의 데이터 로딩)
     limit     : 불러올 캔들 수 (기본 300)
     futures   : 선물 여부 (기본 False)
+    archive   : KlineArchive (주면 로컬 아카이브에서 읽고, 없는 구간만 API로 받아 저장)
     """
-    symbol = f"{symbol}USDT"
     end_dt = datetime.strptime(end_date, "%Y-%m-%d %H:%M:%S")
+
+    if archive is not None:
+        start_dt = end_dt - timeframe_to_timedelta(timeframe) * limit
+        # end_date 캔들까지 포함 (기존 API 조회와 같은 범위)
+        end_dt = end_dt + timeframe_to_timedelta(timeframe)
+        archive.download(client, symbol, timeframe, start_dt, end_dt, futures=futures)
+        df = archive.load_frame(symbol, timeframe, start_dt, end_dt, futures=futures)
+        return df.iloc[-limit:].reset_index(drop=True)
+
+    symbol = f"{symbol}USDT"
     
     if futures:
         # 선물의 경우 endTime 매개변수와 limit을 사용해 end_date 이전 limit 캔들 로딩
@@ -85,28 +96,28 @@ def load_backtest_data(client, symbol, timeframe, end_date, limit=300, futures=F
     
     return df
 
-def cal_indicator(data):
-    data_control = Data_Control()
+def cal_indicator(data, indicators=indicator_registry.ALL_INDICATORS, window=None):
+    """
+    indicators 에 해당하는 지표(와 의존 지표)만 계산한 뒤 NaN 행을 제거하고 마지막 window 개만 유지.
+    백테스트에서는 전략의 required_indicators 를 넘겨 필요한 지표만 계산함.
+    window 기본값은 지표 lookback 기준 window_length.
+    """
+    data_control = Data_Control(indicators=indicators)
     # 기술적 지표 계산
-    data = data_control.cal_moving_average(data)
-    data = data_control.cal_rsi(data)
-    data = data_control.cal_bollinger_band(data)
-    data = data_control.cal_obv(data)
-    data = data_control.LT_trand_check(data)
-    data = data_control.cal_atr(data)
-    data = data_control.cal_macd(data)
-    data = data_control.cal_adx(data)
+    data = data_control.cal_indicator(data)
 
     data = data.dropna()
 
-    if len(data) > 140:
-        data = data.iloc[-140:].reset_index(drop=True)
+    if window is None:
+        window = data_control.window_length
+    if len(data) > window:
+        data = data.iloc[-window:].reset_index(drop=True)
 
     return data
 
 def update_data(existing_df, client, symbol, timeframe, futures=False):
     """
-    기존 데이터를 기반으로 마지막 캔들의 open_time 이후 5분 후의 캔들을 불러와 병합함.
+    기존 데이터를 기반으로 마지막 캔들의 open_time 이후 한 캔들(timeframe) 뒤의 캔들을 불러와 병합함.
 
     매개변수:
     existing_df : 기존 DataFrame (칼럼: "Open Time", "Open", "High", "Low", "Close", "Volume", "Taker Buy Base Asset Volume")
@@ -121,8 +132,8 @@ def update_data(existing_df, client, symbol, timeframe, futures=False):
     symbol = f"{symbol}USDT"
     # 마지막 캔들의 Open Time 가져오기
     last_open_time = existing_df.iloc[-1]["Open Time"]
-    # 새로운 데이터 시작 시각: 마지막 open_time + 5분
-    new_start_dt = last_open_time + timedelta(minutes=5)
+    # 새로운 데이터 시작 시각: 마지막 open_time + 캔들 간격
+    new_start_dt = last_open_time + timeframe_to_timedelta(timeframe)
     new_start_str = new_start_dt.strftime("%Y-%m-%d %H:%M:%S")
     
     # 새 캔들 데이터 로딩 (캔들 하나만 요청)
@@ -187,14 +198,16 @@ if __name__ == "__main__":
     for symbol in ticker_list:
         data_dict[symbol] = {}
         for timeframe in ["1m", "5m", "1h"]:
-            data = load_backtest_data(client, symbol, timeframe, end_date, limit=300, futures=False)
+            data = load_backtest_data(client, symbol, timeframe, end_date,
+                                      limit=indicator_registry.fetch_length(indicator_registry.ALL_INDICATORS), futures=False)
             data_dict[symbol][timeframe] = cal_indicator(data)
 
     if future_use:
         for symbol in future_ticker_list:
             future_data_dict[symbol] = {}
             for timeframe in ["1m", "5m", "1h"]:
-                data = load_backtest_data(client, symbol, timeframe, end_date, limit=300, futures=True)
+                data = load_backtest_data(client, symbol, timeframe, end_date,
+                                          limit=indicator_registry.fetch_length(indicator_registry.ALL_INDICATORS), futures=True)
                 future_data_dict[symbol][timeframe] = cal_indicator(data)
 
     print("데이터 로딩 완료:")
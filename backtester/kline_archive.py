@@ -0,0 +1,445 @@
+"""
+로컬 kline 아카이브.
+
+백테스트/웜스타트 때마다 바이낸스 API로 캔들을 다시 받지 않도록,
+현물/선물 kline 을 심볼/타임프레임/월 단위로 나눠 컬럼별 .npy 파일로 저장함.
+
+    <root>/<spot|futures>/<SYMBOL>/<interval>/<YYYY-MM>/open_time.npy, open.npy, ... , coverage.json
+
+  - .npy 는 np.load(mmap_mode="r") 로 메모리 매핑해서 읽으므로 몇 년치 1분봉도 디스크에서 바로 읽음
+  - coverage.json 에 실제로 다운로드를 마친 구간 [start, end) 을 기록해 두고,
+    다시 download() 하면 기록되지 않은 구간만 받음 (중간에 중단돼도 월 단위로 이어받기 가능)
+  - 한 달 안의 페이지(limit 개 캔들 단위)는 스레드 풀로 동시에 요청
+  - 거래소 점검 등으로 원래 캔들이 없는 구간은 coverage 안에 있어도 데이터가 비어 있으며 gaps()로 확인 가능
+  - store() 는 API 대신 이미 가진 캔들 배열(합성 데이터 등)을 같은 형식으로 저장
+  - 월 파티션은 임시 디렉토리에 통째로 쓴 뒤 교체하므로, 중간에 종료돼도 컬럼 길이가 어긋난 파티션이 보이지 않음
+
+사용 예:
+    python backtester/kline_archive.py BTC 1m 2024-01-01 2025-02-01
+    python backtester/kline_archive.py BTC 1m 2024-01-01 2025-02-01 --futures
+"""
+
+import sys
+import os
+
+# 프로젝트 루트 디렉토리의 절대 경로를 구함
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+import json
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+ARCHIVE_DIR = os.path.join(project_root, "data", "klines")
+
+# 저장하는 컬럼 (REST klines 응답 인덱스)
+COLUMNS = {
+    "open_time": 0,
+    "open": 1,
+    "high": 2,
+    "low": 3,
+    "close": 4,
+    "volume": 5,
+    "quote_volume": 7,
+    "trades": 8,
+    "taker_buy_base": 9,
+    "taker_buy_quote": 10,
+}
+
+# 요청 1회당 최대 캔들 수 (API 최대값)
+SPOT_LIMIT = 1000
+FUTURES_LIMIT = 1500
+
+_UNIT_MS = {"m": 60_000, "h": 3_600_000, "d": 86_400_000, "w": 604_800_000}
+
+# 주봉은 월요일 00:00(UTC) 기준 (1970-01-01 은 목요일이라 4일 밀어서 정렬)
+_WEEK_OFFSET_MS = 4 * 86_400_000
+
+# 리샘플링 시 구간 합계를 내는 컬럼 (나머지는 시가/고가/저가/종가 규칙)
+SUM_COLUMNS = ("volume", "quote_volume", "trades", "taker_buy_base", "taker_buy_quote")
+
+
+def interval_ms(interval):
+    """
+    "1m", "5m", "1h", "1d" 등을 밀리초로 변환
+    """
+    unit = interval[-1]
+    if unit not in _UNIT_MS:
+        raise ValueError("지원하지 않는 timeframe 단위: " + interval)
+    return int(interval[:-1]) * _UNIT_MS[unit]
+
+
+def to_ms(value):
+    """
+    "2024-01-01", "2024-01-01 00:00:00", datetime, Timestamp, ms(int) -> ms(int, UTC 기준)
+    """
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    return int(pd.Timestamp(value).value // 1_000_000)
+
+
+def resample(arrays, interval):
+    """
+    1분봉 등 하위 타임프레임 배열({컬럼: 배열}, open_time 오름차순)을 interval 캔들로 합침.
+    캔들 경계는 바이낸스와 같게 UTC 기준 (주봉은 월요일 시작).
+    open 은 구간 첫 값, close 는 마지막 값, high/low 는 최대/최소, 거래량 컬럼은 합계.
+    마지막 구간은 아직 덜 채워졌을 수 있으므로 마감 여부는 open_time + interval 로 판단해야 함.
+    """
+    step = interval_ms(interval)
+    offset = _WEEK_OFFSET_MS if interval.endswith("w") else 0
+    times = np.asarray(arrays["open_time"], dtype=np.int64)
+    if len(times) == 0:
+        return {col: np.asarray(values)[:0] for col, values in arrays.items()}
+
+    buckets = (times - offset) // step * step + offset
+    # 구간이 바뀌는 위치(각 구간의 첫 행)와 각 구간의 마지막 행
+    starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+    ends = np.append(starts[1:], len(times)) - 1
+
+    out = {
+        "open_time": buckets[starts],
+        "open": np.asarray(arrays["open"])[starts],
+        "high": np.maximum.reduceat(arrays["high"], starts),
+        "low": np.minimum.reduceat(arrays["low"], starts),
+        "close": np.asarray(arrays["close"])[ends],
+    }
+    for col in SUM_COLUMNS:
+        if col in arrays:
+            out[col] = np.add.reduceat(arrays[col], starts)
+    return out
+
+
+def to_frame(arrays):
+    """
+    {컬럼: 배열} -> data_loader.load_backtest_data 와 같은 형식의 DataFrame
+    """
+    df = pd.DataFrame({
+        "Open Time": pd.to_datetime(arrays["open_time"], unit="ms"),
+        "Open": arrays["open"],
+        "High": arrays["high"],
+        "Low": arrays["low"],
+        "Close": arrays["close"],
+        "Volume": arrays["volume"],
+        "Taker Buy Base Asset Volume": arrays["taker_buy_base"],
+    })
+    df["Taker Sell Base Asset Volume"] = df["Volume"] - df["Taker Buy Base Asset Volume"]
+    return df
+
+
+def month_ranges(start_ms, end_ms):
+    """
+    [start_ms, end_ms) 를 월 단위로 나눈 (월 문자열, 구간 시작, 구간 끝) 목록
+    """
+    ranges = []
+    month = np.datetime64(start_ms, "ms").astype("datetime64[M]")
+    while True:
+        month_start = int(month.astype("datetime64[ms]").astype(np.int64))
+        month_end = int((month + 1).astype("datetime64[ms]").astype(np.int64))
+        if month_start >= end_ms:
+            break
+        ranges.append((str(month), max(start_ms, month_start), min(end_ms, month_end)))
+        month += 1
+    return ranges
+
+
+def _merge_ranges(ranges):
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def _subtract_ranges(start, end, covered):
+    """
+    [start, end) 에서 covered 구간들을 뺀 나머지 구간 목록
+    """
+    missing = []
+    cursor = start
+    for c_start, c_end in _merge_ranges(covered):
+        if c_end <= cursor or c_start >= end:
+            continue
+        if c_start > cursor:
+            missing.append((cursor, min(c_start, end)))
+        cursor = max(cursor, c_end)
+        if cursor >= end:
+            break
+    if cursor < end:
+        missing.append((cursor, end))
+    return missing
+
+
+class KlineArchive:
+    def __init__(self, root=ARCHIVE_DIR):
+        self.root = root
+
+    def _partition(self, symbol, interval, month, futures):
+        market = "futures" if futures else "spot"
+        return os.path.join(self.root, market, f"{symbol}USDT", interval, month)
+
+    # -------------------------
+    #     파티션 읽기/쓰기
+    # -------------------------
+    @staticmethod
+    def _recover_partition(path):
+        """
+        _write_partition 이 기존 파티션을 .old 로 옮긴 직후 종료됐으면 기존 파티션을 되살림
+        """
+        old = path + ".old"
+        if not os.path.exists(path) and os.path.isdir(old):
+            os.replace(old, path)
+
+    def _months(self, market_dir):
+        """
+        market_dir 의 월 파티션 이름 목록 (YYYY-MM). 쓰는 중이던 .tmp/.old 디렉토리는 제외
+        """
+        if not os.path.isdir(market_dir):
+            return []
+        for name in os.listdir(market_dir):
+            if name.endswith(".old"):
+                self._recover_partition(os.path.join(market_dir, name[:-len(".old")]))
+        return sorted(name for name in os.listdir(market_dir) if "." not in name)
+
+    def _read_partition(self, path, mmap=True):
+        self._recover_partition(path)
+        if not os.path.exists(os.path.join(path, "open_time.npy")):
+            return None
+        mode = "r" if mmap else None
+        arrays = {col: np.load(os.path.join(path, f"{col}.npy"), mmap_mode=mode) for col in COLUMNS}
+        # 이전 형식(컬럼별 교체)으로 쓰다 중단된 파티션은 길이가 어긋날 수 있으므로 없는 것으로 취급
+        if len({len(values) for values in arrays.values()}) != 1:
+            print(f"{path} 컬럼 길이가 서로 달라 사용하지 않습니다.")
+            return None
+        return arrays
+
+    def _read_coverage(self, path):
+        self._recover_partition(path)
+        try:
+            with open(os.path.join(path, "coverage.json"), "r", encoding="utf-8") as f:
+                coverage = [tuple(r) for r in json.load(f)]
+        except (OSError, ValueError):
+            return []
+        # 데이터를 쓸 수 없는 파티션은 다시 받도록 받은 구간도 없는 것으로 취급
+        if coverage and self._read_partition(path) is None:
+            return []
+        return coverage
+
+    def _write_partition(self, path, arrays, coverage):
+        """
+        컬럼 파일과 coverage 를 임시 디렉토리(<월>.tmp)에 모두 쓴 뒤 파티션 디렉토리째 교체.
+        비어 있지 않은 디렉토리는 os.replace 로 덮어쓸 수 없으므로 기존 파티션을 <월>.old 로 옮기고
+        새 파티션을 옮긴 뒤 지움. 그 사이에 종료되면 다음 읽기에서 .old 를 되살림 (_recover_partition).
+        어느 시점에 종료돼도 기존 파티션 또는 새 파티션 중 하나만 온전하게 남음
+        """
+        tmp = path + ".tmp"
+        old = path + ".old"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        for col, values in arrays.items():
+            np.save(os.path.join(tmp, f"{col}.npy"), values)
+        with open(os.path.join(tmp, "coverage.json"), "w", encoding="utf-8") as f:
+            json.dump([list(r) for r in _merge_ranges(coverage)], f)
+
+        self._recover_partition(path)
+        shutil.rmtree(old, ignore_errors=True)
+        if os.path.exists(path):
+            os.replace(path, old)
+        os.replace(tmp, path)
+        shutil.rmtree(old, ignore_errors=True)
+
+    @staticmethod
+    def _klines_to_arrays(klines):
+        if not klines:
+            return {col: np.empty(0, dtype=np.int64 if col in ("open_time", "trades") else float) for col in COLUMNS}
+        raw = np.asarray(klines, dtype=object)
+        arrays = {}
+        for col, index in COLUMNS.items():
+            if col in ("open_time", "trades"):
+                arrays[col] = raw[:, index].astype(np.int64)
+            else:
+                arrays[col] = raw[:, index].astype(float)
+        return arrays
+
+    @staticmethod
+    def _merge_arrays(old, new):
+        if old is None:
+            merged = new
+        else:
+            merged = {col: np.concatenate([np.asarray(old[col]), new[col]]) for col in COLUMNS}
+        # 시간 순 정렬 + 중복 제거 (같은 Open Time 이면 나중에 받은 값 사용)
+        times = merged["open_time"]
+        order = np.argsort(times, kind="stable")
+        times = times[order]
+        keep = np.ones(len(times), dtype=bool)
+        keep[:-1] = times[1:] != times[:-1]
+        index = order[keep]
+        return {col: np.ascontiguousarray(merged[col][index]) for col in COLUMNS}
+
+    # -------------------------
+    #     다운로드
+    # -------------------------
+    def _fetch_page(self, client, symbol, interval, start_ms, end_ms, futures, retries=3):
+        limit = FUTURES_LIMIT if futures else SPOT_LIMIT
+        for attempt in range(retries):
+            try:
+                if futures:
+                    return client.futures_klines(symbol=f"{symbol}USDT", interval=interval,
+                                                 startTime=start_ms, endTime=end_ms - 1, limit=limit)
+                return client.get_klines(symbol=f"{symbol}USDT", interval=interval,
+                                         startTime=start_ms, endTime=end_ms - 1, limit=limit)
+            except Exception as e:
+                print(f"{symbol} {interval} 캔들 조회 실패 ({attempt + 1}/{retries}): {e}")
+                time.sleep(2 ** attempt)
+        raise RuntimeError(f"{symbol} {interval} {start_ms} ~ {end_ms} 캔들 조회 실패")
+
+    def download(self, client, symbol, interval, start, end, futures=False, max_workers=4):
+        """
+        symbol(예: "BTC")의 [start, end) 캔들 중 아카이브에 없는 구간만 받아 저장.
+        아직 닫히지 않은 캔들은 받지 않음. 새로 받은 캔들 수 반환.
+        """
+        step = interval_ms(interval)
+        limit = FUTURES_LIMIT if futures else SPOT_LIMIT
+        start_ms = to_ms(start) // step * step
+        # 진행 중인 캔들 제외
+        now_ms = int(time.time() * 1000) // step * step
+        end_ms = min(to_ms(end), now_ms)
+
+        total = 0
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for month, month_start, month_end in month_ranges(start_ms, end_ms):
+                path = self._partition(symbol, interval, month, futures)
+                coverage = self._read_coverage(path)
+                missing = _subtract_ranges(month_start, month_end, coverage)
+                if not missing:
+                    continue
+
+                # 빠진 구간을 limit 개 캔들 단위 페이지로 나눠 동시에 요청
+                pages = []
+                for gap_start, gap_end in missing:
+                    for page_start in range(gap_start, gap_end, step * limit):
+                        pages.append((page_start, min(page_start + step * limit, gap_end)))
+                results = executor.map(
+                    lambda page: self._fetch_page(client, symbol, interval, page[0], page[1], futures), pages
+                )
+                klines = [kline for result in results for kline in result]
+
+                new = self._klines_to_arrays(klines)
+                # 월 경계를 넘는 캔들이 섞이지 않도록 구간 안의 캔들만 사용
+                inside = (new["open_time"] >= month_start) & (new["open_time"] < month_end)
+                new = {col: values[inside] for col, values in new.items()}
+
+                merged = self._merge_arrays(self._read_partition(path, mmap=False), new)
+                self._write_partition(path, merged, coverage + missing)
+                total += len(new["open_time"])
+                print(f"[{'FUTURES' if futures else 'SPOT'}] {symbol} {interval} {month}: {len(new['open_time'])}개 저장")
+        return total
+
+    def store(self, symbol, interval, arrays, futures=False):
+        """
+        API 대신 이미 가진 캔들 배열({컬럼: 배열}, 시간순)을 월별 파티션에 저장 (합성 데이터, 외부 덤프 등).
+        배열의 첫 캔들 ~ 마지막 캔들 구간을 받은 구간(coverage)으로 기록함. 저장한 캔들 수 반환.
+        """
+        step = interval_ms(interval)
+        times = np.asarray(arrays["open_time"], dtype=np.int64)
+        if len(times) == 0:
+            return 0
+        total = 0
+        for month, month_start, month_end in month_ranges(int(times[0]), int(times[-1]) + step):
+            lo, hi = np.searchsorted(times, [month_start, month_end])
+            if hi <= lo:
+                continue
+            path = self._partition(symbol, interval, month, futures)
+            new = {col: np.asarray(arrays[col])[lo:hi] for col in COLUMNS}
+            merged = self._merge_arrays(self._read_partition(path, mmap=False), new)
+            self._write_partition(path, merged, self._read_coverage(path) + [(month_start, month_end)])
+            total += int(hi - lo)
+        return total
+
+    # -------------------------
+    #     읽기
+    # -------------------------
+    def load(self, symbol, interval, start=None, end=None, futures=False, mmap=True):
+        """
+        [start, end) 구간 캔들을 {컬럼: 배열} 로 반환.
+        한 달 안의 구간이면 메모리 매핑된 파일의 view 를 그대로 돌려주고(복사 없음),
+        여러 달에 걸치면 월별 배열을 이어 붙임.
+        """
+        market_dir = os.path.join(self.root, "futures" if futures else "spot", f"{symbol}USDT", interval)
+        months = self._months(market_dir)
+        start_ms = to_ms(start) if start is not None else None
+        end_ms = to_ms(end) if end is not None else None
+
+        parts = []
+        for month in months:
+            if start_ms is not None or end_ms is not None:
+                month_start = to_ms(month + "-01")
+                month_end = to_ms(str(np.datetime64(month, "M") + 1) + "-01")
+                if (end_ms is not None and month_start >= end_ms) or (start_ms is not None and month_end <= start_ms):
+                    continue
+            arrays = self._read_partition(os.path.join(market_dir, month), mmap=mmap)
+            if arrays is None:
+                continue
+            times = arrays["open_time"]
+            lo = int(np.searchsorted(times, start_ms)) if start_ms is not None else 0
+            hi = int(np.searchsorted(times, end_ms)) if end_ms is not None else len(times)
+            if hi > lo:
+                parts.append({col: values[lo:hi] for col, values in arrays.items()})
+
+        if not parts:
+            return self._klines_to_arrays([])
+        if len(parts) == 1:
+            return parts[0]
+        return {col: np.concatenate([part[col] for part in parts]) for col in COLUMNS}
+
+    def load_frame(self, symbol, interval, start=None, end=None, futures=False):
+        """
+        data_loader.load_backtest_data 와 같은 형식의 DataFrame
+        """
+        return to_frame(self.load(symbol, interval, start, end, futures))
+
+    def gaps(self, symbol, interval, start, end, futures=False):
+        """
+        [start, end) 에서 캔들이 없는 구간 목록 [(시작 ms, 끝 ms), ...]
+        (다운로드하지 않은 구간 + 거래소에 원래 캔들이 없는 구간)
+        """
+        step = interval_ms(interval)
+        start_ms = to_ms(start) // step * step
+        end_ms = to_ms(end)
+        times = np.asarray(self.load(symbol, interval, start_ms, end_ms, futures)["open_time"])
+        bounds = np.concatenate([[start_ms - step], times, [end_ms]])
+        diff = np.diff(bounds)
+        index = np.nonzero(diff > step)[0]
+        return [(int(bounds[i] + step), int(bounds[i + 1])) for i in index]
+
+
+if __name__ == "__main__":
+    import argparse
+    from binance.client import Client
+    from src.config import Config
+
+    parser = argparse.ArgumentParser(description="바이낸스 kline 로컬 아카이브 다운로드")
+    parser.add_argument("symbol", help="예: BTC")
+    parser.add_argument("interval", help="예: 1m, 5m, 1h")
+    parser.add_argument("start", help="예: 2024-01-01")
+    parser.add_argument("end", help="예: 2025-02-01")
+    parser.add_argument("--futures", action="store_true", help="선물 캔들")
+    parser.add_argument("--workers", type=int, default=4, help="동시 요청 수")
+    args = parser.parse_args()
+
+    config = Config()
+    client = Client(config.binance_access_key, config.binance_secret_key)
+    archive = KlineArchive()
+    count = archive.download(client, args.symbol, args.interval, args.start, args.end,
+                             futures=args.futures, max_workers=args.workers)
+    print(f"새로 저장한 캔들: {count}개")
+    gaps = archive.gaps(args.symbol, args.interval, args.start, args.end, futures=args.futures)
+    if gaps:
+        print(f"캔들이 없는 구간 {len(gaps)}개:")
+        for gap_start, gap_end in gaps[:20]:
+            print(f"  {pd.to_datetime(gap_start, unit='ms')} ~ {pd.to_datetime(gap_end, unit='ms')}")
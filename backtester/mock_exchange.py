@@ -0,0 +1,987 @@
+"""
+로컬 모의 바이낸스 거래소 (오프라인 부하 테스트용).
+
+실서버와 돈 없이 main.py 전체 흐름(캔들 수집 -> 지표 -> 신호 -> 주문 -> 자산 보고)을 돌려
+심볼 수십 개에서의 처리량/지연 시간을 재거나, 장애 상황을 재현하기 위한 서버.
+  - REST: 봇이 쓰는 엔드포인트만 구현
+      현물 /api/v3: ping, time, exchangeInfo, klines, ticker/price, ticker/bookTicker, account, myTrades, order
+      선물 /fapi/v1~v3: ping, time, exchangeInfo, klines, ticker/price, fundingRate, order, leverage, marginType,
+                       balance, positionRisk, account
+  - WebSocket: <symbol>@kline_<tf> combined stream, !miniTicker@arr (선물은 /futures 경로 아래)
+  - 시세는 kline 아카이브(backtester/kline_archive.py)의 1분봉을 speed 배속으로 재생.
+    5m/1h 등은 1분봉을 리샘플링하고, 진행 중인 1분봉은 경과 비율만큼 시가->종가로 보간해서 보여 줌.
+    아카이브 시각은 하루 단위로 옮겨서 재생 시작 시점이 현재 시각이 되게 함 (speed=1 이면 벽시계와 같음).
+    아카이브에 없는 심볼은 합성 캔들(benchmark.synthetic_klines)로 대신함
+  - 주문은 현재가로 즉시 체결 (LIMIT 은 가격에 닿을 때 체결), 현물 잔고/체결 내역, 선물 포지션/실현 손익을 관리
+  - 장애 주입: 응답 지연(latency + jitter), 일정 비율의 503 오류, 요청 가중치/주문 수 한도 (초과 시 429,
+    그 창 안에서 계속 보내면 418 차단), 일정 주기 WebSocket 강제 종료
+  - GET /mock/stats 로 엔드포인트별 요청 수/평균 처리 시간, 상태 코드별 응답 수, 주문 수, WS 전송 수 조회
+
+봇은 다음 환경변수로 이 서버를 보게 함 (시작할 때 출력됨):
+    BINANCE_API_URL=http://127.0.0.1:8100/api
+    BINANCE_FUTURES_API_URL=http://127.0.0.1:8100/fapi
+    BINANCE_STREAM_URL=ws://127.0.0.1:8101
+    BINANCE_FUTURES_STREAM_URL=ws://127.0.0.1:8101/futures
+
+사용 예:
+    python backtester/mock_exchange.py "2024-01-01" "2024-03-01" --spot BTC ETH --futures BTC --speed 60
+    python backtester/mock_exchange.py "2024-01-01" "2024-03-01" --generate 50 --latency 30 --jitter 20 --error-rate 0.01 --ws-drop 300
+"""
+
+import sys
+import os
+
+# 프로젝트 루트 디렉토리의 절대 경로를 구함
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+import websockets
+
+from backtester.benchmark import synthetic_klines
+from backtester.kline_archive import KlineArchive, SUM_COLUMNS, interval_ms, resample, to_ms
+from src.rate_limiter import DEFAULT_LIMITS, FUTURES, SPOT, WindowBucket, classify
+
+MINUTE_MS = 60_000
+DAY_MS = 86_400_000
+FUNDING_INTERVAL_MS = 8 * 3_600_000
+
+SPOT_FEE = 0.001
+FUTURES_FEE = 0.0004
+SPOT_KLINE_LIMIT = 1000
+FUTURES_KLINE_LIMIT = 1500
+MIN_NOTIONAL = 5.0
+# bookTicker 호가 스프레드 (현재가 기준 비율)
+BOOK_SPREAD = 0.0001
+
+ROUTE = re.compile(r"^/(api|fapi)/v\d+/(.+)$")
+
+
+class MockError(Exception):
+    """
+    바이낸스 형식의 오류 응답 {"code": ..., "msg": ...}
+    """
+    def __init__(self, status, code, msg):
+        super().__init__(msg)
+        self.status = status
+        self.code = code
+        self.msg = msg
+
+
+def _fmt(value):
+    return format(float(value), ".8f")
+
+
+# -------------------------
+#     시세 재생
+# -------------------------
+class MarketClock:
+    """
+    아카이브 시각(ms) <-> 거래소 시각(ms). 재생 시각은 speed 배속으로 흐르고 아카이브 끝에서 멈춤.
+    캔들 경계가 맞도록 하루 단위로만 옮기므로 실제 재생 시작은 start 이후 하루 이내
+    """
+    def __init__(self, start_ms, end_ms, speed=1.0):
+        wall_ms = int(time.time() * 1000)
+        self.offset = (wall_ms - start_ms) // DAY_MS * DAY_MS
+        self.start = wall_ms - self.offset
+        self.end = end_ms
+        self.speed = speed
+        self.started = time.monotonic()
+
+    def now(self):
+        elapsed = int((time.monotonic() - self.started) * 1000 * self.speed)
+        return min(self.start + elapsed, self.end - 1)
+
+    def finished(self):
+        return self.now() >= self.end - 1
+
+    def to_exchange(self, ms):
+        return int(ms) + self.offset
+
+    def to_archive(self, ms):
+        return int(ms) - self.offset
+
+
+class SymbolFeed:
+    """
+    심볼 하나의 1분봉 배열을 재생 시각 기준으로 잘라서 보여 줌
+    """
+    def __init__(self, symbol, arrays):
+        self.symbol = symbol
+        self.times = np.asarray(arrays["open_time"], dtype=np.int64)
+        self.arrays = {col: np.asarray(values, dtype=float) for col, values in arrays.items() if col != "open_time"}
+
+    def _rows(self, start_ms, last_ms, now_ms):
+        """
+        open_time 이 [start_ms, last_ms] 인 1분봉 (복사본). 진행 중인 마지막 1분봉은 now_ms 까지만 반영
+        """
+        lo = int(np.searchsorted(self.times, start_ms))
+        hi = int(np.searchsorted(self.times, min(last_ms, now_ms), side="right"))
+        rows = {col: values[lo:hi].copy() for col, values in self.arrays.items()}
+        rows["open_time"] = self.times[lo:hi]
+        if hi > lo and self.times[hi - 1] + MINUTE_MS > now_ms:
+            fraction = (now_ms - self.times[hi - 1]) / MINUTE_MS
+            o, h, l, c = (rows[col][-1] for col in ("open", "high", "low", "close"))
+            close = o + (c - o) * fraction
+            rows["close"][-1] = close
+            rows["high"][-1] = max(o, close) + (h - max(o, c)) * fraction
+            rows["low"][-1] = min(o, close) - (min(o, c) - l) * fraction
+            for col in SUM_COLUMNS:
+                if col in rows:
+                    rows[col][-1] *= fraction
+        return rows
+
+    def klines(self, interval, now_ms, limit=500, start_ms=None, end_ms=None):
+        """
+        REST klines 와 같은 규칙: start 가 있으면 start 부터 limit 개, 없으면 end(또는 현재)까지의 마지막 limit 개
+        """
+        step = interval_ms(interval)
+        last = now_ms // step * step
+        if end_ms is not None:
+            last = min(last, end_ms // step * step)
+        if start_ms is not None:
+            first = -(-start_ms // step) * step
+            last = min(last, first + (limit - 1) * step)
+        else:
+            first = last - (limit - 1) * step
+        if last < first:
+            return resample(self._rows(0, -1, now_ms), interval)
+        rows = self._rows(first, last + step - 1, now_ms)
+        return rows if step == MINUTE_MS else resample(rows, interval)
+
+    def price(self, now_ms):
+        index = int(np.searchsorted(self.times, now_ms, side="right")) - 1
+        if index < 0:
+            return float(self.arrays["open"][0])
+        if self.times[index] + MINUTE_MS <= now_ms:
+            return float(self.arrays["close"][index])
+        fraction = (now_ms - self.times[index]) / MINUTE_MS
+        o, c = self.arrays["open"][index], self.arrays["close"][index]
+        return float(o + (c - o) * fraction)
+
+
+def _lot_filters(price, futures):
+    """
+    가격 크기에 맞춘 그럴듯한 LOT_SIZE / PRICE_FILTER / 최소 주문 금액 필터
+    """
+    digits = int(min(max(math.ceil(math.log10(max(price, 1e-8))), 0), 8))
+    step = _fmt(10 ** -digits)
+    tick = _fmt(10 ** -int(min(max(7 - digits, 0), 8)))
+    filters = [
+        {"filterType": "PRICE_FILTER", "minPrice": tick, "maxPrice": "1000000.00000000", "tickSize": tick},
+        {"filterType": "LOT_SIZE", "minQty": step, "maxQty": "9000000.00000000", "stepSize": step},
+        {"filterType": "MARKET_LOT_SIZE", "minQty": step, "maxQty": "9000000.00000000", "stepSize": step},
+    ]
+    if futures:
+        filters.append({"filterType": "MIN_NOTIONAL", "notional": _fmt(MIN_NOTIONAL)})
+    else:
+        filters.append({"filterType": "NOTIONAL", "minNotional": _fmt(MIN_NOTIONAL)})
+    return filters
+
+
+# -------------------------
+#     모의 거래소
+# -------------------------
+class MockExchange:
+    def __init__(self, spot_feeds, futures_feeds, clock, host="127.0.0.1", port=8100, ws_port=8101,
+                 balance=10000.0, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, limits=None,
+                 ban_seconds=120, ws_interval=1.0, ws_drop=0.0, seed=0):
+        self.feeds = {SPOT: dict(spot_feeds), FUTURES: dict(futures_feeds)}
+        self.clock = clock
+        self.host = host
+        self.port = port
+        self.ws_port = ws_port
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.ban_seconds = ban_seconds
+        self.ws_interval = ws_interval
+        self.ws_drop = ws_drop
+        self.random = random.Random(seed)
+
+        self.lock = threading.Lock()
+        # 현물 잔고 {자산: 수량}, 체결 내역 {심볼: [trade, ...]}
+        self.balances = {"USDT": float(balance)}
+        for symbol in self.feeds[SPOT]:
+            self.balances.setdefault(symbol[:-len("USDT")], 0.0)
+        self.trades = {}
+        # 선물 지갑 잔고와 포지션 {심볼: {"amt", "entry", "leverage", "margin_type"}}
+        self.wallet = float(balance)
+        self.positions = {symbol: {"amt": 0.0, "entry": 0.0, "leverage": 1, "margin_type": "cross"}
+                          for symbol in self.feeds[FUTURES]}
+        self.orders = {SPOT: {}, FUTURES: {}}
+        self.open_orders = {SPOT: [], FUTURES: []}
+        self.next_id = 1
+
+        # 요청 한도 (실서버와 같은 창/헤더, 벽시계 기준)
+        limits = limits or DEFAULT_LIMITS
+        self.weight_buckets = {market: [WindowBucket(*spec) for spec in specs["weight"]] for market, specs in limits.items()}
+        self.order_buckets = {market: [WindowBucket(*spec) for spec in specs["orders"]] for market, specs in limits.items()}
+        self.limited_window = {market: None for market in limits}
+        self.banned_until = {market: 0.0 for market in limits}
+
+        # 통계
+        self.requests = {}        # endpoint -> [요청 수, 처리 시간 합계]
+        self.statuses = {}        # 상태 코드 -> 응답 수
+        self.order_count = 0
+        self.ws_messages = 0
+        self.ws_connections = 0
+
+        self.http = None
+        self.ws_loop = None
+        self.ws_thread = None
+        self.ws_ready = threading.Event()
+
+        self.routes = {
+            (SPOT, "get", "ping"): lambda params: {},
+            (SPOT, "get", "time"): self._time,
+            (SPOT, "get", "exchangeInfo"): lambda params: self._exchange_info(SPOT),
+            (SPOT, "get", "klines"): lambda params: self._klines(SPOT, params),
+            (SPOT, "get", "ticker/price"): lambda params: self._ticker_price(SPOT, params),
+            (SPOT, "get", "ticker/bookTicker"): self._book_ticker,
+            (SPOT, "get", "account"): self._account,
+            (SPOT, "get", "myTrades"): self._my_trades,
+            (SPOT, "get", "order"): lambda params: self._get_order(SPOT, params),
+            (SPOT, "post", "order"): self._spot_order,
+            (SPOT, "delete", "order"): lambda params: self._cancel_order(SPOT, params),
+            (FUTURES, "get", "ping"): lambda params: {},
+            (FUTURES, "get", "time"): self._time,
+            (FUTURES, "get", "exchangeInfo"): lambda params: self._exchange_info(FUTURES),
+            (FUTURES, "get", "klines"): lambda params: self._klines(FUTURES, params),
+            (FUTURES, "get", "ticker/price"): lambda params: self._ticker_price(FUTURES, params),
+            (FUTURES, "get", "fundingRate"): self._funding_rate,
+            (FUTURES, "get", "order"): lambda params: self._get_order(FUTURES, params),
+            (FUTURES, "post", "order"): self._futures_order,
+            (FUTURES, "delete", "order"): lambda params: self._cancel_order(FUTURES, params),
+            (FUTURES, "post", "leverage"): self._leverage,
+            (FUTURES, "post", "marginType"): self._margin_type,
+            (FUTURES, "get", "balance"): self._futures_balance,
+            (FUTURES, "get", "positionRisk"): self._position_risk,
+            (FUTURES, "get", "account"): self._futures_account,
+        }
+
+    # -------------------------
+    #     요청 처리
+    # -------------------------
+    def handle(self, method, path, params):
+        """
+        (상태 코드, 응답 객체, 응답 헤더)
+        """
+        started = time.perf_counter()
+        method = method.lower()
+        match = ROUTE.match(path)
+        if path == "/mock/stats":
+            status, body, headers = 200, self.stats(), {}
+        elif match is None:
+            status, body, headers = 404, {"code": -1, "msg": f"Unknown path {path}"}, {}
+        else:
+            market = FUTURES if match.group(1) == "fapi" else SPOT
+            status, body, headers = self._dispatch(market, method, path, match.group(2), params)
+
+        with self.lock:
+            entry = self.requests.setdefault(path if match is None else f"{method.upper()} {path}", [0, 0.0])
+            entry[0] += 1
+            entry[1] += time.perf_counter() - started
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+        return status, body, headers
+
+    def _dispatch(self, market, method, path, name, params):
+        delay = self.latency_ms + self.random.uniform(0, self.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+        headers = {}
+        handler = self.routes.get((market, method, name))
+        if handler is None:
+            return 404, {"code": -1, "msg": f"Unsupported endpoint {method.upper()} {path}"}, headers
+
+        _, weight, _, is_order = classify(method, path, "signature" in params, params)
+        limited = self._charge(market, weight, is_order, headers)
+        if limited is not None:
+            return limited + (headers,)
+        if self.error_rate and self.random.random() < self.error_rate:
+            return 503, {"code": -1001, "msg": "Internal error; unable to process your request. Please try again."}, headers
+
+        try:
+            with self.lock:
+                self._match_open_orders()
+                if is_order:
+                    self.order_count += 1
+                return 200, handler(params), headers
+        except MockError as e:
+            return e.status, {"code": e.code, "msg": e.msg}, headers
+        except (KeyError, ValueError) as e:
+            return 400, {"code": -1102, "msg": f"Mandatory parameter missing or malformed: {e}"}, headers
+
+    def _charge(self, market, weight, is_order, headers):
+        """
+        요청 가중치/주문 수 차감. 한도를 넘으면 (429 또는 418, 오류 응답) 반환, 아니면 None
+        """
+        now = time.time()
+        with self.lock:
+            if now < self.banned_until[market]:
+                headers["Retry-After"] = str(math.ceil(self.banned_until[market] - now))
+                return 418, {"code": -1003, "msg": "Way too many requests; IP banned."}
+            buckets = self.weight_buckets[market] + (self.order_buckets[market] if is_order else [])
+            for bucket in self.weight_buckets[market]:
+                bucket.take(weight, now)
+            if is_order:
+                for bucket in self.order_buckets[market]:
+                    bucket.take(1, now)
+            for bucket in buckets:
+                headers[bucket.header] = str(bucket.used)
+
+            over = [bucket for bucket in buckets if bucket.used > bucket.limit]
+            if not over:
+                return None
+            window = tuple(bucket.window for bucket in over)
+            if self.limited_window[market] == window:
+                # 429 를 받고도 같은 창 안에서 계속 보내면 차단
+                self.banned_until[market] = now + self.ban_seconds
+                headers["Retry-After"] = str(self.ban_seconds)
+                return 418, {"code": -1003, "msg": "Way too many requests; IP banned."}
+            self.limited_window[market] = window
+            headers["Retry-After"] = str(math.ceil(max(bucket.reset_in(now) for bucket in over)))
+            return 429, {"code": -1003, "msg": "Too many requests; please use the websocket for live updates."}
+
+    # -------------------------
+    #     시세 엔드포인트
+    # -------------------------
+    def _feed(self, market, symbol):
+        feed = self.feeds[market].get(symbol)
+        if feed is None:
+            raise MockError(400, -1121, "Invalid symbol.")
+        return feed
+
+    def _time(self, params):
+        return {"serverTime": int(time.time() * 1000)}
+
+    def _exchange_info(self, market):
+        now = self.clock.now()
+        futures = market == FUTURES
+        rate_limits = [{"rateLimitType": "REQUEST_WEIGHT", "interval": "MINUTE", "intervalNum": 1, "limit": bucket.limit}
+                       for bucket in self.weight_buckets[market]]
+        symbols = []
+        for symbol, feed in self.feeds[market].items():
+            info = {
+                "symbol": symbol, "status": "TRADING",
+                "baseAsset": symbol[:-len("USDT")], "quoteAsset": "USDT",
+                "filters": _lot_filters(feed.price(now), futures),
+            }
+            if futures:
+                info["contractType"] = "PERPETUAL"
+            symbols.append(info)
+        return {"timezone": "UTC", "serverTime": int(time.time() * 1000), "rateLimits": rate_limits, "symbols": symbols}
+
+    def _klines(self, market, params):
+        feed = self._feed(market, params["symbol"])
+        interval = params["interval"]
+        if not re.fullmatch(r"\d+[mhd]", interval):
+            raise MockError(400, -1120, "Invalid interval.")
+        max_limit = FUTURES_KLINE_LIMIT if market == FUTURES else SPOT_KLINE_LIMIT
+        limit = min(int(params.get("limit", 500)), max_limit)
+        start = self.clock.to_archive(params["startTime"]) if "startTime" in params else None
+        end = self.clock.to_archive(params["endTime"]) if "endTime" in params else None
+        rows = feed.klines(interval, self.clock.now(), limit, start, end)
+        return self._kline_rows(rows, interval_ms(interval))[-limit:]
+
+    def _kline_rows(self, rows, step):
+        result = []
+        for i in range(len(rows["open_time"])):
+            open_time = self.clock.to_exchange(rows["open_time"][i])
+            result.append([
+                open_time, _fmt(rows["open"][i]), _fmt(rows["high"][i]), _fmt(rows["low"][i]), _fmt(rows["close"][i]),
+                _fmt(rows["volume"][i]), open_time + step - 1, _fmt(rows["quote_volume"][i]), int(rows["trades"][i]),
+                _fmt(rows["taker_buy_base"][i]), _fmt(rows["taker_buy_quote"][i]), "0",
+            ])
+        return result
+
+    def _ticker_price(self, market, params):
+        now = self.clock.now()
+        if "symbol" in params:
+            return {"symbol": params["symbol"], "price": _fmt(self._feed(market, params["symbol"]).price(now))}
+        return [{"symbol": symbol, "price": _fmt(feed.price(now))} for symbol, feed in self.feeds[market].items()]
+
+    def _book_ticker(self, params):
+        now = self.clock.now()
+        symbols = [params["symbol"]] if "symbol" in params else list(self.feeds[SPOT])
+        result = []
+        for symbol in symbols:
+            price = self._feed(SPOT, symbol).price(now)
+            result.append({
+                "symbol": symbol,
+                "bidPrice": _fmt(price * (1 - BOOK_SPREAD)), "bidQty": "1.00000000",
+                "askPrice": _fmt(price * (1 + BOOK_SPREAD)), "askQty": "1.00000000",
+            })
+        return result[0] if "symbol" in params else result
+
+    def _funding_rate(self, params):
+        """
+        8시간마다의 펀딩비. 직전 8시간 수익률에 비례하는 값으로 만듦 (기본 0.01%)
+        """
+        feed = self._feed(FUTURES, params["symbol"])
+        now = self.clock.now()
+        limit = min(int(params.get("limit", 100)), 1000)
+        last = now // FUNDING_INTERVAL_MS * FUNDING_INTERVAL_MS
+        if "endTime" in params:
+            last = min(last, self.clock.to_archive(params["endTime"]) // FUNDING_INTERVAL_MS * FUNDING_INTERVAL_MS)
+        if "startTime" in params:
+            first = -(-self.clock.to_archive(params["startTime"]) // FUNDING_INTERVAL_MS) * FUNDING_INTERVAL_MS
+            last = min(last, first + (limit - 1) * FUNDING_INTERVAL_MS)
+        else:
+            first = last - (limit - 1) * FUNDING_INTERVAL_MS
+        result = []
+        for funding_time in range(max(first, int(feed.times[0]) // FUNDING_INTERVAL_MS * FUNDING_INTERVAL_MS),
+                                  last + 1, FUNDING_INTERVAL_MS):
+            price = feed.price(funding_time)
+            change = price / feed.price(funding_time - FUNDING_INTERVAL_MS) - 1
+            rate = min(max(0.0001 + 0.01 * change, -0.0075), 0.0075)
+            result.append({
+                "symbol": feed.symbol, "fundingTime": self.clock.to_exchange(funding_time),
+                "fundingRate": _fmt(rate), "markPrice": _fmt(price),
+            })
+        return result
+
+    # -------------------------
+    #     현물 계좌 / 주문
+    # -------------------------
+    def _account(self, params):
+        balances = [{"asset": asset, "free": _fmt(amount), "locked": "0.00000000"} for asset, amount in self.balances.items()]
+        return {"canTrade": True, "canWithdraw": True, "canDeposit": True, "accountType": "SPOT",
+                "updateTime": int(time.time() * 1000), "balances": balances}
+
+    def _my_trades(self, params):
+        symbol = params["symbol"]
+        self._feed(SPOT, symbol)
+        limit = min(int(params.get("limit", 500)), 1000)
+        trades = self.trades.get(symbol, [])
+        if "fromId" in params:
+            from_id = int(params["fromId"])
+            return [trade for trade in trades if trade["id"] >= from_id][:limit]
+        return trades[-limit:]
+
+    def _new_order(self, market, params):
+        symbol = params["symbol"]
+        feed = self._feed(market, symbol)
+        side = params["side"].upper()
+        order_type = params["type"].upper()
+        if side not in ("BUY", "SELL"):
+            raise MockError(400, -1117, "Invalid side.")
+        if order_type not in ("MARKET", "LIMIT"):
+            raise MockError(400, -1116, "Invalid orderType.")
+        price = feed.price(self.clock.now())
+        quantity = float(params.get("quantity", 0))
+        if not quantity and params.get("quoteOrderQty"):
+            quantity = float(params["quoteOrderQty"]) / price
+        if quantity <= 0:
+            raise MockError(400, -1013, "Invalid quantity.")
+        limit_price = float(params["price"]) if order_type == "LIMIT" else 0.0
+
+        order = {
+            "symbol": symbol, "orderId": self.next_id,
+            "clientOrderId": params.get("newClientOrderId", f"mock{self.next_id}"),
+            "price": _fmt(limit_price), "origQty": _fmt(quantity), "executedQty": "0.00000000",
+            "status": "NEW", "timeInForce": params.get("timeInForce", "GTC"), "type": order_type, "side": side,
+        }
+        self.next_id += 1
+        return order, price
+
+    def _spot_order(self, params):
+        order, price = self._new_order(SPOT, params)
+        order.update({"transactTime": int(time.time() * 1000), "cummulativeQuoteQty": "0.00000000", "fills": []})
+        limit_price = float(order["price"])
+        if order["type"] == "MARKET" or self._crosses(order["side"], price, limit_price):
+            self._fill_spot(order, price)
+        else:
+            self.open_orders[SPOT].append(order)
+        self.orders[SPOT][order["orderId"]] = order
+        return order
+
+    def _fill_spot(self, order, price):
+        symbol = order["symbol"]
+        base = symbol[:-len("USDT")]
+        quantity = float(order["origQty"])
+        quote = quantity * price
+        if order["side"] == "BUY":
+            if self.balances["USDT"] < quote - 1e-9:
+                raise MockError(400, -2010, "Account has insufficient balance for requested action.")
+            commission, commission_asset = quantity * SPOT_FEE, base
+            self.balances["USDT"] -= quote
+            self.balances[base] = self.balances.get(base, 0.0) + quantity - commission
+        else:
+            if self.balances.get(base, 0.0) < quantity - 1e-12:
+                raise MockError(400, -2010, "Account has insufficient balance for requested action.")
+            commission, commission_asset = quote * SPOT_FEE, "USDT"
+            self.balances[base] -= quantity
+            self.balances["USDT"] += quote - commission
+
+        trades = self.trades.setdefault(symbol, [])
+        trade = {
+            "symbol": symbol, "id": len(trades) + 1, "orderId": order["orderId"],
+            "price": _fmt(price), "qty": _fmt(quantity), "quoteQty": _fmt(quote),
+            "commission": _fmt(commission), "commissionAsset": commission_asset,
+            "time": int(time.time() * 1000), "isBuyer": order["side"] == "BUY", "isMaker": order["type"] == "LIMIT",
+        }
+        trades.append(trade)
+        order.update({
+            "status": "FILLED", "executedQty": _fmt(quantity), "cummulativeQuoteQty": _fmt(quote),
+            "fills": [{"price": trade["price"], "qty": trade["qty"], "commission": trade["commission"],
+                       "commissionAsset": commission_asset, "tradeId": trade["id"]}],
+        })
+
+    @staticmethod
+    def _crosses(side, price, limit_price):
+        return price <= limit_price if side == "BUY" else price >= limit_price
+
+    def _match_open_orders(self):
+        """
+        가격에 닿은 지정가 주문 체결 (요청이 들어올 때마다 확인). 잔고가 모자라면 EXPIRED
+        """
+        for market in (SPOT, FUTURES):
+            if not self.open_orders[market]:
+                continue
+            now = self.clock.now()
+            remaining = []
+            for order in self.open_orders[market]:
+                price = self.feeds[market][order["symbol"]].price(now)
+                if not self._crosses(order["side"], price, float(order["price"])):
+                    remaining.append(order)
+                    continue
+                try:
+                    if market == SPOT:
+                        self._fill_spot(order, float(order["price"]))
+                    else:
+                        self._fill_futures(order, float(order["price"]))
+                except MockError:
+                    order["status"] = "EXPIRED"
+            self.open_orders[market] = remaining
+
+    def _get_order(self, market, params):
+        order = self.orders[market].get(int(params["orderId"]))
+        if order is None or order["symbol"] != params["symbol"]:
+            raise MockError(400, -2013, "Order does not exist.")
+        return order
+
+    def _cancel_order(self, market, params):
+        order = self._get_order(market, params)
+        if order["status"] != "NEW":
+            raise MockError(400, -2011, "Unknown order sent.")
+        order["status"] = "CANCELED"
+        self.open_orders[market] = [item for item in self.open_orders[market] if item is not order]
+        return order
+
+    # -------------------------
+    #     선물 계좌 / 주문
+    # -------------------------
+    def _used_margin(self, now):
+        return sum(abs(position["amt"]) * self.feeds[FUTURES][symbol].price(now) / position["leverage"]
+                   for symbol, position in self.positions.items())
+
+    def _unrealized(self, symbol, position, now):
+        return position["amt"] * (self.feeds[FUTURES][symbol].price(now) - position["entry"])
+
+    def _futures_order(self, params):
+        order, price = self._new_order(FUTURES, params)
+        order.update({
+            "avgPrice": "0.00000000", "cumQuote": "0.00000000", "positionSide": "BOTH",
+            "reduceOnly": str(params.get("reduceOnly", "false")).lower() == "true", "updateTime": int(time.time() * 1000),
+        })
+        limit_price = float(order["price"])
+        if order["type"] == "MARKET" or self._crosses(order["side"], price, limit_price):
+            self._fill_futures(order, price)
+        else:
+            self.open_orders[FUTURES].append(order)
+        self.orders[FUTURES][order["orderId"]] = order
+        return order
+
+    def _fill_futures(self, order, price):
+        position = self.positions[order["symbol"]]
+        quantity = float(order["origQty"])
+        signed = quantity if order["side"] == "BUY" else -quantity
+        amt = position["amt"]
+        closing = min(abs(signed), abs(amt)) if amt * signed < 0 else 0.0
+        if order["reduceOnly"] and closing < quantity - 1e-12:
+            raise MockError(400, -2022, "ReduceOnly Order is rejected.")
+
+        opening = quantity - closing
+        now = self.clock.now()
+        fee = quantity * price * FUTURES_FEE
+        if opening > 0:
+            available = self.wallet - self._used_margin(now) - fee
+            if opening * price / position["leverage"] > available:
+                raise MockError(400, -2019, "Margin is insufficient.")
+
+        if closing > 0:
+            self.wallet += closing * (price - position["entry"]) * (1 if amt > 0 else -1)
+            amt += closing if signed > 0 else -closing
+        if opening > 0:
+            opened = opening if signed > 0 else -opening
+            position["entry"] = (abs(amt) * position["entry"] + opening * price) / (abs(amt) + opening)
+            amt += opened
+        if abs(amt) <= 1e-12:
+            amt = 0.0
+            position["entry"] = 0.0
+        position["amt"] = amt
+        self.wallet -= fee
+        order.update({
+            "status": "FILLED", "executedQty": _fmt(quantity), "avgPrice": _fmt(price),
+            "cumQuote": _fmt(quantity * price), "updateTime": int(time.time() * 1000),
+        })
+
+    def _leverage(self, params):
+        position = self.positions[self._feed(FUTURES, params["symbol"]).symbol]
+        position["leverage"] = int(params["leverage"])
+        return {"symbol": params["symbol"], "leverage": position["leverage"], "maxNotionalValue": "1000000"}
+
+    def _margin_type(self, params):
+        position = self.positions[self._feed(FUTURES, params["symbol"]).symbol]
+        margin_type = params["marginType"].lower()
+        if margin_type == "crossed":
+            margin_type = "cross"
+        if position["margin_type"] == margin_type:
+            raise MockError(400, -4046, "No need to change margin type.")
+        position["margin_type"] = margin_type
+        return {"code": 200, "msg": "success"}
+
+    def _futures_balance(self, params):
+        now = self.clock.now()
+        unrealized = sum(self._unrealized(symbol, position, now) for symbol, position in self.positions.items())
+        available = self.wallet - self._used_margin(now) + min(unrealized, 0.0)
+        return [{
+            "asset": "USDT", "balance": _fmt(self.wallet), "crossWalletBalance": _fmt(self.wallet),
+            "crossUnPnl": _fmt(unrealized), "availableBalance": _fmt(available),
+            "maxWithdrawAmount": _fmt(available), "withdrawAvailable": _fmt(available),
+            "updateTime": int(time.time() * 1000),
+        }]
+
+    def _position_risk(self, params):
+        now = self.clock.now()
+        symbols = [params["symbol"]] if "symbol" in params else list(self.positions)
+        result = []
+        for symbol in symbols:
+            position = self.positions[self._feed(FUTURES, symbol).symbol]
+            result.append({
+                "symbol": symbol, "positionAmt": _fmt(position["amt"]), "entryPrice": _fmt(position["entry"]),
+                "markPrice": _fmt(self.feeds[FUTURES][symbol].price(now)),
+                "unRealizedProfit": _fmt(self._unrealized(symbol, position, now)),
+                "leverage": str(position["leverage"]), "marginType": position["margin_type"],
+                "positionSide": "BOTH", "updateTime": int(time.time() * 1000),
+            })
+        return result
+
+    def _futures_account(self, params):
+        balance = self._futures_balance(params)[0]
+        return {
+            "totalWalletBalance": balance["balance"], "totalUnrealizedProfit": balance["crossUnPnl"],
+            "availableBalance": balance["availableBalance"], "assets": [balance],
+            "positions": self._position_risk({}),
+        }
+
+    # -------------------------
+    #     WebSocket 스트림
+    # -------------------------
+    def _kline_event(self, feed, interval, rows, index, closed):
+        step = interval_ms(interval)
+        open_time = self.clock.to_exchange(rows["open_time"][index])
+        return {
+            "e": "kline", "E": int(time.time() * 1000), "s": feed.symbol,
+            "k": {
+                "t": open_time, "T": open_time + step - 1, "s": feed.symbol, "i": interval,
+                "o": _fmt(rows["open"][index]), "c": _fmt(rows["close"][index]),
+                "h": _fmt(rows["high"][index]), "l": _fmt(rows["low"][index]),
+                "v": _fmt(rows["volume"][index]), "n": int(rows["trades"][index]), "x": closed,
+                "q": _fmt(rows["quote_volume"][index]), "V": _fmt(rows["taker_buy_base"][index]),
+                "Q": _fmt(rows["taker_buy_quote"][index]), "B": "0",
+            },
+        }
+
+    def _kline_messages(self, market, streams, last_open):
+        """
+        구독 중인 kline 마다 진행 중인 캔들 갱신 1건. 캔들이 바뀌었으면 직전 캔들의 마감(x=true)도 먼저 보냄
+        """
+        now = self.clock.now()
+        messages = []
+        for stream in streams:
+            name, _, interval = stream.partition("@kline_")
+            feed = self.feeds[market].get(name.upper())
+            if feed is None or not interval:
+                continue
+            rows = feed.klines(interval, now, limit=2)
+            if len(rows["open_time"]) == 0:
+                continue
+            current = int(rows["open_time"][-1])
+            previous = last_open.get(stream)
+            if previous is not None and previous != current and len(rows["open_time"]) > 1:
+                messages.append({"stream": stream, "data": self._kline_event(feed, interval, rows, -2, True)})
+            last_open[stream] = current
+            messages.append({"stream": stream, "data": self._kline_event(feed, interval, rows, -1, False)})
+        return messages
+
+    def _mini_tickers(self, market):
+        now = self.clock.now()
+        wall_ms = int(time.time() * 1000)
+        events = []
+        for symbol, feed in self.feeds[market].items():
+            price = feed.price(now)
+            open_price = feed.price(now - DAY_MS)
+            events.append({"e": "24hrMiniTicker", "E": wall_ms, "s": symbol, "c": _fmt(price), "o": _fmt(open_price),
+                           "h": _fmt(max(price, open_price)), "l": _fmt(min(price, open_price)), "v": "0", "q": "0"})
+        return events
+
+    async def _serve_ws(self, ws):
+        request = getattr(ws, "request", None)
+        path = request.path if request is not None else getattr(ws, "path", "/")
+        market = SPOT
+        if path.startswith("/futures"):
+            market = FUTURES
+            path = path[len("/futures"):]
+        split = urlsplit(path)
+        streams = []
+        if split.path == "/stream":
+            query = dict(parse_qsl(split.query))
+            streams = [stream for stream in query.get("streams", "").split("/") if stream]
+        elif split.path.startswith("/ws/"):
+            streams = [stream for stream in split.path[len("/ws/"):].split("/") if stream]
+        mini_ticker = "!miniTicker@arr" in streams
+        kline_streams = [stream for stream in streams if "@kline_" in stream]
+
+        connected = time.monotonic()
+        last_open = {}
+        with self.lock:
+            self.ws_connections += 1
+        try:
+            while True:
+                if self.ws_drop and time.monotonic() - connected >= self.ws_drop:
+                    # 장애 주입: 주기적으로 연결을 끊어 재연결/백필 경로를 시험
+                    await ws.close(1001, "mock exchange drop")
+                    return
+                with self.lock:
+                    messages = self._kline_messages(market, kline_streams, last_open)
+                    if mini_ticker:
+                        messages.append(self._mini_tickers(market))
+                    self.ws_messages += len(messages)
+                for message in messages:
+                    await ws.send(json.dumps(message))
+                await asyncio.sleep(self.ws_interval)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            with self.lock:
+                self.ws_connections -= 1
+
+    async def _run_ws(self):
+        async with websockets.serve(self._serve_ws, self.host, self.ws_port) as server:
+            self.ws_port = list(server.sockets)[0].getsockname()[1]
+            self.ws_ready.set()
+            await asyncio.Future()
+
+    # -------------------------
+    #     서버 시작 / 종료
+    # -------------------------
+    def start(self):
+        exchange = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _respond(self, method):
+                split = urlsplit(self.path)
+                params = dict(parse_qsl(split.query))
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    params.update(parse_qsl(self.rfile.read(length).decode("utf-8")))
+                status, body, headers = exchange.handle(method, split.path, params)
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                self._respond("get")
+
+            def do_POST(self):
+                self._respond("post")
+
+            def do_PUT(self):
+                self._respond("put")
+
+            def do_DELETE(self):
+                self._respond("delete")
+
+            def log_message(self, format, *args):
+                # 요청마다 콘솔에 찍지 않음 (/mock/stats 로 확인)
+                pass
+
+        self.http = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.http.daemon_threads = True
+        self.port = self.http.server_address[1]
+        threading.Thread(target=self.http.serve_forever, daemon=True).start()
+
+        def run_ws():
+            self.ws_loop = asyncio.new_event_loop()
+            try:
+                self.ws_loop.run_until_complete(self._run_ws())
+            except asyncio.CancelledError:
+                pass
+
+        self.ws_thread = threading.Thread(target=run_ws, daemon=True)
+        self.ws_thread.start()
+        self.ws_ready.wait(10)
+        return self
+
+    def stop(self):
+        if self.http is not None:
+            self.http.shutdown()
+            self.http.server_close()
+            self.http = None
+        if self.ws_loop is not None:
+            for task in asyncio.all_tasks(self.ws_loop):
+                self.ws_loop.call_soon_threadsafe(task.cancel)
+            self.ws_thread.join(5)
+            self.ws_loop = None
+
+    def env(self):
+        """
+        봇이 이 서버를 보게 하는 환경변수
+        """
+        return {
+            "BINANCE_API_URL": f"http://{self.host}:{self.port}/api",
+            "BINANCE_FUTURES_API_URL": f"http://{self.host}:{self.port}/fapi",
+            "BINANCE_STREAM_URL": f"ws://{self.host}:{self.ws_port}",
+            "BINANCE_FUTURES_STREAM_URL": f"ws://{self.host}:{self.ws_port}/futures",
+        }
+
+    def stats(self):
+        with self.lock:
+            requests = {endpoint: {"count": count, "avg_ms": round(total / count * 1000, 3)}
+                        for endpoint, (count, total) in sorted(self.requests.items())}
+            return {
+                "replay_time": self.clock.to_exchange(self.clock.now()),
+                "requests": requests,
+                "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+                "orders": self.order_count,
+                "ws_connections": self.ws_connections,
+                "ws_messages": self.ws_messages,
+                "spot_usdt": round(self.balances["USDT"], 8),
+                "futures_wallet": round(self.wallet, 8),
+            }
+
+
+# -------------------------
+#     캔들 준비
+# -------------------------
+def load_feeds(symbols, start, end, futures=False, archive=None, synthetic=False, seed=0):
+    """
+    심볼별 1분봉 SymbolFeed. 아카이브에 없으면(선물은 현물 아카이브도 없으면) 합성 캔들 사용
+    """
+    archive = archive or KlineArchive()
+    start_ms, end_ms = to_ms(start), to_ms(end)
+    feeds = {}
+    for i, symbol in enumerate(symbols):
+        arrays = None
+        if not synthetic:
+            arrays = archive.load(symbol, "1m", start_ms, end_ms, futures=futures)
+            if futures and len(arrays["open_time"]) == 0:
+                arrays = archive.load(symbol, "1m", start_ms, end_ms, futures=False)
+            if len(arrays["open_time"]) == 0:
+                print(f"{symbol}: 아카이브에 1분봉이 없어 합성 캔들을 사용합니다.")
+                arrays = None
+        if arrays is None:
+            rows = (end_ms - start_ms) // MINUTE_MS
+            arrays = synthetic_klines(rows, seed=seed + i, start=start_ms, price=10.0 ** (1 + (seed + i) % 4))
+        feeds[f"{symbol}USDT"] = SymbolFeed(f"{symbol}USDT", arrays)
+    return feeds
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="로컬 모의 바이낸스 거래소 (오프라인 부하 테스트)")
+    parser.add_argument("start", help="불러올 캔들 시작 (예: 2024-01-01)")
+    parser.add_argument("end", help="불러올 캔들 끝")
+    parser.add_argument("--spot", nargs="*", default=[], help="현물 심볼 (예: BTC ETH)")
+    parser.add_argument("--futures", nargs="*", default=[], help="선물 심볼")
+    parser.add_argument("--generate", type=int, default=0, help="합성 심볼 N개를 현물/선물에 추가 (SYN00, SYN01, ...)")
+    parser.add_argument("--synthetic", action="store_true", help="아카이브 대신 모든 심볼에 합성 캔들 사용")
+    parser.add_argument("--warmup-days", type=float, default=42, help="재생 시작 전 이력으로 남겨 둘 기간 (일, 1h 1000개 = 약 42일)")
+    parser.add_argument("--speed", type=float, default=1.0, help="재생 배속 (1 = 실시간)")
+    parser.add_argument("--balance", type=float, default=10000.0, help="현물/선물 초기 USDT")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100, help="REST 포트")
+    parser.add_argument("--ws-port", type=int, default=8101, help="WebSocket 포트")
+    parser.add_argument("--latency", type=float, default=0.0, help="REST 응답 지연 (ms)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="추가 무작위 지연 상한 (ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="503 오류로 응답할 요청 비율")
+    parser.add_argument("--spot-weight", type=int, default=None, help="현물 분당 요청 가중치 한도")
+    parser.add_argument("--futures-weight", type=int, default=None, help="선물 분당 요청 가중치 한도")
+    parser.add_argument("--ban-seconds", type=int, default=120, help="429 이후에도 계속 보내면 차단할 시간 (초)")
+    parser.add_argument("--ws-interval", type=float, default=1.0, help="WebSocket 갱신 주기 (초)")
+    parser.add_argument("--ws-drop", type=float, default=0.0, help="WebSocket 연결을 이 시간(초)마다 끊음 (0 = 안 끊음)")
+    parser.add_argument("--report", type=float, default=60.0, help="통계 출력 주기 (초)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    generated = [f"SYN{i:02d}" for i in range(args.generate)]
+    spot_symbols = list(args.spot) + generated
+    futures_symbols = list(args.futures) + generated
+    if not spot_symbols and not futures_symbols:
+        parser.error("--spot, --futures, --generate 중 하나 이상 필요합니다.")
+
+    archive = KlineArchive()
+    spot_feeds = load_feeds(args.spot, args.start, args.end, False, archive, args.synthetic, args.seed)
+    futures_feeds = load_feeds(args.futures, args.start, args.end, True, archive, args.synthetic, args.seed)
+    # 합성 심볼은 현물/선물이 같은 시세를 쓰도록 같은 seed 로 만듦
+    spot_feeds.update(load_feeds(generated, args.start, args.end, synthetic=True, seed=args.seed + 1000))
+    futures_feeds.update(load_feeds(generated, args.start, args.end, synthetic=True, seed=args.seed + 1000))
+
+    first = min(int(feed.times[0]) for feed in list(spot_feeds.values()) + list(futures_feeds.values()))
+    last = max(int(feed.times[-1]) for feed in list(spot_feeds.values()) + list(futures_feeds.values())) + MINUTE_MS
+    replay_start = min(first + int(args.warmup_days * DAY_MS), last - MINUTE_MS)
+    clock = MarketClock(replay_start, last, args.speed)
+
+    limits = {market: dict(specs) for market, specs in DEFAULT_LIMITS.items()}
+    for market, weight in ((SPOT, args.spot_weight), (FUTURES, args.futures_weight)):
+        if weight:
+            limits[market]["weight"] = [(header, interval, weight) for header, interval, _ in limits[market]["weight"]]
+
+    exchange = MockExchange(
+        spot_feeds, futures_feeds, clock, host=args.host, port=args.port, ws_port=args.ws_port,
+        balance=args.balance, latency_ms=args.latency, jitter_ms=args.jitter, error_rate=args.error_rate,
+        limits=limits, ban_seconds=args.ban_seconds, ws_interval=args.ws_interval, ws_drop=args.ws_drop, seed=args.seed,
+    ).start()
+
+    print(f"모의 거래소 시작: 현물 {len(spot_feeds)}개, 선물 {len(futures_feeds)}개 심볼, {args.speed}배속")
+    print(f"재생 구간 (아카이브 기준): {np.datetime64(clock.start, 'ms')} ~ {np.datetime64(clock.end, 'ms')}")
+    print("봇 실행 시 환경변수:")
+    for name, value in exchange.env().items():
+        print(f"  {name}={value}")
+    if generated:
+        print(f'  COIN_TICKERS="{" ".join(spot_symbols)}"')
+        print(f'  FUTURES_COIN_TICKERS="{" ".join(futures_symbols)}"')
+
+    try:
+        while True:
+            time.sleep(args.report)
+            stats = exchange.stats()
+            total = sum(entry["count"] for entry in stats["requests"].values())
+            print(f"[{np.datetime64(clock.now(), 'ms')}] 요청 {total}건 {stats['statuses']}, 주문 {stats['orders']}건, "
+                  f"WS 연결 {stats['ws_connections']}개 / 전송 {stats['ws_messages']}건")
+            if clock.finished():
+                print("아카이브 끝에 도달해 시세가 멈췄습니다.")
+    except KeyboardInterrupt:
+        print(json.dumps(exchange.stats(), ensure_ascii=False, indent=2))
+    finally:
+        exchange.stop()
@@ -0,0 +1,403 @@
+"""
+멀티 심볼 포트폴리오 백테스트.
+
+backtester() 는 BTC 하나를 BacktestEngine 하나로만 시뮬레이션하지만, 실제 봇은 COIN_TICKERS(현물)와
+FUTURES_COIN_TICKERS(선물) 전체를 Notifier.get_limit_amount 의 균등 배분 한도로 나눠 매매함.
+여기서는 설정된 현물/선물 심볼 전체를 하나의 USDT 잔고로 시뮬레이션함.
+
+  1) 심볼별 신호 생성 (병렬): 심볼마다 워커 프로세스에서 ReplayFeed 로 1분봉을 재생하며 Strategy 신호를 계산하고,
+     TradeManager 와 같은 단계(stage) 규칙의 SymbolPosition 으로 포지션을 따라가며 실제 주문이 나가는 신호만 이벤트로 남김.
+     한도는 포지션이 열려 있는 동안 바뀌지 않으므로(main 루프는 포지션이 모두 없을 때만 한도를 갱신)
+     단계당 1 USDT 로 따라가도 평균 진입가/단계 변화는 실제 금액과 같음
+  2) 체결 (메인 프로세스): 모든 심볼의 이벤트를 시간순으로 합쳐(heapq.merge) 공유 잔고에 체결.
+     한도는 src.utils.allocate_limits (Notifier 와 같은 균등 배분 로직)로 계산하며,
+     시장(현물/선물)의 포지션이 모두 없을 때만 다시 계산함 (main 루프와 같은 규칙)
+
+주의: 공유 잔고가 부족해 진입이 줄어들거나 생략되어도 심볼별 신호는 1) 의 포지션 기준으로 계속 생성됨.
+평가 자산/MDD 는 체결 시점과 mark_interval(기본 1시간) 마다의 종가로 계산.
+
+사용 예:
+    python backtester/portfolio.py "2024-01-01 00:00:00" "2024-07-01 00:00:00"
+"""
+
+import sys
+import os
+
+# 프로젝트 루트 디렉토리의 절대 경로를 구함
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+import argparse
+import contextlib
+import heapq
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src import indicator_registry
+from src.strategy import Strategy
+from src.utils import allocate_limits
+from backtester.kline_archive import KlineArchive, interval_ms, to_ms
+from backtester.replay_feed import ReplayFeed, history_start
+
+# TradeManager 의 단계별 주문 비율 (한도의 19%씩)
+STAGE_RATIO = 0.19
+
+TIMEFRAMES = ("1m", "5m", "1h")
+
+
+class SymbolPosition:
+    """
+    한 심볼의 포지션 상태. TradeManager 의 buy_stage(현물) / futures_status(선물) 와 같은 규칙으로
+    신호를 주문(orders)으로 바꾸고, 체결(fill)되면 수량/평균 진입가/단계를 갱신함.
+    """
+    def __init__(self, futures=False, leverage=1):
+        self.futures = futures
+        self.leverage = leverage if futures else 1
+        self.side = None        # "LONG" / "SHORT" / None
+        self.stage = 0
+        self.quantity = 0.0
+        self.entry_price = 0.0
+
+    def account_info(self):
+        return {
+            "position": self.side.lower() if self.side else None,
+            "entry_price": self.entry_price if self.quantity > 0 else None,
+            "holdings": self.quantity,
+        }
+
+    def _close_stages(self, side, weight):
+        # weight 단계만큼 청산 (weight >= 현재 단계면 전량)
+        if weight >= self.stage:
+            return [("close", side, self.quantity, 0)]
+        return [("close", side, self.quantity * weight / self.stage, self.stage - weight)]
+
+    def orders(self, signal_type, weight, price, limit):
+        """
+        신호 -> [(action, side, quantity, 체결 후 단계), ...]   action: "open" / "close"
+        limit: 이 심볼의 한도 (USDT)
+        """
+        if price <= 0 or weight <= 0:
+            return []
+
+        if not self.futures:
+            if signal_type == "buy" and weight > self.stage:
+                # 현재 단계+1 ~ 목표 단계까지 단계마다 한도의 19%씩 매수
+                quantity = limit * STAGE_RATIO * (weight - self.stage) / price
+                return [("open", "LONG", quantity, weight)]
+            if signal_type == "sell" and self.stage > 0:
+                if weight < self.stage:
+                    # 부분 매도: 한도의 19% x 목표 단계 만큼
+                    quantity = min(limit * STAGE_RATIO * weight / price, self.quantity)
+                    return [("close", "LONG", quantity, self.stage - weight)]
+                return [("close", "LONG", self.quantity, 0)]
+            return []
+
+        notional = limit * self.leverage * STAGE_RATIO * weight / price
+        if signal_type in ("L_buy", "S_buy"):
+            side = "LONG" if signal_type == "L_buy" else "SHORT"
+            orders = []
+            if self.side and self.side != side:
+                # 반대 포지션은 전량 청산 후 전환
+                orders.append(("close", self.side, self.quantity, 0))
+            orders.append(("open", side, notional, (self.stage if self.side == side else 0) + 1))
+            return orders
+        if signal_type in ("L_sell", "S_sell"):
+            side = "LONG" if signal_type == "L_sell" else "SHORT"
+            if self.side == side and self.stage > 0:
+                return self._close_stages(side, weight)
+        return []
+
+    def fill(self, action, side, quantity, stage, price):
+        """
+        주문 체결 반영. 청산이면 실현 손익(USDT, 수수료 제외) 반환
+        """
+        pnl = 0.0
+        if action == "open":
+            total = self.quantity + quantity
+            self.entry_price = (self.entry_price * self.quantity + price * quantity) / total
+            self.quantity = total
+            self.side = side
+        else:
+            quantity = min(quantity, self.quantity)
+            direction = 1 if side == "LONG" else -1
+            pnl = (price - self.entry_price) * quantity * direction
+            self.quantity -= quantity
+        self.stage = stage
+        # 단계가 0이 되면 남은 수량도 정리
+        if self.stage == 0 or self.quantity <= 1e-12:
+            self.side = None
+            self.stage = 0
+            self.quantity = 0.0
+            self.entry_price = 0.0
+        return pnl
+
+
+# -------------------------
+#     1) 심볼별 신호 생성 (워커)
+# -------------------------
+def symbol_events(task):
+    """
+    한 심볼을 재생하며 실제 주문으로 이어지는 신호만 모음.
+    반환: {"key", "events": [(time_ms, signal, weight, price, reason), ...], "marks": (times, closes)}
+    """
+    feed = ReplayFeed(KlineArchive(task["archive_root"]), task["symbol"], task["start"], task["end"],
+                      indicators=task["indicators"], window=task["window"], timeframes=task["timeframes"],
+                      futures=task["futures"])
+    strategy = Strategy(params=task["params"])
+    position = SymbolPosition(task["futures"], task["leverage"])
+    # 단계당 1 USDT 기준 (평균 진입가/단계 변화는 한도 크기와 무관)
+    unit_limit = 1 / STAGE_RATIO
+
+    events = []
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for current_time, data_dict in feed:
+            signal_info = strategy.signal(data_dict, task["futures"], position.account_info())
+            if not signal_info:
+                continue
+            price = signal_info["current_price"]
+            orders = position.orders(signal_info["signal"], signal_info["weight"], price, unit_limit)
+            if not orders:
+                continue
+            for order in orders:
+                position.fill(*order, price)
+            events.append((current_time.value // 1_000_000, signal_info["signal"], signal_info["weight"],
+                           price, signal_info["reason"]))
+
+    # 평가 자산 계산용 종가 (mark_interval 마다)
+    base = feed.timeframes[0]
+    closes = feed.frames[base]["Close"].to_numpy()[np.asarray(feed.ends[base]) - 1]
+    times = np.asarray(feed.steps) + feed.base_step
+    keep = times % task["mark_interval"] == 0
+    return {"key": task["key"], "events": events, "marks": (times[keep], closes[keep]),
+            "last_price": float(closes[-1]) if len(closes) else 0.0}
+
+
+# -------------------------
+#     2) 공유 잔고 체결
+# -------------------------
+class PortfolioBacktest:
+    def __init__(self, keys, initial_balance=100000, leverage=1, trading_fee=0.0004):
+        """
+        keys: [("SPOT", "BTC"), ("FUTURES", "ETH"), ...]
+        """
+        self.keys = list(keys)
+        self.initial_balance = initial_balance
+        self.cash = initial_balance
+        self.trading_fee = trading_fee
+        self.positions = {key: SymbolPosition(key[0] == "FUTURES", leverage) for key in self.keys}
+        self.prices = {key: 0.0 for key in self.keys}
+        self.limits = {}
+        self.fills = []
+        self.realized = {key: 0.0 for key in self.keys}
+        self.skipped = 0
+        self.peak = initial_balance
+        self.max_drawdown = 0.0
+
+    def _value(self, key):
+        position = self.positions[key]
+        if position.quantity == 0:
+            return 0.0
+        if not position.futures:
+            return position.quantity * self.prices[key]
+        # 선물: 증거금 + 미실현 손익
+        direction = 1 if position.side == "LONG" else -1
+        margin = position.quantity * position.entry_price / position.leverage
+        return margin + (self.prices[key] - position.entry_price) * position.quantity * direction
+
+    def total_value(self):
+        return self.cash + sum(self._value(key) for key in self.keys)
+
+    def _mark(self):
+        total = self.total_value()
+        self.peak = max(self.peak, total)
+        if self.peak > 0:
+            self.max_drawdown = max(self.max_drawdown, (self.peak - total) / self.peak)
+
+    def _refresh_limits(self, market):
+        # main 루프와 같이, 해당 시장 포지션이 하나도 없을 때만 한도 갱신
+        keys = [key for key in self.keys if key[0] == market]
+        if market in self.limits and any(self.positions[key].quantity > 0 for key in keys):
+            return
+        values = {}
+        for key in self.keys:
+            position = self.positions[key]
+            values[key] = position.quantity * position.entry_price / position.leverage if position.futures else self._value(key)
+        limits = allocate_limits(self.cash, values)
+        self.limits[market] = {key: limits[key] for key in keys}
+
+    def _fill(self, time_ms, key, order, price, reason):
+        action, side, quantity, stage = order
+        position = self.positions[key]
+        fee_rate = self.trading_fee
+        if action == "open":
+            # 잔고가 부족하면 살 수 있는 만큼만 (증거금 기준)
+            cost_per_unit = price / position.leverage + price * fee_rate
+            quantity = min(quantity, self.cash / cost_per_unit)
+            if quantity <= 1e-12:
+                self.skipped += 1
+                return
+            margin = quantity * price / position.leverage
+            fee = quantity * price * fee_rate
+            position.fill(action, side, quantity, stage, price)
+            self.cash -= margin + fee
+            pnl = None
+        else:
+            quantity = min(quantity, position.quantity)
+            if quantity <= 0:
+                return
+            entry_price = position.entry_price
+            fee = quantity * price * fee_rate
+            pnl = position.fill(action, side, quantity, stage, price)
+            # 현물: 매도 대금 / 선물: 증거금 반환 + 실현 손익
+            if position.futures:
+                self.cash += quantity * entry_price / position.leverage + pnl - fee
+            else:
+                self.cash += quantity * price - fee
+            self.realized[key] += pnl - fee
+
+        self.fills.append({
+            "time": pd.Timestamp(time_ms, unit="ms"),
+            "market": key[0],
+            "symbol": key[1],
+            "action": action,
+            "side": side,
+            "price": price,
+            "qty": quantity,
+            "fee": fee,
+            "pnl": pnl,
+            "stage": position.stage,
+            "cash": self.cash,
+            "reason": reason,
+        })
+
+    def run(self, results):
+        """
+        results: symbol_events() 결과 리스트. 모든 심볼의 이벤트/종가를 시간순으로 합쳐 체결
+        """
+        streams = []
+        for result in results:
+            streams.extend(_streams(result))
+
+        for time_ms, kind, key, item in heapq.merge(*streams, key=lambda entry: entry[:2]):
+            if kind == 0:
+                self.prices[key] = item
+                self._mark()
+                continue
+            _, signal_type, weight, price, reason = item
+            self.prices[key] = price
+            self._refresh_limits(key[0])
+            position = self.positions[key]
+            for order in position.orders(signal_type, weight, price, self.limits[key[0]][key]):
+                self._fill(time_ms, key, order, price, reason)
+            self._mark()
+
+        for result in results:
+            self.prices[result["key"]] = result["last_price"] or self.prices[result["key"]]
+        self._mark()
+        return self.summary()
+
+    def summary(self):
+        total = self.total_value()
+        return {
+            "final_value": total,
+            "return": (total - self.initial_balance) / self.initial_balance * 100,
+            "mdd": self.max_drawdown * 100,
+            "fills": len(self.fills),
+            "skipped": self.skipped,
+            "realized": {f"{market}:{symbol}": pnl for (market, symbol), pnl in self.realized.items()},
+        }
+
+    def get_fills(self):
+        return pd.DataFrame(self.fills)
+
+
+def _streams(result):
+    # (시각, 순서, key, 항목) - 같은 시각이면 종가 갱신(0) 후 체결(1)
+    key = result["key"]
+    times, closes = result["marks"]
+    marks = ((int(t), 0, key, float(c)) for t, c in zip(times, closes))
+    events = ((event[0], 1, key, event) for event in result["events"])
+    return marks, events
+
+
+def portfolio_backtest(spot_symbols, futures_symbols, start_date, end_date, initial_balance=100000,
+                       leverage=1, archive=None, client=None, params=None, max_workers=None,
+                       mark_interval="1h"):
+    """
+    현물/선물 심볼 전체를 하나의 잔고로 백테스트. (PortfolioBacktest, summary dict) 반환
+    client 를 주면 아카이브에 없는 구간을 먼저 받아 둠 (워커는 아카이브만 읽음)
+    """
+    archive = archive or KlineArchive()
+    strategy = Strategy(params=params)
+    indicators = strategy.required_indicators
+    window = indicator_registry.window_length(indicators, strategy.history_length)
+
+    keys = [("SPOT", symbol) for symbol in spot_symbols] + [("FUTURES", symbol) for symbol in futures_symbols]
+    if not keys:
+        raise ValueError("백테스트할 심볼이 없습니다.")
+
+    if client is not None:
+        load_start = history_start(start_date, indicators, window, TIMEFRAMES)
+        for market, symbol in keys:
+            archive.download(client, symbol, TIMEFRAMES[0], load_start, to_ms(end_date), futures=market == "FUTURES")
+
+    tasks = [{
+        "key": (market, symbol),
+        "archive_root": archive.root,
+        "symbol": symbol,
+        "futures": market == "FUTURES",
+        "start": start_date,
+        "end": end_date,
+        "indicators": indicators,
+        "window": window,
+        "timeframes": TIMEFRAMES,
+        "params": params,
+        "leverage": leverage,
+        "mark_interval": interval_ms(mark_interval),
+    } for market, symbol in keys]
+
+    started = time.time()
+    results = []
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        for task, result in zip(tasks, pool.map(symbol_events, tasks)):
+            print(f"[{task['key'][0]}] {task['symbol']} 신호 {len(result['events'])}건")
+            results.append(result)
+    print(f"심볼별 신호 생성 완료: {len(tasks)}개 심볼, {time.time() - started:.1f}초")
+
+    portfolio = PortfolioBacktest(keys, initial_balance, leverage)
+    summary = portfolio.run(results)
+    return portfolio, summary
+
+
+if __name__ == "__main__":
+    from binance.client import Client
+    from src.config import Config
+
+    parser = argparse.ArgumentParser(description="멀티 심볼 포트폴리오 백테스트 (COIN_TICKERS / FUTURES_COIN_TICKERS)")
+    parser.add_argument("start", help="시작 시각 (예: '2024-01-01 00:00:00')")
+    parser.add_argument("end", help="종료 시각")
+    parser.add_argument("--balance", type=float, default=100000, help="초기 USDT 잔고")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument("--output", default="portfolio_fills.csv")
+    args = parser.parse_args()
+
+    config = Config()
+    client = Client(config.binance_access_key, config.binance_secret_key)
+    spot_symbols = [ticker for ticker in config.coin_tickers.split(" ") if ticker and ticker != "USDT"]
+    futures_symbols = []
+    if config.futures_use:
+        futures_symbols = [ticker for ticker in config.futures_coin_tickers.split(" ") if ticker and ticker != "USDT"]
+
+    portfolio, summary = portfolio_backtest(spot_symbols, futures_symbols, args.start, args.end,
+                                            initial_balance=args.balance, leverage=config.futures_leverage,
+                                            client=client, max_workers=args.workers)
+    print("백테스트 종료. 최종 평가 자산: {:.2f}  수익률: {:.2f}%".format(summary["final_value"], summary["return"]))
+    print("최대 손실율 (MDD): {:.2f}%".format(summary["mdd"]))
+    print(f"체결 {summary['fills']}건 (잔고 부족으로 생략 {summary['skipped']}건)")
+    for name, pnl in summary["realized"].items():
+        print(f"  {name}: 실현 손익 {pnl:,.2f} USDT")
+    portfolio.get_fills().to_csv(args.output, index=False)
+    print(f"📁 체결 내역 저장 완료: {args.output}")
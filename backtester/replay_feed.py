@@ -0,0 +1,196 @@
+"""
+오프라인 리플레이 데이터 피드.
+
+백테스트 중 1분마다 update_data(API 조회 + concat) 를 하던 방식 대신,
+로컬 kline 아카이브(kline_archive.KlineArchive)에서 전체 기간 1분봉을 한 번에 읽고,
+5m/1h 등 상위 타임프레임은 1분봉을 리샘플링해서 만든 뒤(kline_archive.resample)
+지표도 전체 기간에 대해 한 번만 계산해 두고, 1분봉 단위로 시뮬레이션 시계를 진행함.
+
+매 스텝마다 Strategy.signal 에 넘기는 data_dict 는 기존과 같은 형태:
+    {"1m": DataFrame(window 행), "5m": DataFrame(window 행), "1h": DataFrame(window 행)}
+  - 각 타임프레임은 현재 시각(1분봉 마감 시각)까지 마감된 캔들만 포함함 (미래 캔들 참조 없음)
+  - 스텝별로 각 타임프레임의 "마지막 마감 캔들 위치"를 searchsorted 로 미리 계산해 두고,
+    DataFrame 은 iloc 구간 슬라이스(원본 배열의 view)로 넘기므로 스텝마다 복사/concat 이 없음.
+    전략은 data_dict 를 읽기만 해야 함
+
+사용 예:
+    feed = ReplayFeed(KlineArchive(), "BTC", "2024-01-01 00:00:00", "2025-02-01 00:00:00",
+                      indicators=strategy.required_indicators, window=window, client=client)
+    for current_time, data_dict in feed:
+        signal_info = strategy.signal(data_dict, False, account_info)
+"""
+
+import sys
+import os
+
+# 프로젝트 루트 디렉토리의 절대 경로를 구함
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+import copy
+import json
+
+import numpy as np
+import pandas as pd
+
+from src.data_control import Data_Control
+from src import indicator_registry
+from backtester.kline_archive import interval_ms, to_ms, resample, to_frame
+
+
+def history_start(start_date, indicators, window, timeframes):
+    """
+    시뮬레이션 시작 시점에 모든 타임프레임에서 window 개의 유효한 지표 행이 있도록
+    기준 캔들을 읽기 시작할 시각(ms)
+    """
+    warmup_bars = window + indicator_registry.warmup_length(indicators)
+    longest = max(interval_ms(timeframe) for timeframe in timeframes)
+    return to_ms(start_date) - warmup_bars * longest
+
+
+class ReplayFeed:
+    def __init__(self, archive, symbol, start_date, end_date, indicators=indicator_registry.DEFAULT_INDICATORS,
+                 window=None, timeframes=("1m", "5m", "1h"), futures=False, client=None, resampled=True):
+        """
+        archive    : KlineArchive
+        symbol     : 심볼 (예: "BTC")
+        start_date : 시뮬레이션 시작 시각 (이 시각의 1분봉부터 진행)
+        end_date   : 시뮬레이션 종료 시각 (이 시각 전까지)
+        indicators : 계산할 지표 (indicator_registry 이름)
+        window     : data_dict 각 타임프레임의 행 수 (기본 window_length(indicators))
+        timeframes : 첫 번째가 시뮬레이션 기준(가장 짧은) 타임프레임
+        client     : 주면 아카이브에 없는 구간을 먼저 API로 받아 둠
+        resampled  : True면 상위 타임프레임을 기준 타임프레임 캔들로 만듦 (False면 아카이브에서 각각 읽음)
+        """
+        self.symbol = symbol
+        self.timeframes = list(timeframes)
+        self.indicators = indicators
+        self.window = window or indicator_registry.window_length(indicators)
+        # 시작 시점에 window 개의 유효한 지표 행이 있도록 앞쪽에 더 읽어 둠
+        warmup_bars = self.window + indicator_registry.warmup_length(indicators)
+
+        start_ms = to_ms(start_date)
+        end_ms = to_ms(end_date)
+        data_control = Data_Control(indicators=indicators)
+
+        base_timeframe = self.timeframes[0]
+        self.base_step = interval_ms(base_timeframe)
+        if resampled:
+            # 가장 긴 타임프레임의 warmup 만큼 기준 캔들을 한 번만 읽어서 모든 타임프레임을 만듦
+            load_start = history_start(start_ms, indicators, self.window, self.timeframes)
+            if client is not None:
+                archive.download(client, symbol, base_timeframe, load_start, end_ms, futures=futures)
+            base_arrays = archive.load(symbol, base_timeframe, load_start, end_ms, futures=futures)
+
+        self.frames = {}
+        self.close_times = {}
+        for timeframe in self.timeframes:
+            step = interval_ms(timeframe)
+            if resampled:
+                arrays = base_arrays if timeframe == base_timeframe else resample(base_arrays, timeframe)
+            else:
+                load_start = start_ms - warmup_bars * step
+                if client is not None:
+                    archive.download(client, symbol, timeframe, load_start, end_ms, futures=futures)
+                arrays = archive.load(symbol, timeframe, load_start, end_ms, futures=futures)
+            # 지표는 전체 기간에 대해 한 번만 계산
+            self.frames[timeframe] = data_control.cal_indicator(to_frame(arrays))
+            self.close_times[timeframe] = np.asarray(arrays["open_time"], dtype=np.int64) + step
+
+        # 시뮬레이션 시계: 기준 타임프레임 캔들의 Open Time
+        base_times = self.close_times[base_timeframe] - self.base_step
+        lo = int(np.searchsorted(base_times, start_ms))
+        hi = int(np.searchsorted(base_times, end_ms))
+        self.steps = base_times[lo:hi]
+
+        # 스텝별 각 타임프레임의 마지막 마감 캔들 다음 위치 (iloc 슬라이스 끝)
+        self.ends = {
+            timeframe: np.searchsorted(self.close_times[timeframe], self.steps + self.base_step, side="right")
+            for timeframe in self.timeframes
+        }
+
+    # -------------------------
+    #     공유 (파라미터 스윕 워커)
+    # -------------------------
+    def save(self, path):
+        """
+        지표까지 계산된 frames 와 스텝 인덱스를 path 디렉토리에 컬럼별 .npy 로 저장.
+        여러 프로세스가 ReplayFeed.open(path) 로 같은 파일을 메모리 매핑해서 읽음.
+        """
+        os.makedirs(path, exist_ok=True)
+        meta = {"symbol": self.symbol, "timeframes": self.timeframes, "window": self.window,
+                "base_step": self.base_step, "columns": {}}
+        np.save(os.path.join(path, "steps.npy"), self.steps)
+        for timeframe, frame in self.frames.items():
+            np.save(os.path.join(path, f"{timeframe}_close_times.npy"), self.close_times[timeframe])
+            np.save(os.path.join(path, f"{timeframe}_ends.npy"), self.ends[timeframe])
+            meta["columns"][timeframe] = list(frame.columns)
+            for i, col in enumerate(frame.columns):
+                values = frame[col].to_numpy()
+                if col == "Open Time":
+                    values = values.astype("datetime64[ns]").view(np.int64)
+                np.save(os.path.join(path, f"{timeframe}_{i}.npy"), np.ascontiguousarray(values, dtype=values.dtype))
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump(meta, f)
+
+    @classmethod
+    def open(cls, path):
+        """
+        save() 로 저장한 피드를 메모리 매핑으로 열기 (DataFrame 컬럼이 파일 view 라 복사 없음, 읽기 전용)
+        """
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        feed = cls.__new__(cls)
+        feed.symbol = meta["symbol"]
+        feed.timeframes = meta["timeframes"]
+        feed.indicators = None
+        feed.window = meta["window"]
+        feed.base_step = meta["base_step"]
+        feed.steps = np.load(os.path.join(path, "steps.npy"), mmap_mode="r")
+        feed.frames = {}
+        feed.close_times = {}
+        feed.ends = {}
+        for timeframe in feed.timeframes:
+            feed.close_times[timeframe] = np.load(os.path.join(path, f"{timeframe}_close_times.npy"), mmap_mode="r")
+            feed.ends[timeframe] = np.load(os.path.join(path, f"{timeframe}_ends.npy"), mmap_mode="r")
+            columns = {}
+            for i, col in enumerate(meta["columns"][timeframe]):
+                values = np.load(os.path.join(path, f"{timeframe}_{i}.npy"), mmap_mode="r")
+                columns[col] = values.view("datetime64[ns]") if col == "Open Time" else values
+            feed.frames[timeframe] = pd.DataFrame(columns, copy=False)
+        return feed
+
+    def subset(self, lo, hi):
+        """
+        스텝 lo~hi(미포함) 구간만 재생하는 피드. frames(지표 포함)는 그대로 공유하고 스텝 인덱스만 자름.
+        """
+        feed = copy.copy(self)
+        feed.steps = self.steps[lo:hi]
+        feed.ends = {timeframe: ends[lo:hi] for timeframe, ends in self.ends.items()}
+        return feed
+
+    def __len__(self):
+        return len(self.steps)
+
+    def _views(self, i):
+        data_dict = {}
+        for timeframe in self.timeframes:
+            end = int(self.ends[timeframe][i])
+            data_dict[timeframe] = self.frames[timeframe].iloc[max(0, end - self.window):end]
+        return data_dict
+
+    def data_at(self, open_time_ms):
+        """
+        기준 캔들(open_time_ms)이 마감된 시점의 data_dict.
+        각 타임프레임에서 마감 시각이 현재 시각 이하인 마지막 window 개 행.
+        """
+        now = to_ms(open_time_ms) + self.base_step
+        data_dict = {}
+        for timeframe in self.timeframes:
+            end = int(np.searchsorted(self.close_times[timeframe], now, side="right"))
+            data_dict[timeframe] = self.frames[timeframe].iloc[max(0, end - self.window):end]
+        return data_dict
+
+    def __iter__(self):
+        for i, open_time_ms in enumerate(self.steps):
+            yield pd.Timestamp(int(open_time_ms), unit="ms"), self._views(i)
@@ -0,0 +1,269 @@
+"""
+전략 파라미터 스윕.
+
+손절/익절, MACD 기간, RSI 기준 등을 바꿔 가며 백테스트를 여러 번 돌려야 할 때
+utils.MACD_signal 을 고쳐서 backtester() 를 한 번씩 다시 돌리는 대신,
+파라미터 그리드(또는 랜덤 탐색 공간)를 받아 ProcessPoolExecutor 로 코어 수만큼 동시에 실행함.
+
+  - 캔들/지표는 부모 프로세스에서 ReplayFeed 로 한 번만 계산해 컬럼별 .npy 로 저장하고,
+    각 워커는 시작할 때 한 번 ReplayFeed.open() 으로 메모리 매핑해서 공유 (워커마다 다시 읽거나 계산하지 않음)
+  - MACD 기간(macd_fast/macd_slow/macd_signal)을 바꾸는 설정만 워커에서 MACD 컬럼을 다시 계산하며,
+    같은 기간 설정끼리 이어서 실행되도록 정렬해서 제출함
+  - 나머지 파라미터는 Strategy(params=...) 로 MACD_signal 에 전달 (키는 src.utils.MACD_SIGNAL_PARAMS 참고)
+  - 결과(수익률, MDD, 거래 수)는 하나의 DataFrame(CSV) 으로 모음
+  - vectorized=True (--vectorized) 면 각 설정을 replay 대신 vectorized.vectorized_backtest 로 실행 (결과 동일, 훨씬 빠름)
+
+사용 예:
+    python backtester/sweep.py BTC "2024-01-01 00:00:00" "2024-07-01 00:00:00" \
+        --param stop_loss=0.95,0.97,0.99 --param take_profit=1.05,1.1,1.2 --param macd_fast=8,12
+    python backtester/sweep.py BTC "2024-01-01 00:00:00" "2024-07-01 00:00:00" \
+        --param rsi_sell=65,70,75,80 --param stop_loss=0.9:0.99 --samples 300
+"""
+
+import sys
+import os
+
+# 프로젝트 루트 디렉토리의 절대 경로를 구함
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+import argparse
+import contextlib
+import copy
+import itertools
+import random
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from src import indicators
+from src import indicator_registry
+from src.strategy import Strategy
+from backtester.backtest_engine import BacktestEngine, LOG_QUIET
+from backtester.backtester import replay
+from backtester.replay_feed import ReplayFeed
+from backtester.vectorized import vectorized_backtest
+
+# 지표 계산에 쓰이는 파라미터 (나머지는 MACD_signal 파라미터)
+MACD_PERIOD_KEYS = ("macd_fast", "macd_slow", "macd_signal")
+DEFAULT_MACD_PERIODS = (12, 26, 9)
+
+
+def param_grid(grid):
+    """
+    {"stop_loss": [0.95, 0.97], "take_profit": [1.05, 1.1]} -> 모든 조합의 설정 리스트
+    """
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[key] for key in keys))]
+
+
+def random_space(space, samples, seed=None):
+    """
+    space 에서 samples 개 설정을 무작위로 뽑음.
+    값이 리스트면 그중 하나를 고르고, (low, high) 튜플이면 구간에서 균등하게 뽑음 (둘 다 정수면 정수).
+    """
+    rng = random.Random(seed)
+    configs = []
+    for _ in range(samples):
+        config = {}
+        for key, values in space.items():
+            if isinstance(values, tuple):
+                low, high = values
+                if isinstance(low, int) and isinstance(high, int):
+                    config[key] = rng.randint(low, high)
+                else:
+                    config[key] = rng.uniform(low, high)
+            else:
+                config[key] = rng.choice(list(values))
+        configs.append(config)
+    return configs
+
+
+def _macd_periods(config):
+    return tuple(config.get(key, default) for key, default in zip(MACD_PERIOD_KEYS, DEFAULT_MACD_PERIODS))
+
+
+# -------------------------
+#     워커
+# -------------------------
+_worker = {}
+
+
+def _init_worker(feed_path, initial_balance, vectorized=False):
+    # 워커 프로세스마다 한 번: 공유 피드를 메모리 매핑으로 열어 둠
+    _worker["feed"] = ReplayFeed.open(feed_path)
+    _worker["initial_balance"] = initial_balance
+    _worker["vectorized"] = vectorized
+    _worker["macd"] = (DEFAULT_MACD_PERIODS, _worker["feed"])
+
+
+def _feed_for(periods):
+    """
+    MACD 기간이 기본값과 다르면 MACD 컬럼만 다시 계산한 피드 (나머지 컬럼은 공유 배열 그대로).
+    직전 설정과 기간이 같으면 재사용.
+    """
+    cached_periods, cached_feed = _worker["macd"]
+    if periods == cached_periods:
+        return cached_feed
+    base = _worker["feed"]
+    feed = copy.copy(base)
+    feed.frames = {
+        timeframe: indicators.macd(frame.copy(deep=False), *periods)
+        for timeframe, frame in base.frames.items()
+    }
+    _worker["macd"] = (periods, feed)
+    return feed
+
+
+def _run_config(config, span=None):
+    """
+    config 설정으로 백테스트. span=(lo, hi) 면 피드의 스텝 lo~hi 구간만 실행 (walk-forward 구간 등)
+    """
+    feed = _feed_for(_macd_periods(config))
+    if span is not None:
+        feed = feed.subset(*span)
+    signal_params = {key: value for key, value in config.items() if key not in MACD_PERIOD_KEYS}
+
+    started = time.time()
+    if _worker.get("vectorized"):
+        engine = vectorized_backtest(feed, signal_params, initial_balance=_worker["initial_balance"])
+    else:
+        strategy = Strategy(params=signal_params)
+        # 워커에서는 전략/체결 로그를 출력하지 않음
+        engine = BacktestEngine(initial_balance=_worker["initial_balance"], log_level=LOG_QUIET)
+        replay(feed, strategy, engine, feed.symbol, report_interval=None)
+
+    base = feed.frames[feed.timeframes[0]]
+    last_price = float(base["Close"].iloc[int(feed.ends[feed.timeframes[0]][-1]) - 1]) if len(feed) else 0.0
+    total_value = engine.get_total_value(last_price)
+    return {
+        **config,
+        "return": (total_value - engine.initial_balance) / engine.initial_balance * 100,
+        "mdd": engine.get_mdd(),
+        "trades": len(engine.trade_history),
+        "final_value": total_value,
+        "seconds": time.time() - started,
+    }
+
+
+# -------------------------
+#     스윕 실행
+# -------------------------
+@contextlib.contextmanager
+def worker_pool(feed, max_workers=None, initial_balance=100000, work_dir=None, vectorized=False):
+    """
+    feed 를 work_dir 에 한 번 저장하고, 그 파일을 메모리 매핑해 둔 워커 프로세스 풀을 열어 줌.
+    with 블록 안에서 run_jobs() 를 여러 번 호출해도 피드는 다시 저장/계산하지 않음.
+    vectorized=True 면 워커가 replay 대신 vectorized_backtest 로 백테스트함.
+    """
+    own_dir = work_dir is None
+    work_dir = work_dir or tempfile.mkdtemp(prefix="sweep_")
+    feed.save(work_dir)
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(work_dir, initial_balance, vectorized)) as pool:
+            yield pool
+    finally:
+        if own_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def run_jobs(pool, jobs):
+    """
+    jobs: [(config, span, extra), ...]  (span=None 이면 전체 구간, extra 는 결과 행에 그대로 붙일 dict)
+    실패한 작업은 error 컬럼에 오류 메시지를 남김. 결과 행 리스트 반환.
+    """
+    # 같은 MACD 기간 설정끼리 이어서 실행되도록 정렬
+    jobs = sorted(jobs, key=lambda job: _macd_periods(job[0]))
+    futures = {pool.submit(_run_config, config, span): (config, extra) for config, span, extra in jobs}
+    rows = []
+    for done, future in enumerate(as_completed(futures), 1):
+        config, extra = futures[future]
+        try:
+            row = {**extra, **future.result()}
+            print(f"[{done}/{len(jobs)}] {extra or ''}{config} -> 수익률 {row['return']:.2f}% | "
+                  f"MDD {row['mdd']:.2f}% | 거래 {row['trades']}건")
+        except Exception as e:
+            row = {**extra, **config, "error": str(e)}
+            print(f"[{done}/{len(jobs)}] {extra or ''}{config} 백테스트 중 오류 발생: {e}")
+        rows.append(row)
+    return rows
+
+
+def sweep(feed, configs, max_workers=None, initial_balance=100000, work_dir=None, vectorized=False):
+    """
+    configs(설정 dict 리스트)를 max_workers(기본: CPU 코어 수) 개 프로세스로 나눠 백테스트.
+    수익률 내림차순 DataFrame 반환 (실패한 설정은 error 컬럼에 오류 메시지).
+    """
+    started = time.time()
+    with worker_pool(feed, max_workers, initial_balance, work_dir, vectorized) as pool:
+        rows = run_jobs(pool, [(config, None, {}) for config in configs])
+
+    print(f"스윕 완료: {len(configs)}개 설정, {time.time() - started:.1f}초")
+    results = pd.DataFrame(rows)
+    if "return" in results:
+        results = results.sort_values("return", ascending=False, na_position="last").reset_index(drop=True)
+    return results
+
+
+def _parse_value(text):
+    for cast in (int, float):
+        try:
+            return cast(text)
+        except ValueError:
+            pass
+    return text
+
+
+def parse_param(text):
+    """
+    "stop_loss=0.95,0.97" -> ("stop_loss", [0.95, 0.97])
+    "stop_loss=0.9:0.99"  -> ("stop_loss", (0.9, 0.99))  (랜덤 탐색 구간)
+    """
+    key, _, values = text.partition("=")
+    if ":" in values:
+        low, high = values.split(":", 1)
+        return key, (_parse_value(low), _parse_value(high))
+    return key, [_parse_value(value) for value in values.split(",")]
+
+
+if __name__ == "__main__":
+    from binance.client import Client
+    from src.config import Config
+    from backtester.kline_archive import KlineArchive
+
+    parser = argparse.ArgumentParser(description="전략 파라미터 스윕 (멀티 프로세스)")
+    parser.add_argument("symbol", help="심볼 (예: BTC)")
+    parser.add_argument("start", help="시작 시각 (예: '2024-01-01 00:00:00')")
+    parser.add_argument("end", help="종료 시각")
+    parser.add_argument("--param", action="append", default=[],
+                        help="key=v1,v2,... (그리드) 또는 key=low:high (랜덤 탐색 구간), 여러 번 지정 가능")
+    parser.add_argument("--samples", type=int, default=0, help="0보다 크면 그리드 대신 랜덤 탐색으로 이 개수만큼 실행")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument("--vectorized", action="store_true", help="replay 대신 벡터화 백테스트로 실행")
+    parser.add_argument("--output", default="sweep_results.csv")
+    args = parser.parse_args()
+
+    space = dict(parse_param(text) for text in args.param)
+    if args.samples > 0:
+        configs = random_space(space, args.samples, args.seed)
+    else:
+        if any(isinstance(values, tuple) for values in space.values()):
+            parser.error("low:high 구간은 --samples 와 함께 사용해야 합니다.")
+        configs = param_grid(space)
+
+    config = Config()
+    client = Client(config.binance_access_key, config.binance_secret_key)
+    strategy = Strategy()
+    window = indicator_registry.window_length(strategy.required_indicators, strategy.history_length)
+    feed = ReplayFeed(KlineArchive(), args.symbol, args.start, args.end,
+                      indicators=strategy.required_indicators, window=window, client=client)
+
+    results = sweep(feed, configs, max_workers=args.workers, vectorized=args.vectorized)
+    results.to_csv(args.output, index=False)
+    print(results.head(20).to_string())
+    print(f"📁 스윕 결과 저장 완료: {args.output}")
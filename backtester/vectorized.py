@@ -0,0 +1,296 @@
+"""
+벡터화 백테스트.
+
+replay() 는 1분봉 스텝마다 Strategy.signal(dict/DataFrame 조회) 과 BacktestEngine.execute_trade 를 호출하지만,
+여기서는
+  1) MACD_signal 의 상태와 무관한 조건(SMA 배열 순서, MACD 부호, 직전 5봉 MACD 교차, RSI)을
+     전체 기간에 대해 한 번에 배열로 계산하고 (signal_arrays)
+  2) 진입가/보유 수량/profit_sell 에 따라 달라지는 부분과 BacktestEngine 의 단계별 매수/매도, 수수료,
+     손절/익절, MDD 계산은 배열 위의 단순한 루프로 처리함 (simulate)
+포지션이 없을 때는 매수 신호가 나오는 다음 스텝으로 바로 건너뜀.
+
+결과(trade_history, 잔고, 보유 수량, MDD)는 replay() + BacktestEngine 과 같으며, simulate() 는 값이 채워진
+BacktestEngine 을 돌려주므로 get_trade_history/save_trade_history 를 그대로 사용할 수 있음.
+MACD_signal 이나 BacktestEngine.execute_trade 를 고치면 이 모듈도 같이 고쳐야 함.
+"""
+
+import sys
+import os
+
+# 프로젝트 루트 디렉토리의 절대 경로를 구함
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+import numpy as np
+import pandas as pd
+
+from src.utils import MACD_SIGNAL_PARAMS
+from backtester.backtest_engine import BacktestEngine
+
+# 추세 분기 결과 코드
+HOLD, BUY, SELL = 0, 1, 2
+
+CONDITION_REASON = "신호 조건 미충족"
+MA_REASON = "이동평균선 배치가 명확하지 않음"
+
+
+def signal_arrays(feed, timeframe="5m", params=None):
+    """
+    feed(ReplayFeed)의 모든 스텝에 대해 MACD_signal 이 보는 timeframe 값과 상태 무관 조건을 배열로 계산.
+    각 스텝의 값은 그 시점 data_dict[timeframe] 의 마지막 행 (= 마지막 마감 캔들).
+    params["trend_enabled"] 가 False 면 MACD_signal 과 같이 추세 분기를 끔
+    """
+    params = {**MACD_SIGNAL_PARAMS, **(params or {})}
+    frame = feed.frames[timeframe]
+    ends = np.asarray(feed.ends[timeframe], dtype=np.int64)
+    rows = ends - 1
+    rows_in_window = np.minimum(ends, feed.window)
+
+    close = frame["Close"].to_numpy(dtype=float)
+    macd = frame["MACD"].to_numpy(dtype=float)
+    sma20 = frame["SMA_20"].to_numpy(dtype=float)[rows]
+    sma60 = frame["SMA_60"].to_numpy(dtype=float)[rows]
+    sma120 = frame["SMA_120"].to_numpy(dtype=float)[rows]
+
+    # 직전 5봉(최신 봉 제외) MACD 최소/최대. 창에 6봉이 안 되면 직전 1봉
+    macd_series = pd.Series(macd)
+    prev_min = macd_series.rolling(5).min().shift(1).to_numpy()
+    prev_max = macd_series.rolling(5).max().shift(1).to_numpy()
+    prev_one = macd_series.shift(1).to_numpy()
+    short = rows_in_window < 6
+    prev_min = np.where(short, prev_one[rows], prev_min[rows])
+    prev_max = np.where(short, prev_one[rows], prev_max[rows])
+
+    macd_curr = macd[rows]
+    ma_up = (sma20 > sma60) & (sma60 > sma120)
+    ma_down = (sma120 > sma60) & (sma60 > sma20)
+    # SMA20 과 SMA60 이 매우 가까우면 (횡보) 추세 없음
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sideways = np.abs(np.log(sma20) - np.log(sma60)) <= 0.0005
+    ma_up &= ~sideways
+    ma_down &= ~sideways
+    if not params["trend_enabled"]:
+        ma_up = np.zeros_like(ma_up)
+        ma_down = np.zeros_like(ma_down)
+
+    # 상승추세: 롱 진입(매수) / 청산(매도) 가중치
+    up_buy = np.where(macd_curr > 0, 2, 0) + np.where((prev_min < 0) & (macd_curr > 0), 3, 0)
+    up_sell = np.where(macd_curr < 0, 5, 0)
+    # 하락추세: 숏 진입(현물 매도) / 청산(현물 매수) 가중치
+    down_sell = 1 + np.where(macd_curr < 0, 2, 0) + np.where((prev_max > 0) & (macd_curr < 0), 2, 0)
+    down_buy = np.where(macd_curr > 0, 5, 0)
+
+    return {
+        "price": close[rows],
+        "rsi": frame["rsi"].to_numpy(dtype=float)[rows],
+        "ma_up": ma_up,
+        "ma_down": ma_down,
+        "up_buy": up_buy,
+        "up_sell": up_sell,
+        "down_buy": down_buy,
+        "down_sell": down_sell,
+        "times": np.asarray(feed.steps),
+    }
+
+
+def _trend_signal(i, ma_up, ma_down, up_buy, up_sell, down_buy, down_sell, profit_sell):
+    """
+    MACD_signal 의 추세 분기 (현물). (signal, weight, reason)
+    """
+    if ma_up[i]:
+        buy_weight, sell_weight = up_buy[i], up_sell[i]
+        reason_buy = ", MACD 양수 +2" if buy_weight >= 2 else ""
+        if buy_weight in (3, 5):
+            reason_buy += ", MACD 상향돌파 +3"
+        reason_sell = "MACD 음수 +5" if sell_weight else ""
+        if buy_weight >= 3 or sell_weight >= 2:
+            if buy_weight >= sell_weight and (not profit_sell or buy_weight >= 4):
+                return "buy", buy_weight, reason_buy
+            return "sell", sell_weight, reason_sell
+        return "hold", 0, CONDITION_REASON
+    if ma_down[i]:
+        sell_weight, buy_weight = down_sell[i], down_buy[i]
+        reason_sell = "하락추세: 기본 +1"
+        if sell_weight >= 3:
+            reason_sell += ", MACD 음수 +2"
+        if sell_weight == 5:
+            reason_sell += ", MACD 하향돌파 +2"
+        reason_buy = "MACD 양수 +5" if buy_weight else ""
+        if sell_weight >= 3 or buy_weight >= 2:
+            if sell_weight >= buy_weight and (not profit_sell or sell_weight >= 4):
+                return "sell", sell_weight, reason_sell
+            return "buy", buy_weight, reason_buy
+        return "hold", 0, CONDITION_REASON
+    return "hold", 0, MA_REASON
+
+
+def simulate(arrays, params=None, initial_balance=100000, trading_fee=0.0004, engine=None):
+    """
+    signal_arrays() 결과로 BacktestEngine.execute_trade 와 같은 규칙의 체결을 시뮬레이션.
+    trade_history/잔고/MDD 가 채워진 BacktestEngine 반환 (로그 출력 없음)
+    """
+    params = {**MACD_SIGNAL_PARAMS, **(params or {})}
+    engine = engine or BacktestEngine(initial_balance=initial_balance, trading_fee=trading_fee)
+    fee = engine.trading_fee
+    stop_loss_param = params["stop_loss"]
+    take_profit_param = params["take_profit"]
+    profit_sell_rate = params["profit_sell_rate"]
+    rsi_sell = params["rsi_sell"]
+    rsi_strong_sell = params["rsi_strong_sell"]
+    rsi_sell_profit = params["rsi_sell_profit"]
+    max_loss_rate = params["max_loss_rate"]
+    profit_reason = f"수익률 {profit_sell_rate}% 돌파"
+    rsi_reason = f"RSI {rsi_sell} 돌파"
+    rsi_strong_reason = f"RSI {rsi_strong_sell} 돌파"
+
+    # numpy 스칼라보다 파이썬 리스트 인덱싱이 빠름
+    prices = arrays["price"].tolist()
+    rsi = arrays["rsi"].tolist()
+    ma_up = arrays["ma_up"].tolist()
+    ma_down = arrays["ma_down"].tolist()
+    up_buy = arrays["up_buy"].tolist()
+    up_sell = arrays["up_sell"].tolist()
+    down_buy = arrays["down_buy"].tolist()
+    down_sell = arrays["down_sell"].tolist()
+    trend = (ma_up, ma_down, up_buy, up_sell, down_buy, down_sell)
+
+    # 포지션이 없을 때 의미 있는 신호는 추세 분기의 매수뿐 (profit_sell 은 보유 수량 0이면 False)
+    flat_buy = np.flatnonzero(
+        (arrays["ma_up"] & (arrays["up_buy"] >= 3) & (arrays["up_buy"] >= arrays["up_sell"]))
+        | (arrays["ma_down"] & ((arrays["down_sell"] >= 3) | (arrays["down_buy"] >= 2)) & (arrays["down_sell"] < arrays["down_buy"]))
+    )
+
+    balance = engine.balance
+    total_capital = engine.total_capital
+    peak_balance = engine.peak_balance
+    max_drawdown = engine.max_drawdown
+    position = None
+    entry_price = None
+    current_weight = 0
+    total_holdings = 0.0
+    entry_stop_loss = None
+    entry_take_profit = None
+    profit_sell = False
+    trade_history = engine.trade_history
+
+    n = len(prices)
+    i = 0
+    while i < n:
+        if position is None and total_holdings == 0:
+            # 다음 매수 신호까지 건너뜀 (그 사이에는 체결도 평가 자산 변화도 없음)
+            k = int(np.searchsorted(flat_buy, i))
+            if k == len(flat_buy):
+                break
+            i = int(flat_buy[k])
+
+        current_price = prices[i]
+
+        # ---- MACD_signal ----
+        if total_holdings == 0:
+            profit_sell = False
+        if entry_price is None or entry_price == 0:
+            profit_rate = 0
+        else:
+            profit_rate = ((current_price - entry_price) / entry_price) * 100
+
+        signal, weight, reason = _trend_signal(i, *trend, profit_sell)
+        if profit_rate > profit_sell_rate and not profit_sell:
+            signal, weight, reason = "sell", 2, profit_reason
+            profit_sell = True
+        rsi_curr = rsi[i]
+        if rsi_curr > rsi_sell and profit_rate > rsi_sell_profit:
+            signal, weight, reason = "sell", 3, rsi_reason
+            if rsi_curr > rsi_strong_sell:
+                weight, reason = 5, rsi_strong_reason
+        if profit_rate < max_loss_rate:
+            signal, weight = "sell", 5
+
+        # ---- BacktestEngine.execute_trade ----
+        trade_type = "TRADE"
+        if position == "long":
+            stop_loss = entry_stop_loss
+            take_profit = entry_take_profit
+        else:
+            stop_loss = stop_loss_param
+            take_profit = take_profit_param
+        signal_weight = weight
+        trade_ratio = signal_weight / 5
+        if current_weight == 0:
+            total_capital = balance
+
+        if position == "long":
+            if current_price <= entry_price * stop_loss:
+                signal, trade_type, signal_weight = "sell", "STOP_LOSS", 5
+            elif current_price >= entry_price * take_profit:
+                signal, trade_type, signal_weight = "sell", "TAKE_PROFIT", 5
+
+        if signal == "buy":
+            if signal_weight > current_weight:
+                max_buy_amount = balance / (current_price * (1 + fee))
+                buy_amount = (total_capital * (trade_ratio - current_weight / 5)) / current_price
+                buy_amount = min(max_buy_amount, buy_amount)
+                if buy_amount < 0.00001:
+                    # 잔고 부족: execute_trade 처럼 MDD 갱신 없이 반환
+                    i += 1
+                    continue
+
+                total_holdings += buy_amount
+                balance -= buy_amount * current_price * (1 + fee)
+                current_weight = signal_weight
+                position = "long"
+                entry_stop_loss = stop_loss_param
+                entry_take_profit = take_profit_param
+                if entry_price is not None:
+                    total_quantity = total_holdings + buy_amount
+                    entry_price = (entry_price * total_holdings + current_price * buy_amount) / total_quantity
+                else:
+                    entry_price = current_price
+                trade_history.append(trade_type, current_price, buy_amount, current_weight, None,
+                                     reason, entry_stop_loss, entry_take_profit)
+
+        elif signal == "sell" and entry_price is not None:
+            if position == "long" and current_weight > 0 and signal_weight > 0:
+                sell_weight = min(current_weight, signal_weight)
+                sell_amount = max(total_holdings * (sell_weight / current_weight), 0.00001)
+                if sell_amount > total_holdings:
+                    sell_amount = total_holdings
+                total_holdings -= sell_amount
+                profit = (current_price - entry_price) / entry_price * 100
+                balance += sell_amount * current_price * (1 - fee)
+                current_weight -= sell_weight
+                trade_history.append(trade_type, current_price, sell_amount, current_weight, profit,
+                                     reason, entry_stop_loss, entry_take_profit)
+                if current_weight == 0:
+                    position = None
+                    entry_price = None
+                    entry_stop_loss = None
+                    entry_take_profit = None
+                    if total_holdings > 0:
+                        balance += total_holdings * current_price * (1 - fee)
+                    total_holdings = 0
+
+        # update_mdd
+        total_value = balance + (total_holdings * current_price * (1 - fee))
+        peak_balance = max(peak_balance, total_value)
+        drawdown = (peak_balance - total_value) / peak_balance
+        max_drawdown = max(max_drawdown, drawdown)
+        i += 1
+
+    engine.balance = balance
+    engine.total_capital = total_capital
+    engine.peak_balance = peak_balance
+    engine.max_drawdown = max_drawdown
+    engine.position = position
+    engine.entry_price = entry_price
+    engine.current_weight = current_weight
+    engine.total_holdings = total_holdings
+    engine.entry_stop_loss = entry_stop_loss
+    engine.entry_take_profit = entry_take_profit
+    return engine
+
+
+def vectorized_backtest(feed, params=None, initial_balance=100000, trading_fee=0.0004):
+    """
+    replay(feed, Strategy(params), BacktestEngine(...)) 와 같은 결과를 배열 연산으로 계산
+    """
+    return simulate(signal_arrays(feed, params=params), params, initial_balance, trading_fee)
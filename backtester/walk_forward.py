@@ -0,0 +1,172 @@
+"""
+Walk-forward 최적화 (표본 외 검증).
+
+backtester() 처럼 고정된 한 구간에서만 보지 않고, 전체 기간을 이동하는 학습(train)/검증(test) 구간으로 나눠서
+  1) 각 학습 구간에서 파라미터 후보를 모두 백테스트해 objective(기본: 수익률)가 가장 좋은 설정을 고르고
+  2) 바로 다음 검증 구간에서 그 설정만 다시 백테스트해 표본 외 성과를 기록함
+
+    |---- train 0 ----|-- test 0 --|
+          |---- train 1 ----|-- test 1 --|
+                |---- train 2 ----|-- test 2 --|        (step 만큼 이동, 기본 step = test)
+
+  - 캔들/지표는 전체 기간에 대해 ReplayFeed 로 한 번만 계산하고, 각 구간은 ReplayFeed.subset() 으로 스텝만 잘라 씀
+  - 서로 독립적인 작업(모든 구간의 학습 백테스트, 모든 구간의 검증 백테스트)은 sweep 워커 풀에서 동시에 실행
+  - 검증 구간은 각각 initial_balance 로 새로 시작하며, 전체 표본 외 수익률은 구간 수익률을 복리로 합친 값
+
+사용 예:
+    python backtester/walk_forward.py BTC "2024-01-01 00:00:00" "2025-01-01 00:00:00" --train 60d --test 14d \
+        --param stop_loss=0.95,0.97,0.99 --param take_profit=1.05,1.1
+"""
+
+import sys
+import os
+
+# 프로젝트 루트 디렉토리의 절대 경로를 구함
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src import indicator_registry
+from src.strategy import Strategy
+from backtester.replay_feed import ReplayFeed
+from backtester.sweep import worker_pool, run_jobs, param_grid, random_space, parse_param
+
+
+def walk_forward_folds(feed, train, test, step=None):
+    """
+    feed 스텝을 학습/검증 구간으로 나눔. train/test/step 은 기간(pd.Timedelta 로 변환 가능한 값).
+    반환: [{"fold", "train_start", "test_start", "test_end", "train": (lo, hi), "test": (lo, hi)}, ...]
+    """
+    train_ms = pd.Timedelta(train) // pd.Timedelta(milliseconds=1)
+    test_ms = pd.Timedelta(test) // pd.Timedelta(milliseconds=1)
+    step_ms = pd.Timedelta(step) // pd.Timedelta(milliseconds=1) if step is not None else test_ms
+    steps = np.asarray(feed.steps)
+    if len(steps) == 0:
+        return []
+
+    folds = []
+    train_start = int(steps[0])
+    last = int(steps[-1])
+    while train_start + train_ms <= last:
+        test_start = train_start + train_ms
+        test_end = test_start + test_ms
+        train_lo, train_hi, test_hi = np.searchsorted(steps, [train_start, test_start, test_end])
+        if test_hi > train_hi:
+            folds.append({
+                "fold": len(folds),
+                "train_start": pd.Timestamp(train_start, unit="ms"),
+                "test_start": pd.Timestamp(test_start, unit="ms"),
+                "test_end": pd.Timestamp(min(test_end, last + feed.base_step), unit="ms"),
+                "train": (int(train_lo), int(train_hi)),
+                "test": (int(train_hi), int(test_hi)),
+            })
+        train_start += step_ms
+    return folds
+
+
+def walk_forward(feed, configs, train, test, step=None, objective="return", max_workers=None,
+                 initial_balance=100000, work_dir=None, vectorized=False):
+    """
+    configs(설정 dict 리스트) 중 각 학습 구간에서 objective 가 가장 큰 설정을 골라 다음 검증 구간에서 평가.
+    반환: (구간별 검증 결과 DataFrame, 전체 학습 결과 DataFrame)
+    """
+    folds = walk_forward_folds(feed, train, test, step)
+    if not folds:
+        raise ValueError("학습/검증 구간을 만들 수 없습니다. 기간 또는 train/test 길이를 확인하세요.")
+
+    configs = configs or [{}]
+    param_keys = set().union(*configs)
+    started = time.time()
+    with worker_pool(feed, max_workers, initial_balance, work_dir, vectorized) as pool:
+        # 1) 모든 구간의 학습 백테스트를 한 번에 제출
+        train_rows = run_jobs(pool, [
+            (config, fold["train"], {"fold": fold["fold"]}) for fold in folds for config in configs
+        ])
+        train_results = pd.DataFrame(train_rows)
+
+        # 2) 구간별 최적 설정으로 검증 백테스트
+        test_jobs = []
+        for fold in folds:
+            candidates = train_results[train_results["fold"] == fold["fold"]]
+            if objective in candidates:
+                candidates = candidates.dropna(subset=[objective])
+            if candidates.empty:
+                print(f"[fold {fold['fold']}] 학습 결과가 없어 검증을 건너뜀")
+                continue
+            best = candidates.loc[candidates[objective].idxmax()]
+            config = {key: _native(best[key]) for key in param_keys if key in best and pd.notna(best[key])}
+            test_jobs.append((config, fold["test"], {
+                "fold": fold["fold"], f"train_{objective}": best[objective],
+            }))
+        test_rows = run_jobs(pool, test_jobs)
+
+    results = pd.DataFrame(test_rows)
+    if not results.empty:
+        fold_info = pd.DataFrame([
+            {key: fold[key] for key in ("fold", "train_start", "test_start", "test_end")} for fold in folds
+        ])
+        results = fold_info.merge(results, on="fold").sort_values("fold").reset_index(drop=True)
+        if "return" in results:
+            compounded = (np.prod(1 + results["return"].dropna() / 100) - 1) * 100
+            print(f"표본 외 누적 수익률: {compounded:.2f}% ({len(results)}개 구간)")
+    print(f"walk-forward 완료: {len(folds)}개 구간 x {len(configs)}개 설정, {time.time() - started:.1f}초")
+    return results, train_results
+
+
+def _native(value):
+    # DataFrame 에서 꺼낸 numpy 값을 설정 dict 용 파이썬 값으로 (정수로 저장된 파라미터 유지)
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+if __name__ == "__main__":
+    from binance.client import Client
+    from src.config import Config
+    from backtester.kline_archive import KlineArchive
+
+    parser = argparse.ArgumentParser(description="Walk-forward 최적화")
+    parser.add_argument("symbol", help="심볼 (예: BTC)")
+    parser.add_argument("start", help="시작 시각 (예: '2024-01-01 00:00:00')")
+    parser.add_argument("end", help="종료 시각")
+    parser.add_argument("--train", default="30d", help="학습 구간 길이 (예: 30d, 12h)")
+    parser.add_argument("--test", default="7d", help="검증 구간 길이")
+    parser.add_argument("--step", default=None, help="구간 이동 간격 (기본: 검증 구간 길이)")
+    parser.add_argument("--param", action="append", default=[],
+                        help="key=v1,v2,... (그리드) 또는 key=low:high (랜덤 탐색 구간), 여러 번 지정 가능")
+    parser.add_argument("--samples", type=int, default=0, help="0보다 크면 그리드 대신 랜덤 탐색으로 이 개수만큼 후보 생성")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--objective", default="return", help="학습 구간에서 최대화할 결과 컬럼")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument("--vectorized", action="store_true", help="replay 대신 벡터화 백테스트로 실행")
+    parser.add_argument("--output", default="walk_forward_results.csv")
+    args = parser.parse_args()
+
+    space = dict(parse_param(text) for text in args.param)
+    if args.samples > 0:
+        configs = random_space(space, args.samples, args.seed)
+    else:
+        if any(isinstance(values, tuple) for values in space.values()):
+            parser.error("low:high 구간은 --samples 와 함께 사용해야 합니다.")
+        configs = param_grid(space)
+
+    config = Config()
+    client = Client(config.binance_access_key, config.binance_secret_key)
+    strategy = Strategy()
+    window = indicator_registry.window_length(strategy.required_indicators, strategy.history_length)
+    feed = ReplayFeed(KlineArchive(), args.symbol, args.start, args.end,
+                      indicators=strategy.required_indicators, window=window, client=client)
+
+    results, _ = walk_forward(feed, configs, args.train, args.test, args.step,
+                              objective=args.objective, max_workers=args.workers,
+                              vectorized=args.vectorized)
+    results.to_csv(args.output, index=False)
+    print(results.to_string())
+    print(f"📁 walk-forward 결과 저장 완료: {args.output}")
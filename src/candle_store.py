@@ -0,0 +1,154 @@
+"""
+고정 용량 링버퍼 캔들 저장소.
+
+(시장, 심볼, 타임프레임)마다 CandleStore 하나를 미리 할당해 두고,
+진행 중인 캔들은 같은 자리에 덮어쓰고(upsert) 새 캔들은 가장 오래된 캔들 자리에 씀.
+update_data 에서 매 루프마다 하던 concat / drop_duplicates / sort_values / reset_index 와
+새 DataFrame 할당이 없어짐.
+
+버퍼는 (컬럼 수, 2 * capacity) 크기로 잡고 같은 값을 pos, pos + capacity 두 곳에 기록함.
+그래서 링버퍼가 한 바퀴 돌아도 [start, start + size) 구간이 항상 연속된 메모리이며,
+arrays() / frame() 은 복사 없이 이 구간의 view를 돌려줌.
+
+주의: view는 다음 upsert 때 내용이 바뀌므로 매 루프마다 새로 받아서 사용해야 함.
+view에 직접 쓰면 두 곳 중 한 곳에만 기록되므로 값 변경은 upsert / set_values / set_column 으로 할 것.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class CandleStore:
+    def __init__(self, columns, capacity=140):
+        self.capacity = capacity
+        self.columns = list(columns)
+        self.col_index = {col: i for i, col in enumerate(self.columns)}
+        self.buffer = np.full((len(self.columns), capacity * 2), np.nan)
+        self.open_times = np.zeros(capacity * 2, dtype="datetime64[ns]")
+        self.start = 0  # 가장 오래된 캔들의 위치 (0 ~ capacity-1)
+        self.size = 0
+
+    @classmethod
+    def from_frame(cls, df, capacity=140, extra_columns=()):
+        """
+        기존 DataFrame(Open Time + 숫자 컬럼)으로 저장소 생성. 마지막 capacity개 행만 보관.
+        """
+        columns = [col for col in df.columns
+                   if col != "Open Time" and pd.api.types.is_numeric_dtype(df[col])]
+        for col in extra_columns:
+            if col not in columns:
+                columns.append(col)
+
+        store = cls(columns, capacity)
+        tail = df.iloc[-capacity:]
+        n = len(tail)
+        store.open_times[:n] = tail["Open Time"].to_numpy(dtype="datetime64[ns]")
+        for col in columns:
+            if col in tail.columns:
+                store.buffer[store.col_index[col], :n] = tail[col].to_numpy(dtype=float)
+        store.buffer[:, capacity:capacity + n] = store.buffer[:, :n]
+        store.open_times[capacity:capacity + n] = store.open_times[:n]
+        store.size = n
+        return store
+
+    def __len__(self):
+        return self.size
+
+    def _write(self, pos, open_time, values):
+        self.open_times[pos] = open_time
+        self.open_times[pos + self.capacity] = open_time
+        for col, value in values.items():
+            i = self.col_index.get(col)
+            if i is None:
+                continue
+            self.buffer[i, pos] = value
+            self.buffer[i, pos + self.capacity] = value
+
+    def _position(self, offset):
+        """
+        논리 위치(0 = 가장 오래된 캔들)를 버퍼 위치로 변환
+        """
+        return (self.start + offset) % self.capacity
+
+    def last_time(self):
+        if self.size == 0:
+            return None
+        return self.open_times[self.start + self.size - 1]
+
+    def find(self, open_time):
+        """
+        open_time 캔들의 논리 위치 (없으면 None). 시간 순 정렬이므로 이진 탐색.
+        """
+        times = self.open_times[self.start:self.start + self.size]
+        offset = int(np.searchsorted(times, open_time))
+        if offset < self.size and times[offset] == open_time:
+            return offset
+        return None
+
+    def upsert(self, open_time, values):
+        """
+        캔들 하나를 반영.
+          - 마지막 캔들과 같은 시각: 그 자리에 덮어씀 (진행 중인 캔들 갱신)
+          - 더 늦은 시각: 새 캔들로 추가 (가득 찼으면 가장 오래된 캔들 자리 재사용)
+          - 더 이른 시각: 저장소 안에 있으면 덮어쓰고, 없으면 무시
+        values에 없는 컬럼(지표 등)은 기존 값을 유지하고, 새 캔들이면 NaN으로 시작함.
+        반환: 반영된 논리 위치 또는 None
+        """
+        open_time = np.datetime64(open_time, "ns")
+        last_time = self.last_time()
+
+        if last_time is not None and open_time <= last_time:
+            offset = self.find(open_time)
+            if offset is None:
+                return None
+            self._write(self._position(offset), open_time, values)
+            return offset
+
+        if self.size < self.capacity:
+            pos = self._position(self.size)
+            self.size += 1
+        else:
+            pos = self.start
+            self.start = (self.start + 1) % self.capacity
+
+        self.buffer[:, pos] = np.nan
+        self.buffer[:, pos + self.capacity] = np.nan
+        self._write(pos, open_time, values)
+        return self.size - 1
+
+    def set_values(self, offset, values):
+        """
+        논리 위치 offset 캔들의 컬럼 값만 갱신 (지표 계산 결과 기록용)
+        """
+        pos = self._position(offset)
+        self._write(pos, self.open_times[pos], values)
+
+    def set_column(self, col, values):
+        """
+        창 전체(가장 오래된 캔들부터 size 개)의 col 값을 한 번에 기록 (배치 지표 계산 결과용).
+        _write 와 같이 pos, pos + capacity 두 곳에 모두 기록함
+        """
+        i = self.col_index[col]
+        positions = (self.start + np.arange(self.size)) % self.capacity
+        values = np.asarray(values, dtype=float)
+        self.buffer[i, positions] = values
+        self.buffer[i, positions + self.capacity] = values
+
+    def times(self):
+        return self.open_times[self.start:self.start + self.size]
+
+    def arrays(self):
+        """
+        {컬럼명: 1차원 view} (복사 없음)
+        """
+        window = self.buffer[:, self.start:self.start + self.size]
+        return {col: window[i] for col, i in self.col_index.items()}
+
+    def frame(self):
+        """
+        Strategy.signal 에 넘길 DataFrame. 숫자 컬럼은 버퍼의 view 이며 Open Time 컬럼만 새로 만듦.
+        """
+        window = self.buffer[:, self.start:self.start + self.size]
+        df = pd.DataFrame(window.T, columns=self.columns, copy=False)
+        df.insert(0, "Open Time", self.times())
+        return df
@@ -20,6 +20,23 @@ class Config():
         self.futures_margin_type = os.getenv("FUTURES_MARGIN_TYPE")
         self.futures_coin_tickers = os.getenv("FUTURES_COIN_TICKERS")
 
+        # kline WebSocket 스트림 사용 여부 및 접속 주소 (선택, 로컬 테스트 서버 등으로 변경 가능)
+        self.websocket_use = os.getenv("WEBSOCKET_USE", "true").lower() == "true"
+        self.stream_url = os.getenv("BINANCE_STREAM_URL", "wss://stream.binance.com:9443")
+        self.futures_stream_url = os.getenv("BINANCE_FUTURES_STREAM_URL", "wss://fstream.binance.com")
+        # REST 접속 주소 (선택, 비우면 실서버. 로컬 모의 거래소 backtester/mock_exchange.py 등)
+        self.api_url = os.getenv("BINANCE_API_URL", "")
+        self.futures_api_url = os.getenv("BINANCE_FUTURES_API_URL", "")
+
+        # 메인 루프에서 동시에 보내는 REST 요청 수 상한
+        self.max_concurrent_requests = int(os.getenv("MAX_CONCURRENT_REQUESTS", "10"))
+
+        # 단계별 지연 시간/API 호출 지표를 노출할 로컬 포트 (/metrics, 0이면 사용 안 함)
+        self.metrics_port = int(os.getenv("METRICS_PORT", "0"))
+
+        # 캔들/지표/매매 단계 상태 스냅샷 주기 (초, 0이면 저장/복원 안 함)
+        self.state_snapshot_interval = float(os.getenv("STATE_SNAPSHOT_INTERVAL", "60"))
+
         print("환경변수 로드 완료")
         
         print("환경변수 검증중...")
@@ -6,12 +6,31 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, project_root)
 
 from src.config import Config
+from src import indicators
+from src import indicator_registry
+from src.indicator_state import IndicatorState
+from src.candle_store import CandleStore
 
 import pandas as pd
 import numpy as np
+
+# 선물 Funding Rate 정산 주기 (8시간)
+FUNDING_INTERVAL_MS = 8 * 60 * 60 * 1000
+
 class Data_Control():
-    def __init__(self):
-        pass
+    def __init__(self, vectorized=True, indicators=None, history_length=1):
+        # vectorized=True 이면 각 지표를 src/indicators.py 의 벡터화 버전으로 계산
+        # (결과는 기존 행 단위 계산과 동일, False로 두면 기존 방식 사용)
+        self.vectorized = vectorized
+        # cal_indicator 에서 계산할 지표 (전략이 사용하는 지표만, 의존 지표는 자동 포함)
+        self.indicators = tuple(indicators) if indicators else indicator_registry.DEFAULT_INDICATORS
+        # 유지할 캔들 수 / 초기 조회 캔들 수 (지표 lookback + 전략이 참조하는 과거 봉 수)
+        self.window_length = indicator_registry.window_length(self.indicators, history_length)
+        self.fetch_length = indicator_registry.fetch_length(self.indicators, history_length)
+        # (symbol, timeframe, futures) -> IndicatorState (실시간 루프용 스트리밍 지표 상태)
+        self.indicator_states = {}
+        # (symbol, timeframe, futures) -> CandleStore (실시간 루프용 링버퍼 캔들 저장소)
+        self.candle_stores = {}
     
     def cal_moving_average(self, df, period=[20, 60, 120]):
         """
@@ -20,6 +39,9 @@ class Data_Control():
         예: period=[20,60,120] -> ma_20, ma_60, ma_120 열 생성/갱신
         """
         
+        if self.vectorized:
+            return indicators.moving_average(df, period)
+
         # 예외 처리
         if 'Close' not in df.columns or df.empty:
             raise ValueError("DataFrame에 'Close' 열이 없거나 데이터가 없습니다.")
@@ -46,7 +68,9 @@ class Data_Control():
         return df
     
     def cal_rsi(self, df, period = 14, signal_period = 14):
-    
+        if self.vectorized:
+            return indicators.rsi(df, period, signal_period)
+
         # 1) rsi / rsi_signal 컬럼이 없으면 만들어 둠
         if 'rsi' not in df.columns:
             df['rsi'] = np.nan
@@ -123,7 +147,9 @@ class Data_Control():
         반환:
         df : pandas DataFrame - 수정된 볼린저 밴드, %b 및 밴드폭 포함
         """
-        
+        if self.vectorized:
+            return indicators.bollinger_band(df, period, num_std)
+
         # 1) 볼린저 및 %b, 밴드폭 컬럼들이 없으면 만들어 둠
         if 'middle_boll' not in df.columns:
             df['middle_boll'] = np.nan
@@ -193,6 +219,8 @@ class Data_Control():
           - 예: obv_slope_from_min = ( current_obv - min_obv_in_p ) / p
         4) 반환: df ( obv, obv_slope_from_max, obv_slope_from_min 컬럼 포함 )
         """
+        if self.vectorized:
+            return indicators.obv(df, price_col, volume_col, obv_col, period_1, period_2)
 
         # ---------------------------
         # 0) 컬럼 준비
@@ -353,6 +381,9 @@ class Data_Control():
         반환:
           df : ATR 컬럼이 추가된 DataFrame.
         """
+        if self.vectorized:
+            return indicators.atr(df, period)
+
         # ATR 컬럼이 없으면 생성
         if 'ATR' not in df.columns:
             df['ATR'] = np.nan
@@ -390,6 +421,9 @@ class Data_Control():
         """
         MACD, MACD Signal, MACD Histogram 계산 함수 (수정 버전)
         """
+        if self.vectorized:
+            return indicators.macd(df, fast_period, slow_period, signal_period)
+
         # MACD 관련 컬럼 생성
         if 'MACD' not in df.columns:
             df['MACD'] = np.nan
@@ -440,6 +474,12 @@ class Data_Control():
         
         주의: 이미 ADX 값이 존재하는 행은 재계산하지 않음.
         """
+        if self.vectorized:
+            # 처음부터 계산하는 경우만 벡터화, 이어서 계산하는 경우는 아래 기존 로직 사용
+            result = indicators.adx(df, period)
+            if result is not None:
+                return result
+
         # ADX 컬럼이 없으면 생성
         if 'ADX' not in df.columns:
             df['ADX'] = np.nan
@@ -553,6 +593,8 @@ class Data_Control():
         반환:
         df : pandas DataFrame - Trend 열에 추세 레벨을 반영하여 반환
         """
+        if self.vectorized:
+            return indicators.trend_check(df)
 
         # MA 트렌드 판별 함수
         def check_ma_trend(sma20, sma60, sma120, rbw, tol_ratio=0.005):
@@ -713,8 +755,9 @@ class Data_Control():
         data = data.sort_values(by="Open Time").reset_index(drop=True)
         
         if futures:
-            # Funding Rate 수집
-            funding_rate = client.futures_funding_rate(symbol=symbol)
+            # Funding Rate 수집 (전체 이력 대신 캔들 구간 + 직전 1회분만)
+            start_time = int(data["Open Time"].iloc[0].value // 10**6) - FUNDING_INTERVAL_MS if len(data) else None
+            funding_rate = client.futures_funding_rate(symbol=symbol, startTime=start_time, limit=1000)
             funding_df = pd.DataFrame(funding_rate)
             funding_df = funding_df.tail(300)  # 최근 300개의 Funding Rate만 유지
             funding_df["fundingRate"] = funding_df["fundingRate"].astype(float)
@@ -729,9 +772,128 @@ class Data_Control():
 
         return data
     
+    def init_candle_store(self, key, data, capacity=None):
+        """
+        초기 데이터로 key = (symbol, timeframe, futures) 의 링버퍼 캔들 저장소를 만들고,
+        저장소 view DataFrame을 반환. 이후 update_data()는 이 저장소에 캔들을 upsert함.
+        capacity 기본값은 window_length.
+        """
+        if capacity is None:
+            capacity = self.window_length
+        state = self.indicator_states.get(key)
+        extra_columns = state.columns if state is not None else ()
+        store = CandleStore.from_frame(data, capacity=capacity, extra_columns=extra_columns)
+        self.candle_stores[key] = store
+        return store.frame()
+
+    @staticmethod
+    def _kline_values(kline):
+        """
+        바이낸스 kline 한 개(list)를 (Open Time, {컬럼: 값})으로 변환
+        """
+        volume = float(kline[5])
+        taker_buy = float(kline[9])
+        values = {
+            "Open": float(kline[1]),
+            "High": float(kline[2]),
+            "Low": float(kline[3]),
+            "Close": float(kline[4]),
+            "Volume": volume,
+            "Taker Buy Base Asset Volume": taker_buy,
+            "Taker Sell Base Asset Volume": volume - taker_buy,
+        }
+        return np.datetime64(int(kline[0]), "ms"), values
+
+    def _upsert_candles(self, store, candles, funding_rate=None):
+        """
+        kline 리스트를 저장소에 upsert. 선물이면 각 캔들 시각 이전의 가장 최근 Funding Rate를 함께 기록.
+        funding_rate 없이 선물 캔들이 들어오면(스트림) 직전 캔들의 Funding Rate를 그대로 이어서 씀.
+        """
+        funding = []
+        if funding_rate:
+            funding = sorted((np.datetime64(int(f["fundingTime"]), "ms"), float(f["fundingRate"])) for f in funding_rate)
+        carry_funding = not funding and "fundingRate" in store.col_index
+
+        for kline in candles:
+            open_time, values = self._kline_values(kline)
+            if funding:
+                rate = np.nan
+                for funding_time, funding_value in funding:
+                    if funding_time <= open_time:
+                        rate = funding_value
+                values["fundingRate"] = rate
+            elif carry_funding and len(store) > 0:
+                values["fundingRate"] = store.arrays()["fundingRate"][-1]
+            store.upsert(open_time, values)
+
+    def apply_klines(self, key, klines):
+        """
+        WebSocket 스트림으로 받은 kline(REST 형식 리스트)들을 key 저장소에 반영하고 view DataFrame 반환
+        """
+        store = self.candle_stores[key]
+        if klines:
+            self._upsert_candles(store, klines)
+        return store.frame()
+
+    def warmup(self, client, symbol, timeframe, futures=False):
+        """
+        초기 데이터 준비: fetch_length 만큼 캔들 조회 -> 지표 계산 -> 스트리밍 지표 상태 초기화
+        -> NaN 행 제거 후 window_length 개만 링버퍼 저장소에 보관. 저장소 view DataFrame 반환.
+        """
+        data = self.data(client, symbol, timeframe, limit=self.fetch_length, futures=futures)
+        return self.init_data((symbol, timeframe, futures), data)
+
+    def init_data(self, key, data):
+        """
+        warmup()의 계산 부분. 조회한 초기 캔들로 지표 계산, 스트리밍 지표 상태/링버퍼 저장소 초기화.
+        key 마다 상태가 따로라서 서로 다른 key 는 여러 스레드에서 동시에 호출해도 됨.
+        """
+        # 각 데이터에 대한 기술적 지표 계산
+        data = self.cal_indicator(data)
+        # 실시간 루프에서 사용할 스트리밍 지표 상태 초기화
+        self.init_indicator_state(key, data)
+
+        # 비어있는 값 제거
+        data = data.dropna()
+
+        # 데이터 길이는 window_length 로 제한. (지표 lookback + 전략 참조 봉 수)
+        if len(data) > self.window_length:
+            data = data.iloc[-self.window_length:].reset_index(drop=True)
+        # 이후 업데이트는 링버퍼 저장소에서 제자리 갱신
+        return self.init_candle_store(key, data)
+
+    def backfill(self, client, symbol, timeframe, futures=False, funding_limit=3):
+        """
+        스트림 연결이 끊겼던 동안의 캔들을 REST로 채움.
+        저장소의 마지막 캔들부터 window_length 개를 요청하고, 그 이상 끊겨 있었다면
+        (스트리밍 지표 상태가 이어질 수 없으므로) warmup()으로 다시 초기화함.
+        """
+        key = (symbol, timeframe, futures)
+        store = self.candle_stores.get(key)
+        if store is None or len(store) == 0:
+            return self.warmup(client, symbol, timeframe, futures)
+
+        pair = f"{symbol}USDT"
+        start_ts = int(store.last_time().astype("datetime64[ms]").astype(np.int64))
+        if futures:
+            candles = client.futures_klines(symbol=pair, interval=timeframe, startTime=start_ts, limit=self.window_length)
+        else:
+            candles = client.get_klines(symbol=pair, interval=timeframe, startTime=start_ts, limit=self.window_length)
+
+        if len(candles) >= self.window_length:
+            print(f"{pair} {timeframe} 끊긴 구간이 너무 길어 초기 데이터를 다시 조회합니다.")
+            return self.warmup(client, symbol, timeframe, futures)
+
+        funding_rate = None
+        if futures and "fundingRate" in store.col_index:
+            funding_rate = client.futures_funding_rate(symbol=pair, limit=funding_limit)
+        self._upsert_candles(store, candles, funding_rate)
+        return store.frame()
+
     def update_data(self, client, symbol, timeframe, existing_data, futures=False, funding_limit=3):
         try:
             # 새 데이터 수집 (3개 캔들 데이터만 요청)
+            key = (symbol, timeframe, futures)
             symbol = f"{symbol}USDT"
             candles = None
             if futures:
@@ -739,6 +901,15 @@ class Data_Control():
             else:
                 candles = client.get_klines(symbol=symbol, interval=timeframe, limit=3)
 
+            # 링버퍼 저장소가 있으면 DataFrame 병합 없이 제자리에서 갱신
+            store = self.candle_stores.get(key)
+            if store is not None:
+                funding_rate = None
+                if futures and "fundingRate" in store.col_index:
+                    funding_rate = client.futures_funding_rate(symbol=symbol, limit=funding_limit)
+                self._upsert_candles(store, candles, funding_rate)
+                return store.frame()
+
             # 새로운 데이터를 DataFrame으로 변환
             temp_data = pd.DataFrame(candles, columns=[
                 "Open Time", "Open", "High", "Low", "Close", "Volume",
@@ -777,8 +948,8 @@ class Data_Control():
             combined_data = pd.concat([existing_data, temp_data]).drop_duplicates(subset="Open Time", keep="last")
             combined_data = combined_data.sort_values(by="Open Time").reset_index(drop=True)
 
-            if len(combined_data) > 140:
-                combined_data = combined_data.iloc[-140:].reset_index(drop=True)
+            if len(combined_data) > self.window_length:
+                combined_data = combined_data.iloc[-self.window_length:].reset_index(drop=True)
 
             return combined_data
             
@@ -786,14 +957,110 @@ class Data_Control():
             print(f"데이터 업데이트 중 오류 발생: {e}")
             return existing_data
         
-    def cal_indicator(self, data):
-        data = self.cal_moving_average(data)
-        data = self.cal_rsi(data)
-        # data = self.cal_bollinger_band(data)
-        # data = self.cal_obv(data)
-        # data = self.LT_trand_check(data)
-        # data = self.cal_atr(data)
-        data = self.cal_macd(data)
-        # data = self.cal_adx(data)
-
-        return data
\ No newline at end of file
+    def cal_indicator(self, data, indicators=None):
+        """
+        지표 계산. indicators(기본: self.indicators)와 그 의존 지표만 의존성 순서대로 계산.
+        사용 가능한 지표 이름은 src/indicator_registry.py 참고.
+        """
+        return indicator_registry.compute(self, data, indicators or self.indicators)
+
+    def init_indicator_state(self, key, data):
+        """
+        초기 데이터(전체 과거 캔들)로 key = (symbol, timeframe, futures) 의 스트리밍 지표 상태를 생성.
+        이후 update_indicator()로 새 캔들만 상수 시간에 반영함.
+        스트리밍 계산이 없는 지표(bollinger, obv, trend)가 포함되어 있으면 만들지 않고 None 반환
+        (update_indicator 가 cal_indicator 로 계산).
+        """
+        if not indicator_registry.is_streaming(self.indicators):
+            return None
+        state = IndicatorState([spec.name for spec in indicator_registry.resolve(self.indicators)])
+        state.seed(data)
+        self.indicator_states[key] = state
+        return state
+
+    def update_indicator(self, key, data):
+        """
+        update_data() 이후 호출. 스트리밍 상태의 미확정 캔들 이후(같은 Open Time 포함) 행만
+        상태에 반영하고 해당 행의 지표 컬럼을 채움. 상태가 없으면 cal_indicator()로 전체 계산.
+        """
+        state = self.indicator_states.get(key)
+        store = self.candle_stores.get(key)
+        if state is None and store is not None:
+            return self._update_store_batch(store)
+        if state is None or data.empty:
+            return self.cal_indicator(data)
+
+        if store is not None:
+            return self._update_store_indicator(state, store)
+
+        for col in state.columns:
+            if col not in data.columns:
+                data[col] = np.nan
+
+        # 뒤에서부터 미확정 캔들 시각 이상인 행만 찾음 (보통 1~3개)
+        open_times = data["Open Time"]
+        start = len(data)
+        while start > 0 and (state.pending_time is None or open_times.iat[start - 1] >= state.pending_time):
+            start -= 1
+
+        # update_data 병합 시 다시 받아온 확정 캔들은 지표값이 비어 있으므로 보관된 값으로 복원
+        check_col = state.columns[0]
+        for i in range(start - 1, max(start - len(state.history), 0) - 1, -1):
+            if not pd.isna(data[check_col].iat[i]):
+                continue
+            values = state.committed_values(open_times.iat[i])
+            if values is not None:
+                index = data.index[i]
+                for col, value in values.items():
+                    data.at[index, col] = value
+
+        for i in range(start, len(data)):
+            bar = {
+                "Open Time": open_times.iat[i],
+                "High": float(data["High"].iat[i]),
+                "Low": float(data["Low"].iat[i]),
+                "Close": float(data["Close"].iat[i]),
+            }
+            values = state.update(bar)
+            if values is None:
+                continue
+            index = data.index[i]
+            for col, value in values.items():
+                data.at[index, col] = value
+
+        return data
+
+    def _update_store_batch(self, store):
+        """
+        스트리밍 상태가 없는 경우: 저장소 창 전체로 cal_indicator 를 계산해 결과 컬럼을 저장소에 다시 기록
+        """
+        frame = self.cal_indicator(store.frame().copy())
+        for col in indicator_registry.output_columns(self.indicators):
+            if col in store.col_index and col in frame.columns:
+                store.set_column(col, frame[col].to_numpy(dtype=float))
+        return store.frame()
+
+    def _update_store_indicator(self, state, store):
+        """
+        update_indicator()의 링버퍼 저장소 버전. 미확정 캔들 이후 캔들만 상태에 반영하고 저장소에 기록.
+        (저장소 upsert는 지표 컬럼을 보존하므로 다시 받아온 확정 캔들의 복원은 필요 없음)
+        """
+        times = store.times()
+        arrays = store.arrays()
+        start = len(store)
+        pending_time = None if state.pending_time is None else np.datetime64(state.pending_time, "ns")
+        while start > 0 and (pending_time is None or times[start - 1] >= pending_time):
+            start -= 1
+
+        for offset in range(start, len(store)):
+            bar = {
+                "Open Time": pd.Timestamp(times[offset]),
+                "High": float(arrays["High"][offset]),
+                "Low": float(arrays["Low"][offset]),
+                "Close": float(arrays["Close"][offset]),
+            }
+            values = state.update(bar)
+            if values is not None:
+                store.set_values(offset, values)
+
+        return store.frame()
\ No newline at end of file
@@ -0,0 +1,182 @@
+"""
+거래 규칙(exchangeInfo) 캐시.
+
+exchangeInfo 응답은 수 MB 크기라 심볼마다 조회하지 않고,
+현물/선물 각각 한 번만 받아 심볼별로 필요한 필터(LOT_SIZE, PRICE_FILTER, MIN_NOTIONAL, MARKET_LOT_SIZE)만
+dict로 색인해 둠. 색인 결과는 디스크(cache/exchange_info_<market>.json)에 저장하고
+TTL 안에는 재시작해도 API를 호출하지 않음. start_refresh()로 백그라운드 주기 갱신.
+캐시 파일에는 조회한 REST 주소도 저장해서, 주소가 다르면(모의 거래소 <-> 실서버) 쓰지 않음.
+캐시에 없는 심볼은 TTL 안이라도 한 번 다시 조회해 봄 (새 상장 등).
+
+get()/load()/refresh() 는 REST 조회로 블로킹될 수 있으므로 이벤트 루프에서는 asyncio.to_thread 등으로
+스레드에서 호출할 것. 루프 안에서는 조회 없이 캐시만 보는 lookup() 을 사용.
+
+get(symbol, futures) 반환 예시 (모든 값 float):
+{
+    "stepSize": 0.00001, "minQty": 0.00001, "maxQty": 9000.0,          # LOT_SIZE
+    "tickSize": 0.01, "minPrice": 0.01, "maxPrice": 1000000.0,          # PRICE_FILTER
+    "minNotional": 5.0,                                                 # MIN_NOTIONAL / NOTIONAL
+    "marketStepSize": 0.0, "marketMinQty": 0.0, "marketMaxQty": 120.0,  # MARKET_LOT_SIZE
+}
+"""
+
+import json
+import os
+import threading
+import time
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+CACHE_DIR = os.path.join(project_root, "cache")
+
+# exchangeInfo 캐시 유효 시간 (초)
+CACHE_TTL = 60 * 60
+
+# 필터 종류별로 꺼낼 값 {filterType: {원본 키: 저장할 키}}
+FILTER_FIELDS = {
+    "LOT_SIZE": {"stepSize": "stepSize", "minQty": "minQty", "maxQty": "maxQty"},
+    "PRICE_FILTER": {"tickSize": "tickSize", "minPrice": "minPrice", "maxPrice": "maxPrice"},
+    # 현물은 NOTIONAL(minNotional), 선물은 MIN_NOTIONAL(notional) 키를 사용
+    "MIN_NOTIONAL": {"minNotional": "minNotional", "notional": "minNotional"},
+    "NOTIONAL": {"minNotional": "minNotional"},
+    "MARKET_LOT_SIZE": {"stepSize": "marketStepSize", "minQty": "marketMinQty", "maxQty": "marketMaxQty"},
+}
+
+
+def index_filters(exchange_info):
+    """
+    exchangeInfo 응답을 {symbol: {필드: float}} 로 변환
+    """
+    symbols = {}
+    for symbol_info in exchange_info.get("symbols", []):
+        fields = {}
+        for filter in symbol_info.get("filters", []):
+            for key, name in FILTER_FIELDS.get(filter["filterType"], {}).items():
+                if key in filter:
+                    fields[name] = float(filter[key])
+        symbols[symbol_info["symbol"]] = fields
+    return symbols
+
+
+class ExchangeInfoCache:
+    def __init__(self, client, cache_dir=CACHE_DIR, ttl=CACHE_TTL):
+        self.client = client
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.symbols = {False: {}, True: {}}   # futures 여부 -> {symbol: 필터}
+        self.updated = {False: 0.0, True: 0.0}
+        # 마지막 갱신 이후 다시 조회해 봤는데도 없던 심볼 (없는 심볼마다 매번 조회하지 않도록)
+        self.missing = {False: set(), True: set()}
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def _cache_path(self, futures):
+        return os.path.join(self.cache_dir, f"exchange_info_{'futures' if futures else 'spot'}.json")
+
+    def _endpoint(self, futures):
+        return getattr(self.client, "FUTURES_URL" if futures else "API_URL", None)
+
+    def _load_disk(self, futures):
+        path = self._cache_path(futures)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if time.time() - cached.get("updated", 0) > self.ttl:
+            return False
+        # 다른 REST 주소(모의 거래소 등)에서 받은 캐시는 심볼 목록이 다르므로 사용하지 않음
+        if cached.get("endpoint") != self._endpoint(futures):
+            return False
+        with self.lock:
+            self.symbols[futures] = cached["symbols"]
+            self.updated[futures] = cached["updated"]
+        return True
+
+    def _save_disk(self, futures):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._cache_path(futures)
+            with self.lock:
+                cached = {"updated": self.updated[futures], "endpoint": self._endpoint(futures),
+                          "symbols": self.symbols[futures]}
+            # 쓰는 도중 종료되어도 기존 파일이 깨지지 않도록 임시 파일에 쓴 뒤 교체
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(cached, f)
+            os.replace(path + ".tmp", path)
+        except OSError as e:
+            print(f"거래 규칙 캐시 저장 실패: {e}")
+
+    def refresh(self, futures=False):
+        """
+        exchangeInfo 를 API로 다시 받아 색인 (시장별 요청 1회)
+        """
+        market = "FUTURES" if futures else "SPOT"
+        try:
+            if futures:
+                exchange_info = self.client.futures_exchange_info()
+            else:
+                exchange_info = self.client.get_exchange_info()
+            symbols = index_filters(exchange_info)
+        except Exception as e:
+            print(f"[{market}] 거래 규칙 조회 중 오류 발생: {e}")
+            return False
+
+        with self.lock:
+            self.symbols[futures] = symbols
+            self.updated[futures] = time.time()
+            self.missing[futures] = set()
+        self._save_disk(futures)
+        print(f"[{market}] 거래 규칙 갱신 완료: {len(symbols)}개 심볼")
+        return True
+
+    def load(self, futures=False):
+        """
+        디스크 캐시가 TTL 이내면 그대로 쓰고, 아니면 API로 조회
+        """
+        if not self._load_disk(futures):
+            self.refresh(futures)
+
+    def is_stale(self, futures=False):
+        return time.time() - self.updated[futures] > self.ttl
+
+    def lookup(self, symbol, futures=False):
+        """
+        캐시에 있는 symbol 의 필터 dict, 없으면 None. API를 호출하지 않으므로 이벤트 루프에서 호출해도 됨
+        """
+        with self.lock:
+            return self.symbols[futures].get(symbol)
+
+    def get(self, symbol, futures=False):
+        """
+        symbol(예: "BTCUSDT")의 필터 dict. 로드되지 않았으면 먼저 로드.
+        캐시에 없으면 한 번 다시 조회하고, 그래도 없으면 None (다음 갱신 전까지는 다시 조회하지 않음)
+        로드/재조회 시 REST 요청을 기다리므로(블로킹) 이벤트 루프에서 직접 호출하지 말 것
+        """
+        if not self.symbols[futures]:
+            self.load(futures)
+        with self.lock:
+            symbol_info = self.symbols[futures].get(symbol)
+            if symbol_info is not None or symbol in self.missing[futures]:
+                return symbol_info
+        if self.refresh(futures):
+            with self.lock:
+                symbol_info = self.symbols[futures].get(symbol)
+                if symbol_info is None:
+                    self.missing[futures].add(symbol)
+        return symbol_info
+
+    def start_refresh(self, interval=None, markets=(False, True)):
+        """
+        백그라운드 스레드에서 interval(기본 TTL)마다 exchangeInfo 갱신
+        """
+        interval = interval or self.ttl
+
+        def run():
+            while True:
+                time.sleep(interval)
+                for futures in markets:
+                    self.refresh(futures)
+
+        self.thread = threading.Thread(target=run, daemon=True)
+        self.thread.start()
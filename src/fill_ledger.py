@@ -0,0 +1,157 @@
+"""
+체결 내역 원장 (SQLite).
+
+get_my_trades 로 최근 500건을 매번 받아 평균 매수가를 다시 계산하던 방식 대신,
+심볼별로 마지막으로 저장한 trade id 이후의 체결만 받아(fromId 커서) 로컬 DB에 쌓고,
+보유 수량과 매수 원가를 누적 갱신해 둠. 평균 매수가는 DB 조회 없이 메모리에서 바로 읽음.
+
+원가 계산 (이동평균법):
+  - 매수: 원가 += 수량 * 가격 (+ 수수료가 USDT면 수수료), 수량 += 체결 수량
+          (수수료를 해당 코인으로 냈으면 그만큼 보유 수량에서 뺌)
+  - 매도: 원가 -= 평균 매수가 * 체결 수량, 수량 -= 체결 수량
+  - 수량이 0 이하가 되면 원가도 0으로 초기화
+"""
+
+import os
+import sqlite3
+import threading
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+LEDGER_PATH = os.path.join(project_root, "cache", "fills.sqlite3")
+
+# get_my_trades 한 번에 받을 최대 체결 수 (API 최대값)
+TRADES_LIMIT = 1000
+
+QUOTE_ASSET = "USDT"
+
+
+class FillLedger:
+    def __init__(self, client, path=LEDGER_PATH):
+        self.client = client
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # main 루프의 스레드 풀에서 호출되므로 연결 하나를 잠금으로 보호해서 공유
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS fills (
+                symbol TEXT NOT NULL,
+                trade_id INTEGER NOT NULL,
+                order_id INTEGER,
+                is_buyer INTEGER NOT NULL,
+                qty REAL NOT NULL,
+                price REAL NOT NULL,
+                commission REAL NOT NULL,
+                commission_asset TEXT,
+                time INTEGER,
+                PRIMARY KEY (symbol, trade_id)
+            );
+            CREATE TABLE IF NOT EXISTS positions (
+                symbol TEXT PRIMARY KEY,
+                quantity REAL NOT NULL,
+                cost REAL NOT NULL,
+                last_trade_id INTEGER NOT NULL
+            );
+            """
+        )
+        self.conn.commit()
+
+        # symbol -> {"quantity", "cost", "last_trade_id"}
+        self.positions = {}
+        for symbol, quantity, cost, last_trade_id in self.conn.execute(
+            "SELECT symbol, quantity, cost, last_trade_id FROM positions"
+        ):
+            self.positions[symbol] = {"quantity": quantity, "cost": cost, "last_trade_id": last_trade_id}
+
+    @staticmethod
+    def _apply(position, trade, base_asset):
+        qty = float(trade["qty"])
+        price = float(trade["price"])
+        commission = float(trade["commission"])
+        commission_asset = trade.get("commissionAsset")
+
+        if trade["isBuyer"]:
+            position["cost"] += qty * price
+            position["quantity"] += qty
+            if commission_asset == QUOTE_ASSET:
+                position["cost"] += commission
+            elif commission_asset == base_asset:
+                position["quantity"] -= commission
+        else:
+            if position["quantity"] > 0:
+                average_price = position["cost"] / position["quantity"]
+                position["cost"] -= average_price * qty
+            position["quantity"] -= qty
+            if commission_asset == base_asset:
+                position["quantity"] -= commission
+
+        if position["quantity"] <= 1e-12:
+            position["quantity"] = 0.0
+            position["cost"] = 0.0
+
+    def sync(self, symbol):
+        """
+        symbol(예: "BTCUSDT")의 새 체결만 받아 원장과 원가 갱신. 추가된 체결 수 반환.
+        처음 호출하면 fromId=0 부터 전체 내역을 페이지 단위로 한 번 받음.
+        """
+        base_asset = symbol[:-len(QUOTE_ASSET)]
+        with self.lock:
+            position = dict(self.positions.get(symbol, {"quantity": 0.0, "cost": 0.0, "last_trade_id": -1}))
+
+        added = 0
+        while True:
+            trades = self.client.get_my_trades(
+                symbol=symbol, fromId=position["last_trade_id"] + 1, limit=TRADES_LIMIT
+            )
+            trades = sorted(
+                (trade for trade in trades if trade["id"] > position["last_trade_id"]),
+                key=lambda trade: trade["id"],
+            )
+            if not trades:
+                break
+
+            rows = []
+            for trade in trades:
+                self._apply(position, trade, base_asset)
+                position["last_trade_id"] = trade["id"]
+                rows.append((
+                    symbol, trade["id"], trade.get("orderId"), int(bool(trade["isBuyer"])),
+                    float(trade["qty"]), float(trade["price"]), float(trade["commission"]),
+                    trade.get("commissionAsset"), trade.get("time"),
+                ))
+
+            with self.lock:
+                self.conn.executemany("INSERT OR IGNORE INTO fills VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO positions VALUES (?, ?, ?, ?)",
+                    (symbol, position["quantity"], position["cost"], position["last_trade_id"]),
+                )
+                self.conn.commit()
+                self.positions[symbol] = dict(position)
+            added += len(rows)
+
+            if len(trades) < TRADES_LIMIT:
+                break
+        return added
+
+    def average_price(self, symbol):
+        """
+        현재 보유분의 평균 매수가 (보유 수량이 없으면 0)
+        """
+        with self.lock:
+            position = self.positions.get(symbol)
+        if not position or position["quantity"] <= 0:
+            return 0
+        return position["cost"] / position["quantity"]
+
+    def quantity(self, symbol):
+        with self.lock:
+            position = self.positions.get(symbol)
+        return position["quantity"] if position else 0.0
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,161 @@
+"""
+지표 레지스트리 / 의존성 해석기.
+
+각 지표가 어떤 컬럼을 입력으로 쓰고(inputs), 어떤 컬럼을 만들며(outputs),
+첫 유효값까지 몇 개의 봉이 필요한지(lookback) 선언해 두고,
+전략이 사용한다고 선언한 지표만 의존성 순서대로 계산함.
+  예) trend(LT_trand_check) -> sma, bollinger 가 먼저 계산되어야 함
+
+lookback 은 "해당 지표의 모든 출력 컬럼이 유효해지는 데 필요한 최소 봉 수".
+EMA 계열(MACD)은 첫 값부터 정의되지만 초기값 영향이 약 0.1% 이하로 줄어드는 봉 수로 정함.
+"""
+
+
+class IndicatorSpec:
+    def __init__(self, name, method, inputs, outputs, lookback, depends=(), params=None):
+        self.name = name
+        self.method = method          # Data_Control 메서드 이름
+        self.inputs = list(inputs)    # 필요한 컬럼
+        self.outputs = list(outputs)  # 생성하는 컬럼
+        self.lookback = lookback      # 첫 유효값까지 필요한 봉 수
+        self.depends = tuple(depends) # 먼저 계산되어야 하는 지표
+        self.params = params or {}
+
+    @property
+    def streaming(self):
+        """
+        실시간 루프에서 IndicatorState 로 상수 시간 갱신이 가능한 지표인지
+        """
+        # indicator_state 가 이 모듈의 DEFAULT_INDICATORS 를 가져가므로 순환 import 를 피해 여기서 import
+        from src.indicator_state import INDICATOR_STATES
+        return self.name in INDICATOR_STATES
+
+
+INDICATORS = {
+    "sma": IndicatorSpec(
+        "sma", "cal_moving_average",
+        inputs=["Close"],
+        outputs=["SMA_20", "SMA_60", "SMA_120"],
+        lookback=120,
+    ),
+    "rsi": IndicatorSpec(
+        "rsi", "cal_rsi",
+        inputs=["Close"],
+        outputs=["rsi", "rsi_signal"],
+        lookback=14 + 14,  # RSI는 14번째 행부터, rsi_signal은 그 후 14개가 쌓여야 함
+    ),
+    "bollinger": IndicatorSpec(
+        "bollinger", "cal_bollinger_band",
+        inputs=["Close"],
+        outputs=["middle_boll", "upper_boll", "lower_boll", "percent_b", "bandwidth"],
+        lookback=20 + 1,
+    ),
+    "obv": IndicatorSpec(
+        "obv", "cal_obv",
+        inputs=["Close", "Volume"],
+        outputs=["obv", "obv_max_5", "obv_min_5", "obv_slope_from_max", "obv_slope_from_min"],
+        lookback=60 + 2,  # period_2 구간 밖의 봉 방향까지 참조
+    ),
+    "trend": IndicatorSpec(
+        "trend", "LT_trand_check",
+        inputs=["SMA_20", "SMA_60", "SMA_120", "bandwidth"],
+        outputs=["trend", "RBW"],
+        lookback=120,  # SMA_120 기준 (RBW의 bandwidth 60봉 평균은 20 + 60 = 80봉)
+        depends=("sma", "bollinger"),
+    ),
+    "atr": IndicatorSpec(
+        "atr", "cal_atr",
+        inputs=["High", "Low", "Close"],
+        outputs=["ATR"],
+        lookback=14,
+    ),
+    "macd": IndicatorSpec(
+        "macd", "cal_macd",
+        inputs=["Close"],
+        outputs=["MACD", "MACD_signal", "MACD_histogram"],
+        lookback=26 * 3 + 9,  # slow EMA 초기값 영향 (25/27)^87 ≈ 0.1%
+    ),
+    "adx": IndicatorSpec(
+        "adx", "cal_adx",
+        inputs=["High", "Low", "Close"],
+        outputs=["ADX"],
+        lookback=14 * 2 + 1,
+    ),
+}
+
+# 기존 Data_Control.cal_indicator 에서 계산하던 지표
+DEFAULT_INDICATORS = ("sma", "rsi", "macd")
+
+# 모든 지표 (backtester/data_loader 의 기존 계산 순서)
+ALL_INDICATORS = ("sma", "rsi", "bollinger", "obv", "trend", "atr", "macd", "adx")
+
+
+def resolve(names):
+    """
+    names 와 그 의존 지표들을 계산 순서대로 정렬한 IndicatorSpec 리스트.
+    """
+    ordered = []
+    visiting = set()
+
+    def visit(name):
+        if name not in INDICATORS:
+            raise ValueError(f"등록되지 않은 지표입니다: {name}")
+        spec = INDICATORS[name]
+        if spec in ordered:
+            return
+        if name in visiting:
+            raise ValueError(f"지표 의존성에 순환이 있습니다: {name}")
+        visiting.add(name)
+        for dep in spec.depends:
+            visit(dep)
+        visiting.discard(name)
+        ordered.append(spec)
+
+    for name in names:
+        visit(name)
+    return ordered
+
+
+def compute(data_control, df, names):
+    """
+    names 에 필요한 지표만 의존성 순서대로 계산.
+    """
+    for spec in resolve(names):
+        df = getattr(data_control, spec.method)(df, **spec.params)
+    return df
+
+
+def output_columns(names):
+    columns = []
+    for spec in resolve(names):
+        columns.extend(spec.outputs)
+    return columns
+
+
+def warmup_length(names):
+    """
+    names 의 모든 출력 컬럼이 유효해지는 데 필요한 봉 수
+    """
+    return max((spec.lookback for spec in resolve(names)), default=1)
+
+
+def window_length(names, history=1):
+    """
+    실시간/백테스트에서 유지할 캔들 수.
+    창 안에서 지표를 다시 계산할 수 있는 길이 + 전략이 참조하는 과거 봉 수(history)
+    """
+    return warmup_length(names) + history
+
+
+def fetch_length(names, history=1):
+    """
+    초기 조회 캔들 수. 앞쪽 (warmup - 1)개 행은 지표가 NaN이라 버려지므로 그만큼 더 받음.
+    """
+    return window_length(names, history) + warmup_length(names) - 1
+
+
+def is_streaming(names):
+    """
+    names 의 지표가 모두 스트리밍 상태(IndicatorState)로 계산 가능한지
+    """
+    return all(spec.streaming for spec in resolve(names))
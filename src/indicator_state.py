@@ -0,0 +1,316 @@
+"""
+실시간 캔들 업데이트용 스트리밍 지표 상태.
+
+(심볼, 타임프레임)마다 IndicatorState 하나를 두고, 새 캔들 또는 아직 진행 중인(갱신되는) 캔들이
+들어올 때마다 이전 봉까지의 누적값(이동합, EMA, Wilder 스무딩)만 이용해 상수 시간에 지표를 계산함.
+계산 규칙은 Data_Control.cal_* (= src/indicators.py) 와 동일함.
+  - SMA / RSI / ATR : period 구간 이동합 (기존 함수와 같이 단순 평균)
+  - MACD            : 0번 봉 종가로 시작하는 EMA
+  - ADX             : 기존 함수와 같은 초기 구간 처리 후 Wilder 스무딩
+
+진행 중인 캔들은 커밋하지 않고 '미확정(pending)' 상태로 두었다가,
+더 늦은 Open Time의 캔들이 들어오는 순간 확정함. 그래서 같은 캔들이 여러 번 갱신되어도 결과가 같음.
+"""
+
+import math
+from collections import deque
+
+import numpy as np
+
+from src.indicator_registry import DEFAULT_INDICATORS
+
+# 이동합 부동소수점 오차 누적을 막기 위해 이 횟수마다 합계를 다시 계산
+RESYNC_INTERVAL = 1000
+
+# 확정된 캔들의 지표값을 최근 몇 개까지 보관할지 (REST로 다시 받아온 직전 캔들 복원용)
+HISTORY_SIZE = 8
+
+
+class _RollingMean:
+    """
+    최근 period-1개의 확정값과 이동합을 유지.
+    peek(x): 미확정 값 x를 포함한 period 구간 평균 (데이터 부족 시 NaN)
+    """
+    def __init__(self, period):
+        self.period = period
+        self.window = deque()
+        self.total = 0.0
+        self.pushes = 0
+
+    def peek(self, x):
+        if len(self.window) < self.period - 1:
+            return np.nan
+        return (self.total + x) / self.period
+
+    def push(self, x):
+        self.window.append(x)
+        self.total += x
+        if len(self.window) > self.period - 1:
+            self.total -= self.window.popleft()
+
+        self.pushes += 1
+        if self.pushes % RESYNC_INTERVAL == 0:
+            self.total = math.fsum(self.window)
+
+
+class SMAState:
+    def __init__(self, periods=(20, 60, 120)):
+        self.windows = {p: _RollingMean(p) for p in periods}
+
+    @property
+    def columns(self):
+        return [f"SMA_{p}" for p in self.windows]
+
+    def step(self, bar):
+        close = bar["Close"]
+        values = {f"SMA_{p}": window.peek(close) for p, window in self.windows.items()}
+        return values, close
+
+    def commit(self, close):
+        for window in self.windows.values():
+            window.push(close)
+
+
+class RSIState:
+    def __init__(self, period=14, signal_period=14):
+        self.period = period
+        self.signal_period = signal_period
+        self.gains = _RollingMean(period)
+        self.losses = _RollingMean(period)
+        self.rsi_window = _RollingMean(signal_period) if signal_period > 0 else None
+        self.prev_close = None
+
+    columns = ["rsi", "rsi_signal"]
+
+    def step(self, bar):
+        close = bar["Close"]
+        if self.prev_close is None:
+            return {"rsi": np.nan, "rsi_signal": np.nan}, (close, None, None, np.nan)
+
+        diff = close - self.prev_close
+        gain = max(diff, 0.0)
+        loss = max(-diff, 0.0)
+        avg_gain = self.gains.peek(gain)
+        avg_loss = self.losses.peek(loss)
+
+        if np.isnan(avg_gain) or np.isnan(avg_loss):
+            rsi_val = np.nan
+        elif avg_loss == 0:
+            rsi_val = 100.0
+        else:
+            rsi_val = 100 - (100 / (1 + avg_gain / avg_loss))
+
+        rsi_signal = np.nan
+        if self.rsi_window is not None and not np.isnan(rsi_val):
+            rsi_signal = self.rsi_window.peek(rsi_val)
+
+        return {"rsi": rsi_val, "rsi_signal": rsi_signal}, (close, gain, loss, rsi_val)
+
+    def commit(self, carry):
+        close, gain, loss, rsi_val = carry
+        self.prev_close = close
+        if gain is not None:
+            self.gains.push(gain)
+            self.losses.push(loss)
+        if self.rsi_window is not None and not np.isnan(rsi_val):
+            self.rsi_window.push(rsi_val)
+
+
+class MACDState:
+    def __init__(self, fast_period=12, slow_period=26, signal_period=9):
+        self.multiplier_fast = 2 / (fast_period + 1)
+        self.multiplier_slow = 2 / (slow_period + 1)
+        self.multiplier_signal = 2 / (signal_period + 1)
+        self.carry = None  # (ema_fast, ema_slow, macd_signal)
+
+    columns = ["MACD", "MACD_signal", "MACD_histogram"]
+
+    def step(self, bar):
+        close = bar["Close"]
+        if self.carry is None:
+            ema_fast = close
+            ema_slow = close
+            macd = 0.0
+            macd_signal = 0.0
+        else:
+            prev_fast, prev_slow, prev_signal = self.carry
+            ema_fast = (close - prev_fast) * self.multiplier_fast + prev_fast
+            ema_slow = (close - prev_slow) * self.multiplier_slow + prev_slow
+            macd = ema_fast - ema_slow
+            macd_signal = (macd - prev_signal) * self.multiplier_signal + prev_signal
+
+        values = {"MACD": macd, "MACD_signal": macd_signal, "MACD_histogram": macd - macd_signal}
+        return values, (ema_fast, ema_slow, macd_signal)
+
+    def commit(self, carry):
+        self.carry = carry
+
+
+def _true_range(bar, prev_close):
+    high, low = bar["High"], bar["Low"]
+    if prev_close is None:
+        return high - low
+    return max(high - low, abs(high - prev_close), abs(low - prev_close))
+
+
+class ATRState:
+    def __init__(self, period=14):
+        self.window = _RollingMean(period)
+        self.prev_close = None
+
+    columns = ["ATR"]
+
+    def step(self, bar):
+        tr = _true_range(bar, self.prev_close)
+        return {"ATR": self.window.peek(tr)}, (bar["Close"], tr)
+
+    def commit(self, carry):
+        self.prev_close, tr = carry
+        self.window.push(tr)
+
+
+class ADXState:
+    """
+    Data_Control.cal_adx 와 같은 순서로 계산:
+      1 ~ period 봉의 TR/+DM/-DM 합계로 초기 DX, period 봉부터 Wilder 스무딩,
+      period*2 봉에서 누적 DX 평균으로 첫 ADX, 이후 (prev*(p-1) + DX) / p
+    """
+    def __init__(self, period=14):
+        self.period = period
+        self.carry = {
+            "index": 0, "high": None, "low": None, "close": None,
+            "sum_tr": 0.0, "sum_plus": 0.0, "sum_minus": 0.0,
+            "sm_tr": 0.0, "sm_plus": 0.0, "sm_minus": 0.0,
+            "dx_sum": 0.0, "dx_count": 0, "adx": np.nan,
+        }
+
+    columns = ["ADX"]
+
+    @staticmethod
+    def _dx(sm_tr, sm_plus, sm_minus):
+        if sm_tr == 0:
+            di_plus = 0
+            di_minus = 0
+        else:
+            di_plus = 100 * (sm_plus / sm_tr)
+            di_minus = 100 * (sm_minus / sm_tr)
+        return 100 * abs(di_plus - di_minus) / (di_plus + di_minus) if (di_plus + di_minus) != 0 else 0
+
+    def step(self, bar):
+        p = self.period
+        c = dict(self.carry)
+        i = c["index"]
+        adx = np.nan
+
+        if i > 0:
+            tr = _true_range(bar, c["close"])
+            up_move = bar["High"] - c["high"]
+            down_move = c["low"] - bar["Low"]
+            plus_dm = up_move if (up_move > down_move and up_move > 0) else 0
+            minus_dm = down_move if (down_move > up_move and down_move > 0) else 0
+
+            if i <= p:
+                c["sum_tr"] += tr
+                c["sum_plus"] += plus_dm
+                c["sum_minus"] += minus_dm
+
+            if i == p:
+                c["sm_tr"], c["sm_plus"], c["sm_minus"] = c["sum_tr"], c["sum_plus"], c["sum_minus"]
+                c["dx_sum"] = self._dx(c["sm_tr"], c["sm_plus"], c["sm_minus"])
+                c["dx_count"] = 1
+
+            if i >= p:
+                c["sm_tr"] = c["sm_tr"] - (c["sm_tr"] / p) + tr
+                c["sm_plus"] = c["sm_plus"] - (c["sm_plus"] / p) + plus_dm
+                c["sm_minus"] = c["sm_minus"] - (c["sm_minus"] / p) + minus_dm
+                dx = self._dx(c["sm_tr"], c["sm_plus"], c["sm_minus"])
+
+                if i <= p * 2:
+                    c["dx_sum"] += dx
+                    c["dx_count"] += 1
+                    if i == p * 2:
+                        adx = c["dx_sum"] / c["dx_count"]
+                else:
+                    adx = (c["adx"] * (p - 1) + dx) / p
+
+        c["index"] = i + 1
+        c["high"], c["low"], c["close"] = bar["High"], bar["Low"], bar["Close"]
+        c["adx"] = adx
+        return {"ADX": adx}, c
+
+    def commit(self, carry):
+        self.carry = carry
+
+
+INDICATOR_STATES = {
+    "sma": SMAState,
+    "rsi": RSIState,
+    "macd": MACDState,
+    "atr": ATRState,
+    "adx": ADXState,
+}
+
+
+class IndicatorState:
+    """
+    (심볼, 타임프레임) 하나의 스트리밍 지표 상태.
+
+    update(bar): bar = {"Open Time", "High", "Low", "Close", ...}
+      - bar의 Open Time이 미확정 캔들과 같으면 해당 캔들을 다시 계산 (갱신)
+      - 더 늦으면 기존 미확정 캔들을 확정하고 새 캔들을 미확정으로 둠
+      - 더 이르면 무시하고 None 반환
+    반환값: {컬럼명: 값}
+    """
+    def __init__(self, indicators=DEFAULT_INDICATORS):
+        self.calculators = [INDICATOR_STATES[name]() for name in indicators]
+        self.pending_time = None
+        self.pending_carries = None
+        self.pending_values = None
+        # 최근 확정된 캔들의 (Open Time, 지표값)
+        self.history = deque(maxlen=HISTORY_SIZE)
+
+    @property
+    def columns(self):
+        cols = []
+        for calc in self.calculators:
+            cols.extend(calc.columns)
+        return cols
+
+    def update(self, bar):
+        open_time = bar["Open Time"]
+        if self.pending_time is not None:
+            if open_time < self.pending_time:
+                return None
+            if open_time > self.pending_time:
+                for calc, carry in zip(self.calculators, self.pending_carries):
+                    calc.commit(carry)
+                self.history.append((self.pending_time, self.pending_values))
+
+        values = {}
+        carries = []
+        for calc in self.calculators:
+            calc_values, carry = calc.step(bar)
+            values.update(calc_values)
+            carries.append(carry)
+
+        self.pending_time = open_time
+        self.pending_carries = carries
+        self.pending_values = values
+        return values
+
+    def committed_values(self, open_time):
+        """
+        최근 확정된 캔들 중 open_time 캔들의 지표값 (없으면 None)
+        """
+        for committed_time, values in reversed(self.history):
+            if committed_time == open_time:
+                return values
+        return None
+
+    def seed(self, df):
+        """
+        과거 캔들 DataFrame을 처음부터 순서대로 흘려 상태를 초기화 (시작 시 한 번만 호출).
+        """
+        for open_time, high, low, close in zip(df["Open Time"], df["High"].to_numpy(dtype=float),
+                                               df["Low"].to_numpy(dtype=float), df["Close"].to_numpy(dtype=float)):
+            self.update({"Open Time": open_time, "High": high, "Low": low, "Close": close})
@@ -0,0 +1,413 @@
+"""
+Data_Control 지표 함수들의 벡터화(batch) 버전.
+
+기존 Data_Control.cal_* 함수들은 df.loc[i, col] 로 한 행씩 읽고 쓰기 때문에
+콜드 스타트(300개 캔들 x 타임프레임 x 심볼)에서 수만 번의 인덱서 호출이 발생함.
+여기서는 같은 규칙(이미 계산된 구간은 유지, 계산 시작 인덱스, 초기값 처리 등)을 그대로 따르면서
+컬럼 전체를 NumPy / pandas rolling, ewm 으로 한 번에 계산함.
+
+모든 함수는 RangeIndex(0..n-1)를 가진 DataFrame을 받아 같은 DataFrame을 반환함.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _last_valid(series):
+    """
+    last_valid_index()를 정수 위치로 반환. 전부 NaN이면 -1.
+    """
+    last_valid = series.last_valid_index()
+    if last_valid is None:
+        return -1
+    return last_valid
+
+
+def _ensure_columns(df, columns):
+    for col in columns:
+        if col not in df.columns:
+            df[col] = np.nan
+
+
+def moving_average(df, period=[20, 60, 120]):
+    """
+    cal_moving_average 벡터화 버전. NaN인 행만 rolling mean 값으로 채움.
+    """
+    if 'Close' not in df.columns or df.empty:
+        raise ValueError("DataFrame에 'Close' 열이 없거나 데이터가 없습니다.")
+
+    close = df['Close']
+    idx = np.arange(len(df))
+    for p in period:
+        col_name = f"SMA_{p}"
+        if col_name not in df.columns:
+            df[col_name] = np.nan
+
+        rolling_mean = close.rolling(p).mean()
+        mask = df[col_name].isna().to_numpy() & (idx >= p - 1)
+        if mask.any():
+            df.loc[mask, col_name] = rolling_mean[mask]
+
+    return df
+
+
+def rsi(df, period=14, signal_period=14):
+    """
+    cal_rsi 벡터화 버전.
+    기존 함수와 동일하게 상승/하락폭의 단순 rolling mean(period)으로 RSI를 계산하고,
+    rsi_signal은 RSI의 rolling mean(signal_period).
+    """
+    _ensure_columns(df, ['rsi', 'rsi_signal'])
+
+    start = _last_valid(df['rsi']) + 1
+    n = len(df)
+    if start >= n:
+        return df
+
+    diff = df['Close'].diff()
+    avg_gain = diff.clip(lower=0).rolling(period).mean().to_numpy()
+    avg_loss = (-diff.clip(upper=0)).rolling(period).mean().to_numpy()
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi_val = 100 - (100 / (1 + avg_gain / avg_loss))
+    rsi_val = np.where(avg_loss == 0, 100.0, rsi_val)
+    rsi_val = np.where(np.isnan(avg_gain) | np.isnan(avg_loss), np.nan, rsi_val)
+
+    idx = np.arange(n)
+    rsi_col = df['rsi'].to_numpy(dtype=float, copy=True)
+    fill = (idx >= start) & (idx >= period) & np.isnan(rsi_col)
+    rsi_col[fill] = rsi_val[fill]
+    df['rsi'] = rsi_col
+
+    if signal_period > 0:
+        signal_val = pd.Series(rsi_col).rolling(signal_period).mean().to_numpy()
+        signal_mask = (idx >= start) & (idx >= signal_period) & ~np.isnan(rsi_col)
+        if signal_mask.any():
+            df.loc[signal_mask, 'rsi_signal'] = signal_val[signal_mask]
+
+    return df
+
+
+def bollinger_band(df, period=20, num_std=2):
+    """
+    cal_bollinger_band 벡터화 버전 (middle/upper/lower, %b, bandwidth).
+    """
+    columns = ['middle_boll', 'upper_boll', 'lower_boll', 'percent_b', 'bandwidth']
+    _ensure_columns(df, columns)
+
+    start = _last_valid(df['middle_boll']) + 1
+    n = len(df)
+    if start >= n:
+        return df
+
+    close = df['Close']
+    window = close.rolling(period)
+    mean_val = window.mean().to_numpy()
+    std_val = window.std().to_numpy()
+    upper_val = mean_val + num_std * std_val
+    lower_val = mean_val - num_std * std_val
+    with np.errstate(divide='ignore', invalid='ignore'):
+        percent_b = (close.to_numpy() - lower_val) / (upper_val - lower_val)
+        bandwidth = ((upper_val - lower_val) / mean_val) * 100
+
+    idx = np.arange(n)
+    already = df[columns].notna().all(axis=1).to_numpy()
+    mask = (idx >= start) & (idx >= period) & ~already
+    if mask.any():
+        df.loc[mask, 'middle_boll'] = mean_val[mask]
+        df.loc[mask, 'upper_boll'] = upper_val[mask]
+        df.loc[mask, 'lower_boll'] = lower_val[mask]
+        df.loc[mask, 'percent_b'] = percent_b[mask]
+        df.loc[mask, 'bandwidth'] = bandwidth[mask]
+
+    return df
+
+
+def obv(df, price_col='Close', volume_col='Volume', obv_col='obv', period_1=5, period_2=60):
+    """
+    cal_obv 벡터화 버전.
+    행별 OBV 증감분(delta)을 한 번에 구한 뒤 누적합(cumsum)으로 OBV를 복원함.
+    period_2 이후 구간의 '가장 오래된 거래량 영향 제거' 규칙도 그대로 적용.
+    """
+    _ensure_columns(df, [obv_col])
+    obv_max_col = f'{obv_col}_max_{period_1}'
+    obv_min_col = f'{obv_col}_min_{period_1}'
+    slope_from_max_col = f'{obv_col}_slope_from_max'
+    slope_from_min_col = f'{obv_col}_slope_from_min'
+    _ensure_columns(df, [obv_max_col, obv_min_col, slope_from_max_col, slope_from_min_col])
+
+    n = len(df)
+    idx = np.arange(n)
+    price = df[price_col].to_numpy(dtype=float)
+    volume = df[volume_col].to_numpy(dtype=float)
+    obv_arr = df[obv_col].to_numpy(dtype=float, copy=True)
+
+    # ---------------------------
+    # 1) OBV 계산
+    # ---------------------------
+    start = _last_valid(df[obv_col]) + 1
+    if start < n:
+        # 종가 방향 (1: 상승, -1: 하락, 0: 보합)
+        direction = np.zeros(n)
+        direction[1:] = np.sign(price[1:] - price[:-1])
+
+        delta = direction * volume
+
+        # period_2 초과 구간: 가장 오래된 봉(i - period_2)의 방향에 따라 거래량 가감
+        if n > period_2 + 1:
+            rolled = np.arange(period_2 + 1, n)
+            oldest_vol = volume[rolled - period_2]
+            oldest_dir = np.sign(price[rolled - period_2] - price[rolled - period_2 - 1])
+            curr_dir = direction[rolled]
+            adjust = np.where(
+                curr_dir > 0,
+                np.where(oldest_dir > 0, -oldest_vol, oldest_vol),
+                np.where(oldest_dir < 0, oldest_vol, -oldest_vol),
+            )
+            adjust = np.where(curr_dir == 0, 0.0, adjust)
+            delta[rolled] += adjust
+
+        if start == 0:
+            base = volume[0]
+            first = 1
+            obv_arr[0] = base
+        else:
+            base = obv_arr[start - 1]
+            first = start
+
+        if first < n:
+            obv_arr[first:] = np.cumsum(np.concatenate(([base], delta[first:])))[1:]
+        df[obv_col] = obv_arr
+
+    # ---------------------------
+    # 2) p개 구간의 OBV 고점/저점 (현재 OBV 제외)
+    # ---------------------------
+    candidate_idx = [i for i in (df[obv_max_col].last_valid_index(), df[obv_min_col].last_valid_index())
+                     if i is not None]
+    start_highlow = min(candidate_idx) + 1 if candidate_idx else 0
+
+    prev_obv = pd.Series(obv_arr).shift(1)
+    obv_max = prev_obv.rolling(period_1).max().to_numpy()
+    obv_min = prev_obv.rolling(period_1).min().to_numpy()
+    already = df[obv_max_col].notna().to_numpy() & df[obv_min_col].notna().to_numpy()
+    mask = (idx >= start_highlow) & (idx >= period_1) & ~np.isnan(obv_arr) & ~already
+    if mask.any():
+        df.loc[mask, obv_max_col] = obv_max[mask]
+        df.loc[mask, obv_min_col] = obv_min[mask]
+
+    # ---------------------------
+    # 3) (고점 - 현재값), (저점 - 현재값) 기울기
+    # ---------------------------
+    candidate_idx_2 = [i for i in (df[slope_from_max_col].last_valid_index(), df[slope_from_min_col].last_valid_index())
+                       if i is not None]
+    start_slope = min(candidate_idx_2) + 1 if candidate_idx_2 else 0
+
+    max_val = df[obv_max_col].to_numpy(dtype=float)
+    min_val = df[obv_min_col].to_numpy(dtype=float)
+    mask = (idx >= start_slope) & ~np.isnan(obv_arr) & ~np.isnan(max_val) & ~np.isnan(min_val)
+    if mask.any():
+        df.loc[mask, slope_from_max_col] = ((max_val - obv_arr) / period_1)[mask]
+        df.loc[mask, slope_from_min_col] = ((min_val - obv_arr) / period_1)[mask]
+
+    return df
+
+
+def true_range(df):
+    """
+    TR = max(High-Low, |High-전봉Close|, |Low-전봉Close|). 0번 행은 High-Low.
+    """
+    high = df['High'].to_numpy(dtype=float)
+    low = df['Low'].to_numpy(dtype=float)
+    close = df['Close'].to_numpy(dtype=float)
+
+    tr = high - low
+    if len(df) > 1:
+        prev_close = close[:-1]
+        tr[1:] = np.maximum.reduce([
+            high[1:] - low[1:],
+            np.abs(high[1:] - prev_close),
+            np.abs(low[1:] - prev_close),
+        ])
+    return tr
+
+
+def atr(df, period=14):
+    """
+    cal_atr 벡터화 버전. ATR = TR의 단순 rolling mean(period).
+    """
+    _ensure_columns(df, ['ATR'])
+
+    start = _last_valid(df['ATR']) + 1
+    n = len(df)
+    if start >= n:
+        return df
+
+    atr_val = pd.Series(true_range(df)).rolling(period).mean().to_numpy()
+    idx = np.arange(n)
+    mask = (idx >= start) & (idx >= period - 1)
+    if mask.any():
+        df.loc[mask, 'ATR'] = atr_val[mask]
+    return df
+
+
+def macd(df, fast_period=12, slow_period=26, signal_period=9):
+    """
+    cal_macd 벡터화 버전.
+    기존 함수처럼 0번 행 종가로 EMA를 시작(adjust=False)하고, MACD_signal은 0에서 시작함.
+    """
+    _ensure_columns(df, ['MACD', 'MACD_signal', 'MACD_histogram'])
+    if df.empty:
+        return df
+
+    close = df['Close'].astype(float)
+    ema_fast = close.ewm(span=fast_period, adjust=False).mean()
+    ema_slow = close.ewm(span=slow_period, adjust=False).mean()
+    macd_val = ema_fast - ema_slow
+    macd_val.iloc[0] = 0.0
+    macd_signal = macd_val.ewm(span=signal_period, adjust=False).mean()
+
+    df['MACD'] = macd_val.to_numpy()
+    df['MACD_signal'] = macd_signal.to_numpy()
+    df['MACD_histogram'] = (macd_val - macd_signal).to_numpy()
+    return df
+
+
+def _wilder_sum(first_sum, values, period):
+    """
+    Wilder 스무딩 합계:  sm[k] = sm[k-1] - sm[k-1]/period + values[k],  sm[-1] = first_sum
+    sm/period 가 alpha=1/period 인 EWM(adjust=False)과 같다는 점을 이용.
+    """
+    seq = np.concatenate(([first_sum / period], values))
+    smoothed = pd.Series(seq).ewm(alpha=1 / period, adjust=False).mean().to_numpy()
+    return smoothed[1:] * period
+
+
+def directional_movement(df):
+    """
+    +DM / -DM 배열 (0번 행은 NaN).
+    """
+    high = df['High'].to_numpy(dtype=float)
+    low = df['Low'].to_numpy(dtype=float)
+    plus_dm = np.full(len(df), np.nan)
+    minus_dm = np.full(len(df), np.nan)
+    if len(df) > 1:
+        up_move = high[1:] - high[:-1]
+        down_move = low[:-1] - low[1:]
+        plus_dm[1:] = np.where((up_move > down_move) & (up_move > 0), up_move, 0.0)
+        minus_dm[1:] = np.where((down_move > up_move) & (down_move > 0), down_move, 0.0)
+    return plus_dm, minus_dm
+
+
+def _dx(sm_tr, sm_plus, sm_minus):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        di_plus = np.where(sm_tr == 0, 0.0, 100 * (sm_plus / sm_tr))
+        di_minus = np.where(sm_tr == 0, 0.0, 100 * (sm_minus / sm_tr))
+        di_sum = di_plus + di_minus
+        return np.where(di_sum != 0, 100 * np.abs(di_plus - di_minus) / di_sum, 0.0)
+
+
+def adx(df, period=14):
+    """
+    cal_adx 벡터화 버전 (처음부터 계산하는 경우).
+    이미 ADX가 일부 계산되어 있는 경우(이어서 계산)는 기존 함수의 복원 규칙이 특수해서
+    None을 반환하며, 호출하는 쪽에서 기존 행 단위 함수로 처리함.
+    """
+    n = len(df)
+    if 'ADX' not in df.columns:
+        df['ADX'] = np.nan
+
+    if n < period + 1:
+        # 기존 함수와 동일하게 임시 컬럼을 남긴 채 그대로 반환
+        _ensure_columns(df, ['TR', '+DM', '-DM'])
+        return df
+
+    if df['ADX'].last_valid_index() is not None:
+        return None
+
+    tr = true_range(df)
+    tr[0] = np.nan
+    plus_dm, minus_dm = directional_movement(df)
+
+    # 초기 스무딩: 1 ~ period 구간 합계로 첫 DX 계산
+    sm_tr0 = np.nansum(tr[1:period + 1])
+    sm_plus0 = np.nansum(plus_dm[1:period + 1])
+    sm_minus0 = np.nansum(minus_dm[1:period + 1])
+    dx0 = _dx(np.array([sm_tr0]), np.array([sm_plus0]), np.array([sm_minus0]))[0]
+
+    # period 행부터 Wilder 스무딩
+    sm_tr = _wilder_sum(sm_tr0, tr[period:], period)
+    sm_plus = _wilder_sum(sm_plus0, plus_dm[period:], period)
+    sm_minus = _wilder_sum(sm_minus0, minus_dm[period:], period)
+    dx = _dx(sm_tr, sm_plus, sm_minus)  # dx[k] -> 행 period + k
+
+    adx_col = np.full(n, np.nan)
+    first_adx = period * 2
+    if first_adx < n:
+        dx_count = first_adx - period + 2
+        adx_first = (dx0 + dx[:first_adx - period + 1].sum()) / dx_count
+        seq = np.concatenate(([adx_first], dx[first_adx - period + 1:]))
+        adx_col[first_adx:] = pd.Series(seq).ewm(alpha=1 / period, adjust=False).mean().to_numpy()
+
+    df['ADX'] = adx_col
+    return df
+
+
+_TREND_CODES = [
+    # (조건 함수, (rbw > 1.1, 0.8 <= rbw <= 1.1, 그 외))
+    (lambda s20, s60, s120: (s120 < s60) & (s60 < s20), (1, 2, 3)),
+    (lambda s20, s60, s120: (s60 < s120) & (s120 < s20), (4, 5, 6)),
+    (lambda s20, s60, s120: (s120 < s20) & (s20 < s60), (7, 8, 9)),
+    (lambda s20, s60, s120: (s20 < s120) & (s120 < s60), (-1, -2, -3)),
+    (lambda s20, s60, s120: (s60 < s20) & (s20 < s120), (-4, -5, -6)),
+    (lambda s20, s60, s120: (s20 < s60) & (s60 < s120), (-7, -8, -9)),
+]
+
+
+def trend_code(sma20, sma60, sma120, rbw, tol_ratio=0.005):
+    """
+    LT_trand_check 내부 check_ma_trend 의 배열 버전. (-9 ~ 9)
+    """
+    def is_near(a, b):
+        return np.abs(a - b) <= np.abs(b) * tol_ratio
+
+    all_near = is_near(sma20, sma60) & is_near(sma20, sma120) & is_near(sma60, sma120)
+    rbw_high = rbw > 1.1
+    rbw_mid = (rbw >= 0.8) & (rbw <= 1.1)
+
+    conditions = [all_near]
+    choices = [np.zeros(len(rbw))]
+    for arrangement, (high_code, mid_code, low_code) in _TREND_CODES:
+        cond = arrangement(sma20, sma60, sma120)
+        conditions.append(cond)
+        choices.append(np.where(rbw_high, high_code, np.where(rbw_mid, mid_code, low_code)))
+
+    return np.select(conditions, choices, default=0)
+
+
+def trend_check(df):
+    """
+    LT_trand_check 벡터화 버전. SMA_20/60/120 와 bandwidth 컬럼이 필요함.
+    """
+    _ensure_columns(df, ['trend', 'RBW'])
+
+    start = _last_valid(df['trend']) + 1
+    n = len(df)
+    if start >= n:
+        return df
+
+    sma20 = df['SMA_20'].to_numpy(dtype=float)
+    sma60 = df['SMA_60'].to_numpy(dtype=float)
+    sma120 = df['SMA_120'].to_numpy(dtype=float)
+    bandwidth = df['bandwidth'].to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rbw = bandwidth / df['bandwidth'].rolling(60).mean().to_numpy()
+
+    idx = np.arange(n)
+    mask = ((idx >= start) & df['trend'].isna().to_numpy()
+            & ~np.isnan(sma20) & ~np.isnan(sma60) & ~np.isnan(sma120) & ~np.isnan(bandwidth))
+    if mask.any():
+        codes = trend_code(sma20[mask], sma60[mask], sma120[mask], rbw[mask])
+        df.loc[mask, 'RBW'] = rbw[mask]
+        df.loc[mask, 'trend'] = codes.astype(float)
+
+    return df
@@ -1,6 +1,8 @@
 from binance.client import Client
+import asyncio
 import time
 import math
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import sys
 import os
@@ -15,6 +17,12 @@ from src.notifier import Notifier
 from src.strategy import Strategy
 from src.order_executor import Order
 from src.trade_manager import TradeManager
+from src.market_stream import KlineStream
+from src.exchange_info import ExchangeInfoCache
+from src.state_store import StateStore, reconcile_status
+from src.warmup import StartupWarmup
+from src import metrics
+from src import rate_limiter
 import src.utils
 
 def round_up_to_next_hour(dt: datetime) -> datetime:
@@ -34,22 +42,95 @@ def round_up_to_next_hour(dt: datetime) -> datetime:
     else:
         return datetime(year, month, day, hour) + timedelta(hours=1)
 
-def main():
+TIMEFRAMES = ["1m", "5m", "1h"]
+
+# 한 사이클의 최소 길이 (초). 기존 티커별 time.sleep(1) 대신 사이클 단위로 대기
+LOOP_INTERVAL = 1
+
+def refresh_candles(client, data_control, kline_stream, symbol, timeframe, current_data, futures=False):
+    """
+    캔들 데이터 갱신.
+      - kline 스트림이 연결되어 있으면 스트림으로 받은 캔들만 반영
+      - (재)연결 직후에는 끊긴 동안의 캔들을 REST로 백필
+      - 스트림을 쓰지 않거나 연결이 끊긴 상태면 기존처럼 REST 폴링
+    """
+    key = (symbol, timeframe, futures)
+    with metrics.stage("kline_fetch", "FUTURES" if futures else "SPOT", symbol):
+        if kline_stream is None:
+            return data_control.update_data(client, symbol, timeframe, current_data, futures=futures)
+
+        if kline_stream.needs_backfill(key):
+            kline_stream.backfill_done(key)
+            data_control.backfill(client, symbol, timeframe, futures=futures)
+            return data_control.apply_klines(key, kline_stream.drain(key))
+
+        if kline_stream.is_live(key):
+            return data_control.apply_klines(key, kline_stream.drain(key))
+
+        return data_control.update_data(client, symbol, timeframe, current_data, futures=futures)
+
+def timed_call(stage, market, func, *args):
+    """
+    스레드에서 실행할 블로킹 호출(func)의 소요 시간을 stage 로 기록
+    """
+    with metrics.stage(stage, market):
+        return func(*args)
+
+async def refresh_symbol(client, data_control, kline_stream, rest_limit, symbol, frames, futures=False):
+    """
+    심볼 하나의 1m/5m/1h 캔들을 동시에 갱신하고 지표를 계산.
+      - REST 호출은 스레드에서 실행하고, 동시에 나가는 요청 수는 rest_limit 으로 제한
+      - 지표 계산(update_indicator)은 이벤트 루프에서만 실행 (스트리밍 상태 동시 접근 방지)
+    """
+    async def refresh(timeframe):
+        async with rest_limit:
+            return await asyncio.to_thread(
+                refresh_candles, client, data_control, kline_stream, symbol, timeframe, frames[timeframe], futures
+            )
+
+    results = await asyncio.gather(*(refresh(timeframe) for timeframe in TIMEFRAMES))
+    with metrics.stage("indicator", "FUTURES" if futures else "SPOT", symbol):
+        for timeframe, updated_data in zip(TIMEFRAMES, results):
+            # 업데이트된 캔들에 대한 기술적 지표 추가 (스트리밍 상태로 새 캔들만 계산)
+            frames[timeframe] = data_control.update_indicator((symbol, timeframe, futures), updated_data)
+
+async def main():
     print("투자 프로그램을 시작합니다.")
     
     # Config에서 환경변수 및 고정변수 불러오기
     config = Config()
     ticker_list = config.coin_tickers.split(" ")
     future_use = bool(config.futures_use)
+    future_ticker_list = []
     if future_use:
         future_ticker_list = config.futures_coin_tickers.split(" ")
-    client = Client(config.binance_access_key, config.binance_secret_key)
-    data_control = Data_Control()
-    notifier = Notifier()
+    # REST 주소를 바꾸는 경우(모의 거래소 등) 실서버로 ping 을 보내지 않음
+    client = Client(config.binance_access_key, config.binance_secret_key,
+                    ping=not (config.api_url or config.futures_api_url))
+    if config.api_url:
+        client.API_URL = config.api_url
+    if config.futures_api_url:
+        client.FUTURES_URL = config.futures_api_url
+    # REST 요청 수/오류/소요 시간 기록, METRICS_PORT 가 있으면 /metrics 로 노출
+    metrics.instrument_client(client)
+    # 모든 REST 요청을 요청 가중치/주문 수 한도 안에서 우선순위대로 보냄 (주문 > 계정 조회 > 시세)
+    rate_limiter.install(client, rate_limiter.RequestScheduler())
+    if config.metrics_port:
+        metrics.MetricsServer(config.metrics_port).start()
     strategy = Strategy()
+    # 전략이 사용하는 지표만 계산
+    data_control = Data_Control(indicators=strategy.required_indicators, history_length=strategy.history_length)
+    notifier = Notifier(client)
     order = Order(client)
     trade_manager = TradeManager(order, notifier, config)
 
+    # 블로킹 호출(REST, 주문 체결 대기, 슬랙 전송)은 스레드 풀에서 실행
+    # 심볼마다 캔들 3개 + 주문 1개가 동시에 진행될 수 있도록 크기를 잡음
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=4 * (len(ticker_list) + len(future_ticker_list)) + 4))
+    # 동시에 보내는 REST 요청 수 제한 (가중치 한도는 rate_limiter 가 따로 관리)
+    rest_limit = asyncio.Semaphore(config.max_concurrent_requests)
+
     # 서버 시간과 로컬 시간 동기화
     local_time = int(time.time() * 1000)
     server_time = client.get_server_time()
@@ -59,78 +140,136 @@ def main():
         print(f"시간 차이 발생: {time_diff}ms, 시스템 시간 동기화 필요")
         time.sleep(time_diff / 1000)
 
-
-    # 초기 데이터 조회 - data_control.py
-    initial_data = {}
-    vp_data = {}
-    tpo_data = {}
-    futures_data = {}
-    futures_vp_data = {}
-    futures_tpo_data = {}
-
-    spot_symbol_info = {}
-    future_symbol_info = {}
+    # 거래 규칙(exchangeInfo)은 시장별로 한 번만 조회 (디스크 캐시가 유효하면 조회 없음). 초기 데이터와 함께 로드
+    exchange_info = ExchangeInfoCache(client)
 
     buy_sell_status = {ticker: {"buy_stage": 0} for ticker in ticker_list}
-    if future_use: futures_status = {ticker: {"position": None, "stage": 0} for ticker in future_ticker_list}
-    for symbol in ticker_list:
-        initial_data[symbol] = {}
-        vp_data[symbol] = {}
-        tpo_data[symbol] = {}
-        spot_symbol_info[symbol] = src.utils.get_symbol_info(f"{symbol}USDT", client)
-
-        # 1분봉, 5분봉, 1시간봉 각각 300개의 데이터 조회
-        for timeframe in ["1m", "5m", "1h"]:
-            data = data_control.data(client, symbol, timeframe, limit=300)
-
-            # 각 데이터에 대한 기술적 지표 계산
-            data = data_control.cal_indicator(data)
-
-            # 비어있는 값 제거
-            data = data.dropna()
-            
-            # 데이터 길이는 140개로 제한. (120일 이평선 계산을 위함.)
-            if len(data) > 140:
-                data = data.iloc[-140:].reset_index(drop=True)
-            initial_data[symbol][timeframe] = data
-            # 남은 데이터에 대한 VP, TPO 계산
-
-        if future_use:
-            for symbol in future_ticker_list:
-                futures_data[symbol] = {}
-                futures_vp_data[symbol] = {}
-                futures_tpo_data[symbol] = {}
-                future_symbol_info[symbol] = src.utils.get_symbol_info(f"{symbol}USDT", client)
-                for timeframe in ["1m", "5m", "1h"]:
-                    future_data = data_control.data(client, symbol, timeframe, limit=300, futures=True)
-                    # 각 데이터에 대한 기술적 지표 계산
-                    future_data = data_control.cal_indicator(future_data)
-
-                    # 비어있는 값 제거
-                    future_data = future_data.dropna()
-                    
-                    # 데이터 길이는 140개로 제한. (120일 이평선 계산을 위함.)
-                    if len(future_data) > 140:
-                        future_data = future_data.iloc[-140:].reset_index(drop=True)
-                    futures_data[symbol][timeframe] = future_data
-
-    # 초기 자산 조회 - notifier.py
-    notifier.get_asset_info()
-    notifier.get_futures_asset_info()
-    spot_limit_amount = notifier.get_limit_amount()
-    future_limit_amount = notifier.futures_get_limit_amount()
-
-    notifier.send_asset_info(spot_limit_amount, future_limit_amount)
+    futures_status = {ticker: {"position": None, "stage": 0} for ticker in future_ticker_list}
+
+    # 저장된 상태가 있으면 캔들/지표는 빠진 구간만 받아 이어서 계산하고, 매매 단계도 복원
+    state_store = None
+    if config.state_snapshot_interval > 0:
+        state_store = StateStore(data_control)
+        state_store.load()
+        state_store.restore_status(buy_sell_status, futures_status)
+
+    # 초기 데이터 조회 - 모든 심볼의 1분봉, 5분봉, 1시간봉을 동시에 조회하고 지표 계산.
+    # 메인 루프는 기다리지 않고 준비가 끝난 심볼부터 매매
+    startup = StartupWarmup(client, data_control, TIMEFRAMES, rest_limit,
+                            state_store=state_store, exchange_info=exchange_info)
+    initial_data = startup.frames["SPOT"]
+    futures_data = startup.frames["FUTURES"]
+    # 태스크 참조를 유지해야 가비지 컬렉션으로 중단되지 않음
+    warmup_task = asyncio.create_task(startup.run(ticker_list, future_ticker_list))
+
+    # 초기 자산 조회 - notifier.py (초기 데이터 조회와 동시에 진행)
+    await asyncio.gather(
+        asyncio.to_thread(notifier.get_asset_info),
+        asyncio.to_thread(notifier.get_futures_asset_info),
+    )
+    spot_limit_amount = await asyncio.to_thread(notifier.get_limit_amount)
+    future_limit_amount = await asyncio.to_thread(notifier.futures_get_limit_amount)
+
+    await asyncio.to_thread(notifier.send_asset_info, spot_limit_amount, future_limit_amount)
+
+    if state_store is not None:
+        # 꺼져 있던 동안 수동으로 정리된 포지션은 단계 상태에서도 지우고, 바뀐 상태는 바로 저널에 기록
+        reconcile_status(buy_sell_status, futures_status, notifier.asset_info, notifier.futures_asset_info)
+        state_store.record(buy_sell_status, futures_status)
+
+    # 거래 규칙은 백그라운드에서 주기적으로 갱신
+    exchange_info.start_refresh(markets=(False, True) if future_use else (False,))
+
+    # kline WebSocket 스트림 시작 (REST 폴링 대신 사용). 같은 이벤트 루프의 태스크로 실행
+    kline_stream = None
+    if config.websocket_use:
+        kline_stream = KlineStream(
+            ticker_list,
+            future_ticker_list,
+            timeframes=TIMEFRAMES,
+            spot_url=config.stream_url,
+            futures_url=config.futures_stream_url,
+        )
+        # 태스크 참조를 유지해야 가비지 컬렉션으로 중단되지 않음
+        stream_task = asyncio.create_task(kline_stream.run())
+        # 현재가 스냅샷도 !miniTicker@arr 스트림으로 갱신 (REST 가격 조회 생략)
+        price_task = asyncio.create_task(notifier.prices.stream(config.stream_url))
 
     now = datetime.now()
     next_report_time = round_up_to_next_hour(now)  # 바로 다음 정각
 
+    def trade_with_symbol_info(process, ticker, futures, *args):
+        """
+        거래 규칙 조회 후 process(ticker, *args, symbol_info) 실행. asyncio.to_thread 로 호출할 것
+        (캐시에 없는 심볼이면 exchangeInfo 를 REST 로 다시 조회하므로 이벤트 루프에서 부르면 안 됨)
+        """
+        symbol_info = src.utils.get_symbol_info(f"{ticker}USDT", client, futures=futures, cache=exchange_info)
+        return process(ticker, *args, symbol_info)
+
+    async def process_spot_ticker(ticker):
+        # 데이터 업데이트. 1분, 5분, 1시간 봉을 동시에 갱신
+        await refresh_symbol(client, data_control, kline_stream, rest_limit, ticker, initial_data[ticker])
+
+        account_info = notifier.asset_info.get(ticker, {"position": None, "entry_price": None, "holdings": 0})
+
+        # 매수/매도 판단
+        signal = {}
+        with metrics.stage("signal", "SPOT", ticker):
+            signal = strategy.signal(initial_data[ticker], False, account_info)
+
+        # 주문 진행
+        # 모듈화된 매매 로직 호출 (주문 전송만 하고 반환, 체결 확인은 OrderTracker가 백그라운드에서 처리)
+        with metrics.stage("order", "SPOT", ticker):
+            await asyncio.to_thread(
+                trade_with_symbol_info,
+                trade_manager.process_spot_trade,
+                ticker,
+                False,
+                signal,
+                spot_limit_amount,
+                buy_sell_status,
+            )
+
+    async def process_futures_ticker(ticker):
+        await refresh_symbol(client, data_control, kline_stream, rest_limit, ticker, futures_data[ticker], futures=True)
+
+        # 매수/매도 판단
+        account_info = notifier.futures_asset_info.get(f"{ticker}USDT", {"position": None, "entry_price": None, "holdings": 0})
+        signal = {}
+        with metrics.stage("signal", "FUTURES", ticker):
+            signal = strategy.signal(futures_data[ticker], True, account_info)
+
+        if signal["signal"] == "close":
+            if futures_status[ticker].get("position") == "LONG":
+                signal["signal"] = "L_sell"
+                signal['weight'] = 5
+            elif futures_status[ticker].get("position") == "SHORT":
+                signal["signal"] = "S_sell"
+                signal['weight'] = 5
+            else:
+                signal["signal"] = "Hold"
+
+        # 모듈화된 선물 거래 로직 호출
+        with metrics.stage("order", "FUTURES", ticker):
+            await asyncio.to_thread(
+                trade_with_symbol_info,
+                trade_manager.process_futures_trade,
+                ticker,
+                True,
+                signal,
+                future_limit_amount,
+                futures_status,
+            )
+
     # 반복문 시작
     while True:
+        cycle_start = time.monotonic()
         try:
-            # 자산 정보 업데이트
-            notifier.get_asset_info()
-            notifier.get_futures_asset_info()
+            # 자산 정보 업데이트 (현물/선물 동시 조회)
+            await asyncio.gather(
+                asyncio.to_thread(timed_call, "account_refresh", "SPOT", notifier.get_asset_info),
+                asyncio.to_thread(timed_call, "account_refresh", "FUTURES", notifier.get_futures_asset_info),
+            )
 
             spot_all_zero = all(
                 notifier.asset_info[coin]["total_quantity"] == 0
@@ -151,90 +290,52 @@ def main():
                 future_limit_amount = notifier.futures_get_limit_amount()
                 print("선물 매매 한도가 업데이트되었습니다.")
 
-            # 매수/매도 판단 로직
+            # 매수/매도 판단 로직. 심볼별 데이터 갱신 -> 신호 -> 주문을 동시에 진행
+            tasks = {}
+            # 초기 데이터가 아직 준비되지 않은 심볼은 스킵
             for ticker in ticker_list:
                 if ticker == "USDT": # USDT는 스킵
                     continue
+                if not startup.is_ready("SPOT", ticker):
+                    continue
+                tasks[("SPOT", ticker)] = process_spot_ticker(ticker)
+            for ticker in future_ticker_list:
+                if ticker == "USDT":
+                    continue
+                if not startup.is_ready("FUTURES", ticker):
+                    continue
+                tasks[("FUTURES", ticker)] = process_futures_ticker(ticker)
 
-                # 데이터 업데이트. 1분, 5분, 1시간 봉에 대한 업데이트 진행
-                for timeframe in ["1m", "5m", "1h"]:
-                    initial_data[ticker][timeframe] = data_control.update_data(
-                        client, ticker, timeframe, initial_data[ticker][timeframe]
-                    )
-                    updated_data = initial_data[ticker][timeframe]
-                    # 업데이트된 데이터에 대한 기술적 지표 추가
-                    updated_data = data_control.cal_indicator(updated_data)
-                    initial_data[ticker][timeframe] = updated_data
-
-                account_info = notifier.asset_info.get(ticker, {"position": None, "entry_price": None, "holdings": 0})
-
-                # 매수/매도 판단
-                signal = {}
-                signal = strategy.signal(initial_data[ticker], False, account_info)
-
-                # 주문 진행
-                # 모듈화된 매매 로직 호출
-                trade_manager.process_spot_trade(
-                    ticker,
-                    signal,
-                    spot_limit_amount,
-                    buy_sell_status,
-                    spot_symbol_info[ticker]
-                )
-
-                # 1초 대기
-                time.sleep(1)
-            
-            if future_use:
-                for ticker in future_ticker_list:
-                    if ticker == "USDT":
-                        continue
-                    for timeframe in ["1m", "5m", "1h"]:
-                        futures_data[ticker][timeframe] = data_control.update_data(
-                            client, ticker, timeframe, futures_data[ticker][timeframe], futures=True
-                        )
-                        updated_data = futures_data[ticker][timeframe]
-                        # 업데이트된 데이터에 대한 기술적 지표 추가
-                        updated_data = data_control.cal_indicator(updated_data)
-                        futures_data[ticker][timeframe] = updated_data
-
-                    # 매수/매도 판단
-                    account_info = notifier.futures_asset_info.get(f"{symbol}USDT", {"position": None, "entry_price": None, "holdings": 0})
-                    signal = {}
-                    signal = strategy.signal(futures_data[ticker], True, account_info)
-
-                    if signal["signal"] == "close":
-                        if futures_status[ticker].get("position") == "LONG":
-                            signal["signal"] = "L_sell"
-                            signal['weight'] = 5
-                        elif futures_status[ticker].get("position") == "SHORT":
-                            signal["signal"] = "S_sell"
-                            signal['weight'] = 5
-                        else:
-                            signal["signal"] = "Hold"
-
-                    # 모듈화된 선물 거래 로직 호출
-                    trade_manager.process_futures_trade(
-                        ticker,
-                        signal,
-                        future_limit_amount,
-                        futures_status,
-                        future_symbol_info[ticker]
-                    )
-                    
-                    # 1초 대기
-                    time.sleep(1)
+            results = await asyncio.gather(*tasks.values(), return_exceptions=True)
+            for (market, ticker), result in zip(tasks, results):
+                # 한 심볼의 오류가 다른 심볼 처리에 영향을 주지 않도록 개별 처리
+                if isinstance(result, Exception):
+                    print(f"[{market}] {ticker} 처리 중 오류: {result}")
 
             current_time = datetime.now()
             if current_time >= next_report_time:
-                notifier.send_asset_info(spot_limit_amount, future_limit_amount)
+                await asyncio.to_thread(notifier.send_asset_info, spot_limit_amount, future_limit_amount)
 
                 # 다음 알림 시점 = 현재 정각 + 1시간
                 next_report_time = next_report_time + timedelta(hours=1)
 
+            if state_store is not None:
+                # 바뀐 매매 단계는 매 사이클 저널에 추가
+                state_store.record(buy_sell_status, futures_status)
+                # 초기 데이터 준비 중에는 다른 스레드가 저장소를 추가하고 있으므로 끝난 뒤부터 스냅샷
+                if startup.done and time.time() - state_store.last_snapshot >= config.state_snapshot_interval:
+                    # 캔들/지표 갱신이 끝난 사이클 사이에 직렬화하고, 파일 쓰기는 스레드에서
+                    payload, seq = state_store.dump(buy_sell_status, futures_status)
+                    await asyncio.to_thread(state_store.write, payload, seq)
+
         except Exception as e:
             print(f"메인 루프 오류: {e}")
+            metrics.STAGE_ERRORS.inc("cycle", "", "")
             # notifier.py를 통해 error 로그 전송
 
+        metrics.STAGE_SECONDS.observe(time.monotonic() - cycle_start, "cycle", "", "")
+        # 사이클 최소 간격 유지
+        await asyncio.sleep(max(0, LOOP_INTERVAL - (time.monotonic() - cycle_start)))
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    asyncio.run(main())
@@ -0,0 +1,139 @@
+"""
+바이낸스 kline WebSocket 스트림 수신.
+
+현물/선물 각각 combined stream(<symbol>@kline_<tf>)에 접속해서 캔들을 받아
+(symbol, timeframe, futures) 별 대기열에 쌓아 두고, 메인 루프가 drain()으로 꺼내
+Data_Control.apply_klines()로 링버퍼 저장소에 반영함.
+(수신은 메인 이벤트 루프의 태스크 run()에서 하고, 저장소 갱신은 심볼별 갱신 작업에서만 하므로
+DataFrame 접근 경합이 없음. 갱신 작업은 스레드에서 drain()하므로 대기열은 잠금으로 보호)
+
+사용 예:
+    kline_stream = KlineStream(ticker_list, future_ticker_list)
+    stream_task = asyncio.create_task(kline_stream.run())
+
+- 연결이 끊기면 지수 백오프로 자동 재연결
+- (재)연결 직후에는 끊겨 있던 동안의 캔들을 REST로 백필해야 하므로 해당 키들을 needs_backfill 로 표시
+- 접속 주소는 환경변수 BINANCE_STREAM_URL / BINANCE_FUTURES_STREAM_URL 로 바꿀 수 있음 (로컬 테스트 서버 등)
+"""
+
+import asyncio
+import json
+import threading
+
+import websockets
+
+SPOT_STREAM_URL = "wss://stream.binance.com:9443"
+FUTURES_STREAM_URL = "wss://fstream.binance.com"
+
+
+def kline_from_stream(k):
+    """
+    스트림 kline 객체를 REST klines 응답과 같은 리스트 형식으로 변환
+    [Open Time, Open, High, Low, Close, Volume, Close Time, Quote Asset Volume,
+     Number of Trades, Taker Buy Base Asset Volume, Taker Buy Quote Asset Volume, Ignore]
+    """
+    return [k["t"], k["o"], k["h"], k["l"], k["c"], k["v"], k["T"], k["q"], k["n"], k["V"], k["Q"], "0"]
+
+
+class KlineStream:
+    def __init__(self, spot_symbols, futures_symbols, timeframes=("1m", "5m", "1h"),
+                 spot_url=SPOT_STREAM_URL, futures_url=FUTURES_STREAM_URL,
+                 reconnect_delay=1, max_reconnect_delay=60):
+        self.symbols = {False: list(spot_symbols), True: list(futures_symbols)}
+        self.timeframes = list(timeframes)
+        self.urls = {False: spot_url, True: futures_url}
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+
+        self.lock = threading.Lock()
+        self.pending = {}          # (symbol, timeframe, futures) -> {open_time: kline}
+        self.backfill_keys = set() # 재연결 후 REST 백필이 필요한 키
+        self.connected = {False: False, True: False}
+        self.stopped = False
+
+    def keys(self, futures):
+        return [(symbol, timeframe, futures) for symbol in self.symbols[futures] for timeframe in self.timeframes]
+
+    def stream_url(self, futures):
+        streams = "/".join(
+            f"{symbol.lower()}usdt@kline_{timeframe}"
+            for symbol in self.symbols[futures] for timeframe in self.timeframes
+        )
+        return f"{self.urls[futures]}/stream?streams={streams}"
+
+    # -------------------------
+    #     수신 (스트림 스레드)
+    # -------------------------
+    def on_message(self, futures, raw):
+        message = json.loads(raw)
+        data = message.get("data", message)
+        if data.get("e") != "kline":
+            return
+        k = data["k"]
+        key = (data["s"][:-len("USDT")], k["i"], futures)
+        with self.lock:
+            # 같은 캔들의 갱신은 마지막 값만 남김
+            self.pending.setdefault(key, {})[k["t"]] = kline_from_stream(k)
+
+    async def consume(self, futures):
+        delay = self.reconnect_delay
+        market = "FUTURES" if futures else "SPOT"
+        while not self.stopped:
+            try:
+                async with websockets.connect(self.stream_url(futures), ping_interval=20, ping_timeout=20) as ws:
+                    print(f"[{market}] kline 스트림 연결됨")
+                    with self.lock:
+                        # 연결 전/끊긴 동안의 캔들은 REST로 백필
+                        self.backfill_keys.update(self.keys(futures))
+                    self.connected[futures] = True
+                    delay = self.reconnect_delay
+                    async for raw in ws:
+                        self.on_message(futures, raw)
+                        if self.stopped:
+                            break
+            except (OSError, asyncio.TimeoutError, websockets.WebSocketException) as e:
+                print(f"[{market}] kline 스트림 연결 끊김: {e}")
+            except Exception as e:
+                print(f"[{market}] kline 스트림 처리 중 오류 발생: {e}")
+
+            self.connected[futures] = False
+            if self.stopped:
+                break
+            print(f"[{market}] {delay}초 후 재연결 시도")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def run(self):
+        tasks = [self.consume(futures) for futures in (False, True) if self.symbols[futures]]
+        await asyncio.gather(*tasks)
+
+    def stop(self):
+        self.stopped = True
+
+    # -------------------------
+    #     소비 (메인 루프)
+    # -------------------------
+    def is_live(self, key):
+        """
+        key 가 스트림으로 갱신 가능한 상태인지 (연결됨 + 백필 완료)
+        """
+        with self.lock:
+            return self.connected[key[2]] and key not in self.backfill_keys
+
+    def needs_backfill(self, key):
+        with self.lock:
+            return key in self.backfill_keys
+
+    def backfill_done(self, key):
+        with self.lock:
+            self.backfill_keys.discard(key)
+
+    def drain(self, key):
+        """
+        key 의 대기 중인 kline 들을 Open Time 순으로 꺼냄
+        """
+        with self.lock:
+            klines = self.pending.pop(key, None)
+        if not klines:
+            return []
+        return [klines[t] for t in sorted(klines)]
@@ -0,0 +1,233 @@
+"""
+메인 루프 단계별 지연 시간 / API 호출 지표와 Prometheus 형식 /metrics 엔드포인트.
+
+  - stage(name, market, symbol) 로 감싼 구간의 소요 시간을 히스토그램에 기록하고, 예외가 나면 오류 카운터 증가
+      kline_fetch, indicator, signal, order, account_refresh, slack_post, cycle
+  - instrument_client(client) 는 바이낸스 Client 의 모든 REST 요청을 엔드포인트별로 세고 시간을 잼
+  - 기록은 버킷 카운트 증가뿐이고 텍스트 변환은 /metrics 요청이 올 때만 하므로,
+    아무도 수집하지 않을 때의 오버헤드는 구간마다 perf_counter 두 번 + 잠금 한 번 정도
+  - MetricsServer(port).start() 로 로컬 HTTP 서버를 데몬 스레드로 띄움 (METRICS_PORT 환경변수, 0이면 사용 안 함)
+
+사용 예:
+    with metrics.stage("signal", "SPOT", ticker):
+        signal = strategy.signal(...)
+    curl http://127.0.0.1:9108/metrics
+"""
+
+import bisect
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+# 지연 시간 히스토그램 버킷 (초)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{value}"' for name, value in extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class Counter:
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self.lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self.lock:
+            items = sorted(self.values.items())
+        for label_values, value in items:
+            lines.append(f"{self.name}{_label_text(self.labels, label_values)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # label_values -> [버킷별 개수(누적 아님, 마지막은 +Inf), 합계, 개수]
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            entry = self.values.get(label_values)
+            if entry is None:
+                entry = self.values[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            items = sorted((key, (list(counts), total, count)) for key, (counts, total, count) in self.values.items())
+        for label_values, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                labels = _label_text(self.labels, label_values, [("le", _number(float(bound)))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _label_text(self.labels, label_values)
+            lines.append(f"{self.name}_sum{labels} {_number(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def counter(self, name, help_text, labels=()):
+        metric = Counter(name, help_text, labels)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        metric = Histogram(name, help_text, labels, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        """
+        Prometheus text exposition format (0.0.4)
+        """
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "autotrader_stage_seconds", "메인 루프 단계별 소요 시간 (초)", ("stage", "market", "symbol"))
+STAGE_ERRORS = REGISTRY.counter(
+    "autotrader_stage_errors_total", "메인 루프 단계에서 발생한 예외 수", ("stage", "market", "symbol"))
+API_REQUEST_SECONDS = REGISTRY.histogram(
+    "autotrader_api_request_seconds", "바이낸스 REST 요청 소요 시간 (초)", ("endpoint",))
+API_CALLS = REGISTRY.counter(
+    "autotrader_api_calls_total", "바이낸스 REST 요청 수", ("endpoint",))
+API_ERRORS = REGISTRY.counter(
+    "autotrader_api_errors_total", "실패한 바이낸스 REST 요청 수", ("endpoint",))
+API_THROTTLE_SECONDS = REGISTRY.histogram(
+    "autotrader_api_throttle_seconds", "요청 스케줄러에서 한도 때문에 기다린 시간 (초)", ("market", "priority"))
+API_BACKOFFS = REGISTRY.counter(
+    "autotrader_api_backoffs_total", "429/418 응답으로 요청을 멈춘 횟수", ("market", "status"))
+
+
+class stage:
+    """
+    with 블록의 소요 시간을 autotrader_stage_seconds 에 기록. 예외는 카운트 후 그대로 전달
+    (contextmanager 제너레이터보다 가벼운 클래스로 구현)
+    """
+    __slots__ = ("labels", "started")
+
+    def __init__(self, name, market="", symbol=""):
+        self.labels = (name, market, symbol)
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        STAGE_SECONDS.observe(time.perf_counter() - self.started, *self.labels)
+        if exc_type is not None and issubclass(exc_type, Exception):
+            STAGE_ERRORS.inc(*self.labels)
+        return False
+
+
+def instrument_client(client):
+    """
+    바이낸스 Client 의 REST 요청(_request)을 감싸 엔드포인트(경로)별 호출 수/오류 수/소요 시간을 기록.
+    같은 client 에 두 번 호출해도 한 번만 감쌈.
+    """
+    if getattr(client, "_metrics_instrumented", False):
+        return client
+    original = client._request
+
+    def _request(method, uri, signed, force_params=False, **kwargs):
+        endpoint = urlsplit(uri).path
+        started = time.perf_counter()
+        try:
+            return original(method, uri, signed, force_params, **kwargs)
+        except Exception:
+            API_ERRORS.inc(endpoint)
+            raise
+        finally:
+            API_CALLS.inc(endpoint)
+            API_REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint)
+
+    client._request = _request
+    client._metrics_instrumented = True
+    return client
+
+
+class MetricsServer:
+    """
+    GET /metrics 에 registry 내용을 Prometheus 텍스트 형식으로 응답하는 로컬 HTTP 서버 (데몬 스레드)
+    """
+    def __init__(self, port, host="127.0.0.1", registry=REGISTRY):
+        self.port = port
+        self.host = host
+        self.registry = registry
+        self.server = None
+        self.thread = None
+
+    def start(self):
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # 수집 요청마다 콘솔에 찍지 않음
+                pass
+
+        self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        print(f"지표 엔드포인트 시작: http://{self.host}:{self.port}/metrics")
+        return self
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
@@ -6,14 +6,26 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, project_root)
 
 from src.config import Config
+from src.fill_ledger import FillLedger
+from src.price_snapshot import PriceSnapshot
+from src.slack_dispatcher import SlackDispatcher, HIGH, NORMAL
+from src.utils import allocate_limits
 from binance.client import Client
 from slack_sdk import WebClient
 
 class Notifier():
-    def __init__(self):
+    def __init__(self, client=None):
         self.config = Config()
-        self.client = Client(self.config.binance_access_key, self.config.binance_secret_key)
+        # main 의 client 를 받으면 같은 요청 스케줄러(가중치 한도)를 공유
+        self.client = client or Client(self.config.binance_access_key, self.config.binance_secret_key)
         self.slack = WebClient(token=self.config.slack_api_key)
+        # 슬랙 전송은 백그라운드 스레드에서 (채널별로 모아서 전송)
+        self.dispatcher = SlackDispatcher(self.slack)
+        # 체결 원장 (평균 매수가 계산용). 보유 수량이 바뀐 코인만 새 체결을 조회
+        self.ledger = FillLedger(self.client)
+        self.synced_quantity = {}
+        # 전체 코인 현재가 스냅샷 (사이클당 가격 요청 1회, 스트림 수신 중이면 0회)
+        self.prices = PriceSnapshot(self.client)
         self.asset_info = {}
         self.futures_asset_info = {}
         self.target_coins = ["USDT", ]
@@ -51,6 +63,9 @@ class Notifier():
             account_info = self.client.get_account()
             balances = account_info['balances']
 
+            # 현재가 스냅샷 갱신 (전체 심볼 한 번에)
+            self.prices.refresh()
+
             # 2. 각 자산별 평균 매수 가격 및 수익률 계산
             for balance in balances:
                 asset = balance['asset']
@@ -73,7 +88,7 @@ class Notifier():
                     continue
 
                 # 4. 현재 가격 조회
-                current_price = float(self.client.get_symbol_ticker(symbol = (f"{asset}USDT") )['price'])
+                current_price = self.prices.price(f"{asset}USDT")
 
                 # 5. 보유 수량이 0인 경우 (현재 가격 제외하고 모두 0으로 저장)
                 if total_quantity == 0:
@@ -88,19 +103,11 @@ class Notifier():
                     continue
 
                 # 6. 평균 매수 가격 계산
-                trades = self.client.get_my_trades(symbol=f"{asset}USDT")
-                total_cost = 0
-                total_trade_quantity = 0
-
-                for trade in trades:
-                    qty = float(trade['qty'])
-                    price = float(trade['price'])
-                    commission = float(trade['commission'])
-
-                    total_cost += (qty * price) + commission
-                    total_trade_quantity += qty
-
-                avg_buy_price = total_cost / total_trade_quantity if total_trade_quantity > 0 else 0
+                #    보유 수량이 바뀌었을 때만 마지막 체결 이후의 새 체결을 원장에 반영 (fromId 커서)
+                if self.synced_quantity.get(asset) != total_quantity:
+                    self.ledger.sync(f"{asset}USDT")
+                    self.synced_quantity[asset] = total_quantity
+                avg_buy_price = self.ledger.average_price(f"{asset}USDT")
 
                 # 7. 수익률 계산
                 profit_rate = 0
@@ -175,7 +182,6 @@ class Notifier():
 
             # 2. 코인별 현재가 및 자산 가치 계산
             coin_values = {}
-            total_asset = usdt_balance
 
             for symbol in self.target_coins:
                 # USDT는 제외하고 다른 코인만 처리
@@ -190,45 +196,9 @@ class Notifier():
                 # 코인의 총 가치(USDT 환산) 계산
                 coin_value = total_amount * current_price
                 coin_values[symbol] = coin_value
-                total_asset += coin_value
-
-            # 3. 코인 개수 및 자산 균등 배분 금액 계산
-            coin_count = len(self.target_coins) - 1  # USDT 제외
-            if coin_count == 0:
-                raise ValueError("코인 개수가 0입니다")
-
-            target_amount_per_coin = total_asset / coin_count
-
-            # 4. 매수 가능 금액 계산
-            limit_amounts = {}
-            negative_sum = 0
-            negative_count = 0
-
-            for symbol in self.target_coins:
-                if symbol == "USDT":
-                    continue
-
-                # 목표 금액에서 보유 자산 가치 차감
-                limit_amount = target_amount_per_coin - coin_values.get(symbol, 0)
-
-                # 초과 보유 시 0으로 설정하고, 초과분을 누적
-                if limit_amount < 0:
-                    negative_sum += abs(limit_amount)
-                    negative_count += 1
-                    limit_amounts[symbol] = 0
-                else:
-                    limit_amounts[symbol] = limit_amount
 
-            # 5. 초과 자산을 다른 코인들에게 분배
-            if negative_count > 0 and coin_count > negative_count:
-                additional_reduction = negative_sum / (coin_count - negative_count)
-                for symbol in self.target_coins:
-                    if symbol == "USDT":
-                        continue
-                    if limit_amounts[symbol] > 0:
-                        limit_amounts[symbol] -= additional_reduction
-
-            return limit_amounts
+            # 3. 코인 개수 및 자산 균등 배분 (초과 보유분은 다른 코인 한도에서 차감)
+            return allocate_limits(usdt_balance, coin_values)
 
         except Exception as e:
             error_msg = f"주문 가능 금액 조회 중 오류 발생: {str(e)}"
@@ -247,7 +217,6 @@ class Notifier():
 
             # 2. 선물 계좌의 포지션 가치 계산
             coin_values = {}
-            total_asset = usdt_balance
 
             for symbol in self.future_target_coins:
                 if symbol == "USDT":
@@ -261,54 +230,26 @@ class Notifier():
                 # 포지션 크기 및 가치 계산
                 position_value = abs(position_amt) * entry_price
                 coin_values[symbol] = position_value
-                total_asset += position_value
 
-            # 3. 코인 개수 및 균등 배분 금액 계산
-            coin_count = len(self.future_target_coins) - 1  # USDT 제외
-            if coin_count == 0:
+            # 3. 코인 개수 및 균등 배분 (초과 포지션은 다른 코인 한도에서 차감)
+            if not coin_values:
                 raise ValueError("선물 대상 코인이 없습니다.")
-
-            target_amount_per_coin = total_asset / coin_count
-
-            # 4. 매수/매도 가능 금액 계산
-            limit_amounts = {}
-            negative_sum = 0
-            negative_count = 0
-
-            for symbol in self.future_target_coins:
-                if symbol == "USDT":
-                    continue
-
-                # 목표 금액에서 현재 포지션 가치 차감
-                limit_amount = target_amount_per_coin - coin_values.get(symbol, 0)
-
-                # 초과 보유 시 0으로 설정하고, 초과분을 누적
-                if limit_amount < 0:
-                    negative_sum += abs(limit_amount)
-                    negative_count += 1
-                    limit_amounts[symbol] = 0
-                else:
-                    limit_amounts[symbol] = limit_amount
-
-            # 5. 초과 포지션을 다른 코인들에게 분배
-            if negative_count > 0 and coin_count > negative_count:
-                additional_reduction = negative_sum / (coin_count - negative_count)
-                for symbol in self.future_target_coins:
-                    if symbol == "USDT":
-                        continue
-                    if limit_amounts[symbol] > 0:
-                        limit_amounts[symbol] -= additional_reduction
-
-            return limit_amounts
+            return allocate_limits(usdt_balance, coin_values)
 
         except Exception as e:
             error_msg = f"선물 주문 가능 금액 계산 중 오류 발생: {str(e)}"
             print(error_msg)
             return {}
 
-    def send_slack_message(self, channel_id, message):
+    def send_slack_message(self, channel_id, message, priority=None):
+        """
+        메시지를 전송 대기열에 넣고 바로 반환 (실제 전송은 SlackDispatcher 스레드)
+        priority 기본값: 에러 채널은 HIGH, 그 외 NORMAL
+        """
+        if priority is None:
+            priority = HIGH if channel_id == self.config.slack_error_channel_id else NORMAL
         try:
-            self.slack.chat_postMessage(channel=channel_id, text=message)
+            self.dispatcher.put(channel_id, message, priority)
         except Exception as e:
             print(f"Error sending message: {e}")
 
@@ -1,8 +1,17 @@
-import time
+import sys
+import os
+
+# 프로젝트 루트 디렉토리의 절대 경로를 구함
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from src.order_tracker import OrderTracker
 
 class Order:
-    def __init__(self, client):
+    def __init__(self, client, tracker=None):
         self.client = client
+        # 체결 확인은 OrderTracker 가 백그라운드에서 처리 (고정 10초 대기 없음)
+        self.tracker = tracker or OrderTracker(client)
 
     def _place_spot_order(self, symbol, side, quantity, order_type="MARKET", **kwargs):
         """
@@ -29,6 +38,9 @@ class Order:
         USDⓂ-M 선물 계좌를 사용하려면 futures_create_order()를 써야 함.
         """
         try:
+            # 시장가 주문은 체결 결과까지 응답에 담아 받음 (대부분 추가 조회 없이 체결 확인)
+            if order_type == "MARKET":
+                kwargs.setdefault("newOrderRespType", "RESULT")
             print(f"[FUTURES] 주문 실행 중: {side} {quantity} {symbol} {order_type}")
             order = self.client.futures_create_order(
                 symbol=symbol,
@@ -43,100 +55,66 @@ class Order:
             print(f"[FUTURES] 주문 실패: {e}")
             return None
 
-    def _check_spot_order_status(self, symbol, order_id):
-        try:
-            order_status = self.client.get_order(symbol=symbol, orderId=order_id)
-            print(f"[SPOT] 주문 상태: {order_status}")
-            return order_status
-        except Exception as e:
-            print(f"[SPOT] 주문 상태 확인 실패: {e}")
-            return None
-
-    def _check_futures_order_status(self, symbol, order_id):
-        try:
-            order_status = self.client.futures_get_order(symbol=symbol, orderId=order_id)
-            print(f"[FUTURES] 주문 상태: {order_status}")
-            return order_status
-        except Exception as e:
-            print(f"[FUTURES] 주문 상태 확인 실패: {e}")
+    def _track(self, order, futures, callback):
+        """
+        주문 체결 확인.
+          - callback 이 있으면 OrderHandle 을 바로 반환하고, 주문이 종료되면 callback(status) 호출
+          - callback 이 없으면 종료될 때까지 기다렸다가 상태 dict 반환 (기존 동작)
+        주문 자체가 실패하면 None 반환
+        """
+        if order is None:
             return None
+        handle = self.tracker.track(order, futures=futures, callback=callback)
+        if callback is None:
+            return handle.wait(self.tracker.timeout)
+        return handle
 
     # -------------------------
     #     Spot 전용 메서드
     # -------------------------
-    def buy(self, symbol, quantity):
+    def buy(self, symbol, quantity, callback=None):
         """
-        현물 매수 후 상태 확인.
+        현물 매수 후 상태 확인. (callback 을 주면 체결 대기 없이 바로 반환)
         """
         order = self._place_spot_order(symbol=symbol, side="BUY", quantity=quantity)
-        if order is not None:
-            order_id = order.get("orderId")
-            time.sleep(10)
-            status = self._check_spot_order_status(symbol=symbol, order_id=order_id)
-            return status
-        return None
+        return self._track(order, False, callback)
 
-    def sell(self, symbol, quantity):
+    def sell(self, symbol, quantity, callback=None):
         """
-        현물 매도 후 상태 확인.
+        현물 매도 후 상태 확인. (callback 을 주면 체결 대기 없이 바로 반환)
         """
         order = self._place_spot_order(symbol=symbol, side="SELL", quantity=quantity)
-        if order is not None:
-            order_id = order.get("orderId")
-            time.sleep(10)
-            status = self._check_spot_order_status(symbol=symbol, order_id=order_id)
-            return status
-        return None
+        return self._track(order, False, callback)
 
     # -------------------------
     #     선물(Futures) 전용 메서드
     # -------------------------
-    def L_buy(self, symbol, quantity):
+    def L_buy(self, symbol, quantity, callback=None):
         """
         선물 롱 포지션 진입
         """
         order = self._place_futures_order(symbol=symbol, side="BUY", quantity=quantity)
-        if order is not None:
-            order_id = order.get("orderId")
-            time.sleep(10)
-            status = self._check_futures_order_status(symbol=symbol, order_id=order_id)
-            return status
-        return None
+        return self._track(order, True, callback)
 
-    def L_sell(self, symbol, quantity):
+    def L_sell(self, symbol, quantity, callback=None):
         """
         선물 롱 포지션 청산
         """
         order = self._place_futures_order(symbol=symbol, side="SELL", quantity=quantity)
-        if order is not None:
-            order_id = order.get("orderId")
-            time.sleep(10)
-            status = self._check_futures_order_status(symbol=symbol, order_id=order_id)
-            return status
-        return None
+        return self._track(order, True, callback)
 
-    def S_buy(self, symbol, quantity):
+    def S_buy(self, symbol, quantity, callback=None):
         """
         선물 숏 포지션 진입
         """
         # 숏 포지션 진입 = 선물에서 side="SELL"
         order = self._place_futures_order(symbol=symbol, side="SELL", quantity=quantity)
-        if order is not None:
-            order_id = order.get("orderId")
-            time.sleep(10)
-            status = self._check_futures_order_status(symbol=symbol, order_id=order_id)
-            return status
-        return None
+        return self._track(order, True, callback)
 
-    def S_sell(self, symbol, quantity):
+    def S_sell(self, symbol, quantity, callback=None):
         """
         선물 숏 포지션 청산
         """
         # 숏 포지션 청산 = 선물에서 side="BUY"
         order = self._place_futures_order(symbol=symbol, side="BUY", quantity=quantity)
-        if order is not None:
-            order_id = order.get("orderId")
-            time.sleep(10)
-            status = self._check_futures_order_status(symbol=symbol, order_id=order_id)
-            return status
-        return None
+        return self._track(order, True, callback)
@@ -0,0 +1,139 @@
+"""
+주문 체결 확인 (논블로킹).
+
+주문을 넣은 뒤 time.sleep(10) 후 한 번 조회하던 방식 대신,
+OrderTracker 가 백그라운드 스레드에서 짧은 지수 백오프로 주문 상태를 조회하고
+종료 상태(FILLED, CANCELED, REJECTED, EXPIRED ...)가 되면 callback(status)을 호출함.
+  - 주문 응답이 이미 종료 상태면(현물 시장가 주문은 보통 바로 FILLED) 조회 없이 바로 callback
+  - 제한 시간(timeout)이 지나면 한 번 더 조회하고, 그래도 종료 상태가 아니면 그 상태로 callback.
+    이 경우 주문은 실패가 아니라 체결 여부 미확인(is_unconfirmed)이므로 거래소에서 확인 필요
+여러 주문을 동시에 추적할 수 있고, 주문을 넣은 쪽은 OrderHandle 을 받아 바로 다음 일을 진행함.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+
+TERMINAL_STATUSES = {"FILLED", "CANCELED", "REJECTED", "EXPIRED", "EXPIRED_IN_MATCH"}
+
+
+def is_unconfirmed(status):
+    """
+    제한 시간 안에 종료 상태를 확인하지 못한 주문인지 (늦게 체결됐을 수 있으므로 실패로 보면 안 됨)
+    """
+    return status is not None and status.get("status") not in TERMINAL_STATUSES
+
+
+class OrderHandle:
+    def __init__(self, symbol, order_id, futures, callback=None):
+        self.symbol = symbol
+        self.order_id = order_id
+        self.futures = futures
+        self.callback = callback
+        self.status = None      # 마지막으로 확인한 주문 상태 (바이낸스 응답 dict)
+        self.deadline = None
+        self.done = threading.Event()
+
+    @property
+    def filled(self):
+        return self.status is not None and self.status.get("status") == "FILLED"
+
+    def wait(self, timeout=None):
+        """
+        종료될 때까지 대기 후 마지막 상태 반환 (동기 방식이 필요한 곳에서 사용)
+        """
+        self.done.wait(timeout)
+        return self.status
+
+
+class OrderTracker:
+    def __init__(self, client, initial_delay=0.2, max_delay=5, timeout=60):
+        self.client = client
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+
+        self.condition = threading.Condition()
+        self.queue = []  # (다음 조회 시각, 순번, handle, 현재 대기 간격)
+        self.sequence = itertools.count()
+        self.thread = None
+
+    def track(self, order, futures=False, callback=None):
+        """
+        create_order 응답(order)을 받아 추적 시작. OrderHandle 을 바로 반환.
+        """
+        handle = OrderHandle(order.get("symbol"), order.get("orderId"), futures, callback)
+        handle.status = order
+        handle.deadline = time.monotonic() + self.timeout
+
+        if order.get("status") in TERMINAL_STATUSES:
+            self._finish(handle)
+        else:
+            self._schedule(handle, self.initial_delay)
+        return handle
+
+    def pending_count(self):
+        with self.condition:
+            return len(self.queue)
+
+    def _schedule(self, handle, delay):
+        with self.condition:
+            heapq.heappush(self.queue, (time.monotonic() + delay, next(self.sequence), handle, delay))
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+            self.condition.notify()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.queue:
+                    self.condition.wait()
+                next_check, _, handle, delay = self.queue[0]
+                wait = next_check - time.monotonic()
+                if wait > 0:
+                    self.condition.wait(wait)
+                    continue
+                heapq.heappop(self.queue)
+            self._poll(handle, delay)
+
+    def _check_status(self, handle):
+        market = "FUTURES" if handle.futures else "SPOT"
+        try:
+            if handle.futures:
+                order_status = self.client.futures_get_order(symbol=handle.symbol, orderId=handle.order_id)
+            else:
+                order_status = self.client.get_order(symbol=handle.symbol, orderId=handle.order_id)
+            print(f"[{market}] 주문 상태: {order_status}")
+            return order_status
+        except Exception as e:
+            print(f"[{market}] 주문 상태 확인 실패: {e}")
+            return None
+
+    def _poll(self, handle, delay):
+        order_status = self._check_status(handle)
+        if order_status is not None:
+            handle.status = order_status
+
+        if order_status is not None and order_status.get("status") in TERMINAL_STATUSES:
+            self._finish(handle)
+        elif time.monotonic() >= handle.deadline:
+            # 마지막 조회 이후 체결됐을 수 있으므로 한 번 더 확인
+            final_status = self._check_status(handle)
+            if final_status is not None:
+                handle.status = final_status
+            if is_unconfirmed(handle.status):
+                print(f"{handle.symbol} 주문({handle.order_id}) {self.timeout}초 동안 체결 확인 실패 (상태 미확인)")
+            self._finish(handle)
+        else:
+            self._schedule(handle, min(delay * 2, self.max_delay))
+
+    def _finish(self, handle):
+        try:
+            if handle.callback is not None:
+                handle.callback(handle.status)
+        except Exception as e:
+            print(f"주문 체결 처리 중 오류 발생: {e}")
+        finally:
+            handle.done.set()
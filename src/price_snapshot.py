@@ -0,0 +1,113 @@
+"""
+현재가 스냅샷.
+
+코인마다 get_symbol_ticker(symbol=...)를 호출하던 방식 대신,
+전체 심볼의 현재가를 한 번의 요청(get_all_tickers)으로 받아 {symbol: {"price", "time"}} 에 보관함.
+Notifier(자산 조회/보고), 한도 계산이 모두 이 스냅샷을 읽으므로 사이클당 가격 요청은 최대 1회.
+
+stream() 을 이벤트 루프 태스크로 띄우면 !miniTicker@arr 스트림으로 계속 갱신되고,
+그동안은 refresh() 가 REST를 호출하지 않음 (스냅샷이 max_age 보다 오래되면 다시 REST 사용).
+"""
+
+import asyncio
+import json
+import threading
+import time
+
+import websockets
+
+SPOT_STREAM_URL = "wss://stream.binance.com:9443"
+
+
+class PriceSnapshot:
+    def __init__(self, client, max_age=5, reconnect_delay=1, max_reconnect_delay=60):
+        self.client = client
+        self.max_age = max_age   # 이 시간(초)보다 오래된 스냅샷이면 REST로 다시 조회
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.prices = {}         # symbol -> {"price": float, "time": 갱신 시각(epoch 초)}
+        self.book = {}           # symbol -> {"bid", "ask", "time"} (refresh(book=True) 일 때만)
+        self.updated = 0.0
+        self.lock = threading.Lock()
+        self.stopped = False
+
+    def is_fresh(self):
+        return time.time() - self.updated <= self.max_age
+
+    def refresh(self, force=False, book=False):
+        """
+        전체 심볼 현재가를 한 번에 조회. 스냅샷이 충분히 최신이면(스트림 수신 중 등) 조회하지 않음.
+        """
+        if not force and self.is_fresh():
+            return False
+        try:
+            tickers = self.client.get_all_tickers()
+            book_tickers = self.client.get_orderbook_tickers() if book else []
+        except Exception as e:
+            print(f"현재가 조회 중 오류 발생: {e}")
+            return False
+
+        now = time.time()
+        with self.lock:
+            for ticker in tickers:
+                self.prices[ticker["symbol"]] = {"price": float(ticker["price"]), "time": now}
+            for ticker in book_tickers:
+                self.book[ticker["symbol"]] = {
+                    "bid": float(ticker["bidPrice"]), "ask": float(ticker["askPrice"]), "time": now,
+                }
+            self.updated = now
+        return True
+
+    def get(self, symbol):
+        with self.lock:
+            return self.prices.get(symbol)
+
+    def price(self, symbol):
+        """
+        symbol(예: "BTCUSDT")의 현재가. 스냅샷에 없으면 해당 심볼만 조회해서 채움.
+        """
+        entry = self.get(symbol)
+        if entry is None:
+            price = float(self.client.get_symbol_ticker(symbol=symbol)["price"])
+            with self.lock:
+                self.prices[symbol] = {"price": price, "time": time.time()}
+            return price
+        return entry["price"]
+
+    # -------------------------
+    #     !miniTicker@arr 스트림
+    # -------------------------
+    def on_message(self, raw):
+        events = json.loads(raw)
+        if isinstance(events, dict):
+            events = events.get("data", [])
+        now = time.time()
+        with self.lock:
+            for event in events:
+                self.prices[event["s"]] = {"price": float(event["c"]), "time": event.get("E", now * 1000) / 1000}
+            self.updated = now
+
+    async def stream(self, url=SPOT_STREAM_URL):
+        delay = self.reconnect_delay
+        while not self.stopped:
+            try:
+                async with websockets.connect(f"{url}/ws/!miniTicker@arr", ping_interval=20, ping_timeout=20) as ws:
+                    print("[SPOT] miniTicker 스트림 연결됨")
+                    delay = self.reconnect_delay
+                    async for raw in ws:
+                        self.on_message(raw)
+                        if self.stopped:
+                            break
+            except (OSError, asyncio.TimeoutError, websockets.WebSocketException) as e:
+                print(f"[SPOT] miniTicker 스트림 연결 끊김: {e}")
+            except Exception as e:
+                print(f"[SPOT] miniTicker 스트림 처리 중 오류 발생: {e}")
+
+            if self.stopped:
+                break
+            print(f"[SPOT] {delay}초 후 miniTicker 재연결 시도")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def stop(self):
+        self.stopped = True
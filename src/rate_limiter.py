@@ -0,0 +1,317 @@
+"""
+바이낸스 REST 요청 스케줄러 (요청 가중치/주문 수 한도 관리).
+
+main 의 Client 하나를 Data_Control, Notifier, Order, utils 가 같이 쓰고,
+install(client, scheduler) 로 그 Client 의 모든 요청(_request)이 스케줄러를 거치게 함.
+  - 시장(현물 /api, 선물 /fapi)별로 한도 창마다 버킷을 둠
+      요청 가중치: 1분 창 (현물 6000, 선물 2400)
+      주문 수: 현물 10초/1일, 선물 10초/1분 창
+    창은 바이낸스와 같이 epoch 기준으로 정렬되고, 요청 전에 엔드포인트별 예상 가중치만큼 미리 차감
+  - 응답 헤더(X-MBX-USED-WEIGHT-1M, X-MBX-ORDER-COUNT-*)로 서버가 센 사용량을 받아 버킷을 맞춤
+    (예상보다 많이 쓴 경우, 같은 IP 의 다른 프로세스가 쓴 경우도 반영됨)
+  - 우선순위: 주문(ORDER) > 계정/체결 조회(ACCOUNT) > 시세 폴링(DATA)
+    DATA 는 가중치 한도의 data_share(기본 80%)까지만, ACCOUNT 는 account_share 까지만 쓰고
+    나머지는 주문용으로 남겨 둠. 대기 중인 더 중요한 요청의 가중치도 먼저 빼고 계산
+  - 429/418 응답이면 Retry-After(없으면 1, 2, 4, ... 초) 동안 그 시장의 모든 요청을 멈춤.
+    주문이 아닌 요청은 max_retries 번까지 기다렸다가 다시 보내고, 주문은 중복 위험이 있어 바로 예외 전달
+
+사용 예:
+    scheduler = RequestScheduler()
+    rate_limiter.install(client, scheduler)
+"""
+
+import threading
+import time
+from urllib.parse import urlsplit
+
+from src import metrics
+
+SPOT = "SPOT"
+FUTURES = "FUTURES"
+
+# 요청 우선순위 (숫자가 작을수록 먼저)
+ORDER = 0
+ACCOUNT = 1
+DATA = 2
+PRIORITY_NAMES = ("order", "account", "data")
+
+# 시장별 한도 {시장: {"weight": [(응답 헤더, 창 길이(초), 한도)], "orders": [...]}}
+DEFAULT_LIMITS = {
+    SPOT: {
+        "weight": [("X-MBX-USED-WEIGHT-1M", 60, 6000)],
+        "orders": [("X-MBX-ORDER-COUNT-10S", 10, 100), ("X-MBX-ORDER-COUNT-1D", 86400, 200000)],
+    },
+    FUTURES: {
+        "weight": [("X-MBX-USED-WEIGHT-1M", 60, 2400)],
+        "orders": [("X-MBX-ORDER-COUNT-10S", 10, 300), ("X-MBX-ORDER-COUNT-1M", 60, 1200)],
+    },
+}
+
+# 엔드포인트별 요청 가중치 (표에 없으면 1, 실제 사용량은 응답 헤더로 보정)
+REQUEST_WEIGHTS = {
+    "/api/v3/klines": 2,
+    "/api/v3/account": 20,
+    "/api/v3/myTrades": 20,
+    "/api/v3/order": 4,
+    "/api/v3/exchangeInfo": 20,
+    "/api/v3/ticker/price": 4,
+    "/api/v3/ticker/bookTicker": 4,
+    "/fapi/v1/klines": 5,
+    "/fapi/v1/exchangeInfo": 1,
+    "/fapi/v1/order": 1,
+    "/fapi/v2/account": 5,
+    "/fapi/v2/balance": 5,
+    "/fapi/v2/positionRisk": 5,
+    "/fapi/v3/balance": 5,
+    "/fapi/v3/positionRisk": 5,
+}
+# symbol 을 지정하면 가중치가 줄어드는 시세 엔드포인트
+SINGLE_SYMBOL_WEIGHTS = {
+    "/api/v3/ticker/price": 2,
+    "/api/v3/ticker/bookTicker": 2,
+}
+# 선물 kline 은 limit 에 따라 가중치가 달라짐 [(limit 상한, 가중치)]
+FUTURES_KLINE_WEIGHTS = [(99, 1), (499, 2), (1000, 5)]
+
+BACKOFF_STATUS = (429, 418)
+MAX_BACKOFF = 60
+
+
+def classify(method, uri, signed, params=None):
+    """
+    요청 -> (시장, 예상 가중치, 우선순위, 주문 여부)
+    """
+    path = urlsplit(uri).path
+    market = FUTURES if path.startswith("/fapi") else SPOT
+    params = params or {}
+    method = method.lower()
+
+    is_order = method in ("post", "delete") and path.endswith("/order")
+    if is_order:
+        weight = 1
+    elif path == "/fapi/v1/klines":
+        limit = int(params.get("limit", 500))
+        weight = next((w for bound, w in FUTURES_KLINE_WEIGHTS if limit <= bound), 10)
+    elif path in SINGLE_SYMBOL_WEIGHTS and params.get("symbol"):
+        weight = SINGLE_SYMBOL_WEIGHTS[path]
+    else:
+        weight = REQUEST_WEIGHTS.get(path, 1)
+
+    if is_order:
+        priority = ORDER
+    elif signed:
+        # 잔고/포지션/체결 확인 등 서명이 필요한 조회는 주문 흐름에 속함
+        priority = ACCOUNT
+    else:
+        priority = DATA
+    return market, weight, priority, is_order
+
+
+class WindowBucket:
+    """
+    epoch 기준으로 정렬된 고정 창 하나의 사용량 (바이낸스 한도 창과 같은 경계에서 초기화)
+    """
+    def __init__(self, header, interval, limit):
+        self.header = header
+        self.interval = interval
+        self.limit = limit
+        self.window = None
+        self.used = 0
+
+    def _roll(self, now):
+        window = int(now // self.interval)
+        if window != self.window:
+            self.window = window
+            self.used = 0
+
+    def available(self, now, share=1.0):
+        self._roll(now)
+        return self.limit * share - self.used
+
+    def reset_in(self, now):
+        self._roll(now)
+        return (self.window + 1) * self.interval - now
+
+    def take(self, amount, now):
+        self._roll(now)
+        self.used += amount
+
+    def sync(self, used, now):
+        """
+        서버가 알려준 사용량으로 맞춤. 아직 응답이 오지 않은 요청의 예약분이 있으므로 큰 값을 유지
+        """
+        self._roll(now)
+        self.used = max(self.used, used)
+
+
+class RequestScheduler:
+    def __init__(self, limits=None, data_share=0.8, account_share=0.9, max_retries=2, clock=time.time):
+        limits = limits or DEFAULT_LIMITS
+        self.shares = (1.0, account_share, data_share)
+        self.max_retries = max_retries
+        self.clock = clock
+
+        self.condition = threading.Condition()
+        self.weights = {market: [WindowBucket(*spec) for spec in spec_list["weight"]]
+                        for market, spec_list in limits.items()}
+        self.orders = {market: [WindowBucket(*spec) for spec in spec_list["orders"]]
+                       for market, spec_list in limits.items()}
+        # 시장별 우선순위별 대기 중인 요청 가중치 합계
+        self.pending = {market: [0, 0, 0] for market in limits}
+        self.blocked_until = {market: 0 for market in limits}
+        self.failures = {market: 0 for market in limits}
+
+    # -------------------------
+    #     요청 전 예약
+    # -------------------------
+    def _delay(self, market, weight, priority, is_order, now):
+        """
+        지금 보내도 되면 0, 아니면 다시 확인할 때까지 기다릴 시간(초)
+        """
+        delay = self.blocked_until[market] - now
+        # 더 중요한 요청이 기다리고 있으면 그 몫을 먼저 남겨 둠
+        ahead = sum(self.pending[market][:priority])
+        for bucket in self.weights[market]:
+            room = bucket.available(now, self.shares[priority]) - ahead
+            # 창이 비어 있으면 한도보다 큰 요청도 보냄 (영원히 못 보내는 것 방지)
+            if weight > room and bucket.used > 0:
+                delay = max(delay, bucket.reset_in(now))
+        if is_order:
+            for bucket in self.orders[market]:
+                if bucket.available(now) < 1:
+                    delay = max(delay, bucket.reset_in(now))
+        return delay
+
+    def acquire(self, market, weight, priority=DATA, is_order=False):
+        """
+        한도 안에서 보낼 수 있을 때까지 기다렸다가 가중치(주문이면 주문 수도)를 예약. 기다린 시간(초) 반환
+        """
+        started = time.monotonic()
+        with self.condition:
+            self.pending[market][priority] += weight
+            try:
+                while True:
+                    now = self.clock()
+                    delay = self._delay(market, weight, priority, is_order, now)
+                    if delay <= 0:
+                        break
+                    # 더 중요한 요청이 먼저 예약하면 notify 로 깨어나 다시 계산
+                    self.condition.wait(min(delay, 1.0))
+            finally:
+                self.pending[market][priority] -= weight
+            for bucket in self.weights[market]:
+                bucket.take(weight, now)
+            if is_order:
+                for bucket in self.orders[market]:
+                    bucket.take(1, now)
+            # 대기 가중치가 줄었으므로 덜 중요한 요청이 다시 계산하게 깨움
+            self.condition.notify_all()
+        waited = time.monotonic() - started
+        if waited > 0.001:
+            metrics.API_THROTTLE_SECONDS.observe(waited, market, PRIORITY_NAMES[priority])
+        return waited
+
+    # -------------------------
+    #     응답 반영
+    # -------------------------
+    def update(self, market, headers):
+        """
+        응답 헤더의 사용량으로 버킷을 맞춤
+        """
+        if not headers:
+            return
+        with self.condition:
+            now = self.clock()
+            for bucket in self.weights[market] + self.orders[market]:
+                value = headers.get(bucket.header)
+                if value is not None:
+                    try:
+                        bucket.sync(int(value), now)
+                    except ValueError:
+                        pass
+
+    def succeeded(self, market):
+        if self.failures[market]:
+            with self.condition:
+                self.failures[market] = 0
+
+    def backoff(self, market, status_code, headers=None):
+        """
+        429/418 응답: Retry-After(없으면 지수 증가) 동안 해당 시장의 모든 요청을 멈춤
+        """
+        retry_after = (headers or {}).get("Retry-After")
+        with self.condition:
+            self.failures[market] += 1
+            try:
+                seconds = float(retry_after)
+            except (TypeError, ValueError):
+                seconds = min(2 ** (self.failures[market] - 1), MAX_BACKOFF)
+            until = self.clock() + seconds
+            if until > self.blocked_until[market]:
+                self.blocked_until[market] = until
+                print(f"바이낸스 요청 제한({status_code}, {market}): {seconds:.0f}초 동안 요청 중단")
+            self.condition.notify_all()
+        metrics.API_BACKOFFS.inc(market, str(status_code))
+
+    def usage(self):
+        """
+        {시장: {헤더: (사용량, 한도)}} 현재 창 기준 (상태 확인용)
+        """
+        with self.condition:
+            now = self.clock()
+            result = {}
+            for market in self.weights:
+                result[market] = {}
+                for bucket in self.weights[market] + self.orders[market]:
+                    bucket._roll(now)
+                    result[market][bucket.header] = (bucket.used, bucket.limit)
+            return result
+
+
+def _market_of(response):
+    return FUTURES if urlsplit(getattr(response, "url", "") or "").path.startswith("/fapi") else SPOT
+
+
+def install(client, scheduler):
+    """
+    client 의 모든 REST 요청이 scheduler 를 거치도록 _request / _handle_response 를 감쌈.
+    같은 client 에 두 번 호출해도 한 번만 감쌈.
+    응답 헤더는 client.response(스레드끼리 공유) 대신 _handle_response 로 넘어오는 응답 객체에서 읽음
+    """
+    if getattr(client, "_rate_limited", False):
+        return client
+    original_request = client._request
+    original_handle = client._handle_response
+
+    def _handle_response(response):
+        market = _market_of(response)
+        scheduler.update(market, getattr(response, "headers", None))
+        if response.status_code in BACKOFF_STATUS:
+            scheduler.backoff(market, response.status_code, response.headers)
+        elif 200 <= response.status_code < 300:
+            scheduler.succeeded(market)
+        return original_handle(response)
+
+    def _request(method, uri, signed, force_params=False, **kwargs):
+        params = kwargs.get("data") or kwargs.get("params")
+        market, weight, priority, is_order = classify(method, uri, signed, params if isinstance(params, dict) else None)
+        attempt = 0
+        while True:
+            scheduler.acquire(market, weight, priority, is_order)
+            # 서명 요청은 data 에 timestamp/signature 를 덧붙이므로 재시도마다 원본의 복사본을 넘김
+            attempt_kwargs = dict(kwargs)
+            if isinstance(attempt_kwargs.get("data"), dict):
+                attempt_kwargs["data"] = dict(attempt_kwargs["data"])
+            try:
+                return original_request(method, uri, signed, force_params, **attempt_kwargs)
+            except Exception as e:
+                status_code = getattr(e, "status_code", None)
+                # 주문은 다시 보내지 않음. 나머지는 제한이 풀리면 (acquire 가 기다림) 재시도
+                if status_code not in BACKOFF_STATUS or is_order or attempt >= scheduler.max_retries:
+                    raise
+                attempt += 1
+
+    client._handle_response = _handle_response
+    client._request = _request
+    client._rate_limited = True
+    return client
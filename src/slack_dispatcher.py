@@ -0,0 +1,161 @@
+"""
+슬랙 알림 백그라운드 전송.
+
+Notifier.send_slack_message 는 메시지를 대기열에 넣고 바로 반환하고,
+전송은 SlackDispatcher 스레드가 맡음. 그래서 주문 처리 흐름이 슬랙 API 응답을 기다리지 않음.
+  - 채널별로 interval 동안 쌓인 메시지를 한 번의 chat_postMessage 로 합쳐서 전송
+  - 429(rate limit) 응답이면 Retry-After 만큼 해당 채널 전송을 미루고 메시지는 원래 우선순위 그대로 다시 대기열 앞에 넣음
+  - 대기열은 max_size 개로 제한. 가득 차면 우선순위가 낮은 메시지부터 버리고,
+    버린 개수는 다음 전송에 "N건 생략" 한 줄로 요약
+"""
+
+import threading
+import time
+
+from slack_sdk.errors import SlackApiError
+
+from src import metrics
+
+# 메시지 우선순위 (숫자가 작을수록 중요)
+HIGH = 0     # 오류 알림
+NORMAL = 1   # 체결/자산 보고
+LOW = 2      # 참고용 알림 (가득 차면 가장 먼저 버림)
+
+# 한 번에 보낼 메시지 최대 길이 (슬랙 text 제한보다 충분히 작게)
+MAX_POST_LENGTH = 3500
+
+
+class SlackDispatcher:
+    def __init__(self, slack, interval=1, max_size=200):
+        self.slack = slack
+        self.interval = interval
+        self.max_size = max_size
+
+        self.condition = threading.Condition()
+        self.queues = {}          # channel -> [(priority, text), ...]
+        self.size = 0
+        self.dropped = {}         # channel -> 버린 메시지 수
+        self.retry_at = {}        # channel -> 이 시각(monotonic) 전에는 전송하지 않음
+        self.sending = 0          # 전송 중인 배치 수 (flush 대기용)
+        self.thread = None
+        self.stopped = False
+
+    # -------------------------
+    #     대기열
+    # -------------------------
+    def _evict(self, priority):
+        """
+        priority 보다 덜 중요한 메시지 중 가장 오래된 것 하나를 버림. 버렸으면 True
+        """
+        for lowest in range(LOW, priority, -1):
+            for channel, queue in self.queues.items():
+                for i, (p, _) in enumerate(queue):
+                    if p == lowest:
+                        del queue[i]
+                        self.size -= 1
+                        self.dropped[channel] = self.dropped.get(channel, 0) + 1
+                        return True
+        return False
+
+    def put(self, channel, text, priority=NORMAL):
+        with self.condition:
+            if self.size >= self.max_size and not self._evict(priority):
+                # 더 덜 중요한 메시지가 없으면 새 메시지를 버리고 개수만 기록
+                self.dropped[channel] = self.dropped.get(channel, 0) + 1
+                return False
+            self.queues.setdefault(channel, []).append((priority, text))
+            self.size += 1
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+            self.condition.notify()
+            return True
+
+    def _take_batch(self, channel):
+        """
+        channel 대기열에서 MAX_POST_LENGTH 안에 들어가는 만큼 꺼냄. (생략된 수, [(priority, text), ...]) 반환
+        """
+        queue = self.queues[channel]
+        items = []
+        length = 0
+        dropped = self.dropped.pop(channel, 0)
+        # 중요한 메시지 먼저, 같은 우선순위는 들어온 순서대로
+        queue.sort(key=lambda item: item[0])
+        while queue and (not items or length + len(queue[0][1]) <= MAX_POST_LENGTH):
+            item = queue.pop(0)
+            items.append(item)
+            length += len(item[1])
+            self.size -= 1
+        return dropped, items
+
+    # -------------------------
+    #     전송 스레드
+    # -------------------------
+    def _run(self):
+        while not self.stopped:
+            with self.condition:
+                if self.size == 0 and not self.dropped:
+                    self.condition.wait()
+                    continue
+            # 같은 채널에 연달아 들어온 메시지를 모으기 위해 interval 만큼 기다렸다가 전송
+            time.sleep(self.interval)
+
+            batches = []
+            with self.condition:
+                now = time.monotonic()
+                for channel in list(self.queues):
+                    if self.retry_at.get(channel, 0) > now:
+                        continue
+                    if self.queues[channel] or self.dropped.get(channel):
+                        batches.append((channel, *self._take_batch(channel)))
+                self.sending += len(batches)
+
+            for channel, dropped, items in batches:
+                try:
+                    self._post(channel, dropped, items)
+                finally:
+                    with self.condition:
+                        self.sending -= 1
+                        self.condition.notify_all()
+
+    def _post(self, channel, dropped, items):
+        texts = [text for _, text in items]
+        if dropped:
+            texts.insert(0, f"(대기열 초과로 알림 {dropped}건 생략)")
+        try:
+            with metrics.stage("slack_post"):
+                self.slack.chat_postMessage(channel=channel, text="\n\n".join(texts))
+        except SlackApiError as e:
+            if e.response is not None and e.response.status_code == 429:
+                retry_after = int(e.response.headers.get("Retry-After", 1))
+                print(f"슬랙 전송 제한: {retry_after}초 후 재시도")
+                with self.condition:
+                    self.retry_at[channel] = time.monotonic() + retry_after
+                    # 원래 우선순위 그대로 다시 대기열 앞에 넣음 (낮은 우선순위는 여전히 먼저 버려질 수 있음)
+                    queue = self.queues.setdefault(channel, [])
+                    queue[:0] = items
+                    self.size += len(items)
+                    if dropped:
+                        self.dropped[channel] = self.dropped.get(channel, 0) + dropped
+            else:
+                print(f"Error sending message: {e}")
+        except Exception as e:
+            print(f"Error sending message: {e}")
+
+    def flush(self, timeout=10):
+        """
+        대기 중인 메시지가 모두 전송될 때까지 최대 timeout 초 대기 (종료 직전 등)
+        """
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            while self.size > 0 or self.sending > 0:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self.condition.wait(remaining)
+        return True
+
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
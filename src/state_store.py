@@ -0,0 +1,259 @@
+"""
+실시간 루프 상태 스냅샷 / 저널 (재시작 시 빠른 복구).
+
+재시작할 때마다 모든 심볼/타임프레임의 캔들을 다시 받고 지표를 처음부터 계산하면서
+현물 매수 단계와 선물 포지션 단계도 잊어버리던 것을 디스크에 남겨 둔 상태로 이어서 시작함.
+  - snapshot(): Data_Control 의 링버퍼 캔들 저장소/스트리밍 지표 상태와
+    buy_sell_status(현물 매수 단계), futures_status(선물 포지션/단계/수량)를
+    cache/state/snapshot.pickle 에 저장.
+    임시 파일에 쓰고 os.replace 로 교체하므로 쓰는 도중에 죽어도 직전 스냅샷이 남음
+  - record(): 매 사이클 상태를 직전 기록과 비교해서 바뀐 티커만 journal.jsonl 에 한 줄씩 추가 (fsync).
+    주문 체결 콜백(OrderTracker 스레드)에서 바뀐 단계도 다음 사이클에 기록됨
+  - 스냅샷을 저장하면 그때까지의 저널은 비움. 각 줄의 seq 로 스냅샷 이후 기록만 다시 적용
+  - load() + resume(): 스냅샷의 저장소/지표 상태를 Data_Control 에 넣고 빠진 캔들만 backfill 로 받음
+    (빠진 캔들이 window_length 이상이면 backfill 이 warmup 으로 다시 초기화).
+    지표 설정(indicators, window_length)이 바뀌었으면 캔들/지표는 버리고 단계 상태만 복원
+"""
+
+import json
+import os
+import pickle
+import threading
+import time
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+STATE_DIR = os.path.join(project_root, "cache", "state")
+
+# 스냅샷 형식이 바뀌면 올림 (이전 형식은 읽지 않음)
+SNAPSHOT_VERSION = 1
+
+SPOT = "SPOT"
+FUTURES = "FUTURES"
+
+
+def _copy_status(status):
+    # 체결 콜백 스레드가 값을 바꾸는 중일 수 있으므로 티커별로 얕게 복사
+    return {ticker: dict(state) for ticker, state in list(status.items())}
+
+
+def reconcile_status(buy_sell_status, futures_status, asset_info, futures_asset_info):
+    """
+    복원한 단계 상태를 실제 잔고/포지션과 맞춤 (재시작 전후로 수동 청산된 경우 등).
+      - 현물: 보유 수량이 0인데 매수 단계가 남아 있으면 0단계로
+      - 선물: 거래소 포지션이 없는데 포지션이 남아 있으면 초기화
+    """
+    for ticker, state in buy_sell_status.items():
+        # 잔고 조회에 실패해서 정보가 없는 티커는 그대로 둠
+        if ticker not in asset_info:
+            continue
+        if state.get("buy_stage", 0) > 0 and asset_info[ticker].get("total_quantity", 0) == 0:
+            print(f"[SPOT] {ticker} 보유 수량이 없어 매수 단계를 초기화합니다.")
+            state["buy_stage"] = 0
+    if "USDT" not in futures_asset_info:
+        return
+    for ticker, state in futures_status.items():
+        if state.get("position") and futures_asset_info.get(f"{ticker}USDT", {}).get("position_amt", 0) == 0:
+            print(f"[FUTURES] {ticker} 거래소 포지션이 없어 포지션 상태를 초기화합니다.")
+            state.update({"position": None, "stage": 0, "quantity": 0})
+
+
+class StateStore:
+    def __init__(self, data_control, state_dir=STATE_DIR):
+        self.data_control = data_control
+        self.state_dir = state_dir
+        self.snapshot_path = os.path.join(state_dir, "snapshot.pickle")
+        self.journal_path = os.path.join(state_dir, "journal.jsonl")
+        self.seq = 0
+        self.recorded = {SPOT: {}, FUTURES: {}}   # 시장 -> {티커: 마지막으로 기록한 상태(json)}
+        self.restored = None                       # load() 결과 (resume 에서 사용)
+        self.last_snapshot = 0.0
+        # 저널 추가(record)와 스냅샷 후 저널 정리(write, 스레드)가 겹치지 않도록
+        self.lock = threading.Lock()
+
+    def _fingerprint(self):
+        return {
+            "indicators": list(self.data_control.indicators),
+            "window_length": self.data_control.window_length,
+        }
+
+    # -------------------------
+    #     복원
+    # -------------------------
+    def _read_journal(self, after_seq):
+        """
+        seq > after_seq 인 저널 기록. 마지막 줄이 쓰다 만 상태면 건너뜀
+        """
+        entries = []
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if entry.get("seq", 0) > after_seq:
+                        entries.append(entry)
+        except OSError:
+            pass
+        return entries
+
+    def load(self):
+        """
+        스냅샷 + 이후 저널을 읽어서 {"candle_stores", "indicator_states", "status", "saved"} 반환.
+        아무것도 없으면 None
+        """
+        snapshot = None
+        try:
+            with open(self.snapshot_path, "rb") as f:
+                snapshot = pickle.load(f)
+            if snapshot.get("version") != SNAPSHOT_VERSION:
+                print("상태 스냅샷 형식이 달라 사용하지 않습니다.")
+                snapshot = None
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"상태 스냅샷 읽기 실패: {e}")
+            snapshot = None
+
+        restored = {
+            "candle_stores": {}, "indicator_states": {},
+            "status": {SPOT: {}, FUTURES: {}}, "saved": None,
+        }
+        after_seq = 0
+        if snapshot is not None:
+            restored["status"] = snapshot["status"]
+            restored["saved"] = snapshot["saved"]
+            after_seq = snapshot["journal_seq"]
+            if snapshot["fingerprint"] == self._fingerprint():
+                restored["candle_stores"] = snapshot["candle_stores"]
+                restored["indicator_states"] = snapshot["indicator_states"]
+            else:
+                print("지표 설정이 바뀌어 저장된 캔들/지표 상태는 사용하지 않습니다.")
+
+        entries = self._read_journal(after_seq)
+        for entry in entries:
+            restored["status"].setdefault(entry["market"], {})[entry["ticker"]] = entry["state"]
+        self.seq = max([after_seq] + [entry["seq"] for entry in entries])
+
+        if snapshot is None and not entries:
+            return None
+        self.restored = restored
+        saved = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(restored["saved"])) if restored["saved"] else "-"
+        print(f"저장된 상태 복원: 스냅샷 {saved}, 캔들 저장소 {len(restored['candle_stores'])}개, 저널 {len(entries)}건")
+        return restored
+
+    def restore_status(self, buy_sell_status, futures_status):
+        """
+        복원한 단계 상태를 현재 설정된 티커에만 덮어씀 (설정에서 빠진 티커는 버림)
+        """
+        if self.restored is None:
+            return
+        for market, status in ((SPOT, buy_sell_status), (FUTURES, futures_status)):
+            saved = self.restored["status"].get(market, {})
+            for ticker in status:
+                if ticker in saved:
+                    status[ticker].update(saved[ticker])
+            # 복원한 상태는 이미 디스크에 있으므로 다시 기록하지 않음
+            self.recorded[market] = {ticker: json.dumps(state, sort_keys=True) for ticker, state in _copy_status(status).items()}
+
+    def restorable(self, key):
+        """
+        key = (symbol, timeframe, futures) 의 저장된 캔들 저장소가 있어 resume 이 backfill 만 하면 되는지
+        """
+        store = self.restored["candle_stores"].get(key) if self.restored else None
+        return store is not None and len(store) > 0
+
+    def resume(self, client, symbol, timeframe, futures=False):
+        """
+        저장된 캔들 저장소가 있으면 넣고 빠진 캔들만 받아 지표를 이어서 계산, 없으면 warmup
+        """
+        key = (symbol, timeframe, futures)
+        data_control = self.data_control
+        if not self.restorable(key):
+            return data_control.warmup(client, symbol, timeframe, futures=futures)
+
+        data_control.candle_stores[key] = self.restored["candle_stores"][key]
+        state = self.restored["indicator_states"].get(key)
+        if state is not None:
+            data_control.indicator_states[key] = state
+        try:
+            frame = data_control.backfill(client, symbol, timeframe, futures=futures)
+        except Exception as e:
+            print(f"{symbol} {timeframe} 저장된 캔들 이어받기 실패, 초기 데이터를 다시 조회합니다: {e}")
+            data_control.candle_stores.pop(key, None)
+            data_control.indicator_states.pop(key, None)
+            return data_control.warmup(client, symbol, timeframe, futures=futures)
+        return data_control.update_indicator(key, frame)
+
+    # -------------------------
+    #     기록
+    # -------------------------
+    def record(self, buy_sell_status, futures_status):
+        """
+        직전 기록 이후 바뀐 티커의 상태만 저널에 추가. 추가한 줄 수 반환
+        """
+        lines = []
+        now = time.time()
+        for market, status in ((SPOT, buy_sell_status), (FUTURES, futures_status)):
+            recorded = self.recorded[market]
+            for ticker, state in _copy_status(status).items():
+                encoded = json.dumps(state, sort_keys=True)
+                if recorded.get(ticker) == encoded:
+                    continue
+                recorded[ticker] = encoded
+                self.seq += 1
+                lines.append(json.dumps({"seq": self.seq, "time": now, "market": market, "ticker": ticker, "state": state}))
+        if not lines:
+            return 0
+        try:
+            os.makedirs(self.state_dir, exist_ok=True)
+            with self.lock, open(self.journal_path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError as e:
+            print(f"상태 저널 기록 실패: {e}")
+        return len(lines)
+
+    def dump(self, buy_sell_status, futures_status):
+        """
+        스냅샷 바이트. 캔들 저장소/지표 상태를 바꾸는 갱신 작업이 없을 때(사이클 사이) 호출해야 함
+        """
+        self.record(buy_sell_status, futures_status)
+        snapshot = {
+            "version": SNAPSHOT_VERSION,
+            "saved": time.time(),
+            "fingerprint": self._fingerprint(),
+            "journal_seq": self.seq,
+            "candle_stores": self.data_control.candle_stores,
+            "indicator_states": self.data_control.indicator_states,
+            "status": {SPOT: _copy_status(buy_sell_status), FUTURES: _copy_status(futures_status)},
+        }
+        return pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL), self.seq
+
+    def write(self, payload, seq):
+        """
+        dump() 결과를 디스크에 저장하고, 스냅샷에 포함된 저널(seq 이하)을 비움 (스레드에서 호출 가능)
+        """
+        try:
+            os.makedirs(self.state_dir, exist_ok=True)
+            with open(self.snapshot_path + ".tmp", "wb") as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(self.snapshot_path + ".tmp", self.snapshot_path)
+            with self.lock:
+                # 그 사이 record() 가 추가한 줄은 남겨 둠
+                remaining = [json.dumps(entry) for entry in self._read_journal(seq)]
+                with open(self.journal_path + ".tmp", "w", encoding="utf-8") as f:
+                    f.write("".join(line + "\n" for line in remaining))
+                os.replace(self.journal_path + ".tmp", self.journal_path)
+            self.last_snapshot = time.time()
+            return True
+        except OSError as e:
+            print(f"상태 스냅샷 저장 실패: {e}")
+            return False
+
+    def snapshot(self, buy_sell_status, futures_status):
+        return self.write(*self.dump(buy_sell_status, futures_status))
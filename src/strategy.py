@@ -11,8 +11,14 @@ import numpy as np
 
 import src.utils
 class Strategy:
-    def __init__(self):
-        pass
+    def __init__(self, params=None):
+        # 전략이 사용하는 지표 (src/indicator_registry.py 이름) - 이 지표들만 계산됨
+        # MACD_signal: SMA_20/60/120, MACD, MACD_signal, rsi
+        self.required_indicators = ("sma", "rsi", "macd")
+        # 전략이 참조하는 과거 봉 수 (MACD_signal 은 최근 6봉까지 참조)
+        self.history_length = 6
+        # MACD_signal 파라미터 중 기본값(src.utils.MACD_SIGNAL_PARAMS)에서 바꿀 값
+        self.params = params
 
     def signal(self, data_dict, future, account_info):
         """
@@ -33,7 +39,7 @@ class Strategy:
 
         try:
 
-            current_price, signal, weight, reason, stop_loss, take_profit = src.utils.MACD_signal(data_dict, future, account_info)
+            current_price, signal, weight, reason, stop_loss, take_profit = src.utils.MACD_signal(data_dict, future, account_info, self.params)
 
             # 결과 반환
             return {
@@ -1,11 +1,79 @@
 import math
+import threading
+import sys
+import os
 from decimal import Decimal, ROUND_DOWN
 
+# 프로젝트 루트 디렉토리의 절대 경로를 구함
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from src.slack_dispatcher import LOW
+from src.order_tracker import is_unconfirmed
+
 class TradeManager:
     def __init__(self, order_executor, notifier, config):
         self.order = order_executor
         self.notifier = notifier
         self.config = config
+        # 체결 확인 중인 주문 수 {("SPOT"/"FUTURES", ticker): count}
+        self.pending_orders = {}
+        self.lock = threading.Lock()
+
+    def has_pending_order(self, market, ticker):
+        with self.lock:
+            return self.pending_orders.get((market, ticker), 0) > 0
+
+    def _submit(self, market, ticker, place, on_done):
+        """
+        주문을 넣고 체결 확인은 OrderTracker 에 맡김 (기다리지 않고 바로 반환).
+        place(callback): Order 메서드 호출, on_done(status): 주문 종료 시 호출되는 처리
+        주문 자체가 실패하면(handle 없음) 바로 on_done(None) 호출
+        """
+        key = (market, ticker)
+        with self.lock:
+            self.pending_orders[key] = self.pending_orders.get(key, 0) + 1
+
+        def done(status):
+            try:
+                on_done(status)
+            finally:
+                with self.lock:
+                    self.pending_orders[key] -= 1
+
+        handle = place(done)
+        if handle is None:
+            done(None)
+        return handle
+
+    def _submit_later(self, market, ticker, submit):
+        """
+        체결 콜백(OrderTracker 스레드) 안에서 이어지는 주문. 주문 API 호출이 체결 확인 폴링을 막지 않도록
+        별도 스레드에서 submit() 을 실행하고, 끝날 때까지 pending_orders 에 포함해 다른 주문이 끼어들지 않게 함
+        """
+        key = (market, ticker)
+        with self.lock:
+            self.pending_orders[key] = self.pending_orders.get(key, 0) + 1
+
+        def run():
+            try:
+                submit()
+            except Exception as e:
+                print(f"{ticker} 후속 주문 처리 중 오류 발생: {e}")
+            finally:
+                with self.lock:
+                    self.pending_orders[key] -= 1
+
+        threading.Thread(target=run, name=f"submit-{ticker}", daemon=True).start()
+
+    def _report_unconfirmed(self, ticker, action, status):
+        """
+        제한 시간 안에 체결을 확인하지 못한 주문. 늦게 체결됐을 수 있으므로 실패로 처리하지 않고 확인 요청만 알림
+        """
+        message = (f"{ticker} {action} 체결 여부 미확인 (주문번호 {status.get('orderId')}, 상태 {status.get('status')}): "
+                   f"거래소에서 주문 상태 확인 필요")
+        print(message)
+        self.notifier.send_slack_message(self.config.slack_error_channel_id, message)
 
     def _truncate_by_step_size(self, value, step):
         """
@@ -34,7 +102,7 @@ class TradeManager:
                           }
         :param spot_limit_amount: 코인별 매매 한도 (USDT 기준)
         :param buy_sell_status: { ticker: {"buy_stage": int}, ... } - 현재 매수단계 추적
-        :param symbol_info: { "stepSize": float, "minQty": float } - 바이낸스 거래 규칙 정보
+        :param symbol_info: { "stepSize": float, "minQty": float, "minNotional": float, ... } - 바이낸스 거래 규칙 정보 (utils.get_symbol_info)
         """
         try:
             signal_type = signal["signal"]
@@ -42,6 +110,12 @@ class TradeManager:
 
             step_size = symbol_info["stepSize"]
             min_qty   = symbol_info["minQty"]
+            min_notional = symbol_info.get("minNotional", 0.0)
+
+            # 이전 주문의 체결 확인이 끝나기 전에는 같은 코인에 새 주문을 넣지 않음
+            if signal_type in ("buy", "sell") and self.has_pending_order("SPOT", ticker):
+                print(f"{ticker}: 체결 확인 중인 주문이 있어 {signal_type} 신호 스킵")
+                return
 
             # ----------------------
             #   매수 시그널
@@ -50,7 +124,7 @@ class TradeManager:
                 current_stage = buy_sell_status[ticker]["buy_stage"]
                 target_stage  = signal.get("weight", 1)
 
-                # 현재 단계 < 목표 단계라면, (current_stage+1 ~ target_stage) 순차 매수
+                # 현재 단계 < 목표 단계라면, (current_stage+1 ~ target_stage) 단계별 매수 주문 (체결 확인은 비동기)
                 if target_stage > current_stage:
                     for stage in range(current_stage + 1, target_stage + 1):
                         entry_price  = current_price
@@ -65,29 +139,18 @@ class TradeManager:
                                   f"최소 주문량({min_qty}) 미만 (계산수량={quantity})")
                             continue
 
+                        # 최소 주문금액(MIN_NOTIONAL) 미만이면 거래소에서 거절되므로 스킵
+                        if quantity * entry_price < min_notional:
+                            print(f"{ticker} {stage}단계 매수 실패: "
+                                  f"최소 주문금액({min_notional}) 미만 (주문금액={quantity * entry_price})")
+                            continue
+
                         print(f"{ticker} {stage}단계 매수 진행: 수량 {quantity}")
-                        status = self.order.buy(symbol=f"{ticker}USDT", quantity=quantity)
-
-                        if status and status.get("status") == "FILLED":
-                            print(f"{ticker} {stage}단계 매수 성공")
-                            message = (
-                                f"매수 진행 신호 발생\n"
-                                f"- 매수 비중(단계): {signal.get('weight')}\n"
-                                f"- 매수 근거: {signal.get('reason')}\n"
-                                f"- 손절 퍼센트: {signal.get('stop_loss')}\n"
-                                f"- 익절 퍼센트: {signal.get('take_profit')}"
-                            )
-                            self.notifier.send_slack_message(self.config.slack_trade_channel_id, message)
-
-                            # 스테이지 갱신
-                            buy_sell_status[ticker]["buy_stage"] = stage
-
-                        else:
-                            print(f"{ticker} {stage}단계 매수 실패: 주문 상태 미확인")
-                            self.notifier.send_slack_message(
-                                self.config.slack_error_channel_id,
-                                f"{ticker} {stage}단계 매수 실패: 주문 상태 확인 필요"
-                            )
+                        self._submit(
+                            "SPOT", ticker,
+                            lambda callback, quantity=quantity: self.order.buy(symbol=f"{ticker}USDT", quantity=quantity, callback=callback),
+                            lambda status, stage=stage: self._on_spot_buy(ticker, stage, signal, buy_sell_status, status),
+                        )
 
             # ----------------------
             #   매도 시그널
@@ -113,14 +176,24 @@ class TradeManager:
                             f"- 매도 비중(단계): {signal.get('weight')}\n"
                             f"- 매도 근거: {signal.get('reason')}"
                         )
-                        self.notifier.send_slack_message(self.config.slack_trade_channel_id, message)
-
-                        status = self.order.sell(symbol=f"{ticker}USDT", quantity=quantity)
-                        if status and status.get("status") == "FILLED":
-                            # 현재 단계에서 target_stage 만큼 소진
-                            buy_sell_status[ticker]["buy_stage"] -= target_stage
-                            if buy_sell_status[ticker]["buy_stage"] < 0:
-                                buy_sell_status[ticker]["buy_stage"] = 0
+                        # 주문 전 참고용 알림이라 대기열이 가득 차면 먼저 버려도 됨
+                        self.notifier.send_slack_message(self.config.slack_trade_channel_id, message, priority=LOW)
+
+                        def on_partial_sell(status):
+                            if status and status.get("status") == "FILLED":
+                                # 현재 단계에서 target_stage 만큼 소진 (매수 체결 콜백과 겹치지 않도록 잠금)
+                                with self.lock:
+                                    buy_sell_status[ticker]["buy_stage"] -= target_stage
+                                    if buy_sell_status[ticker]["buy_stage"] < 0:
+                                        buy_sell_status[ticker]["buy_stage"] = 0
+                            elif is_unconfirmed(status):
+                                self._report_unconfirmed(ticker, f"{target_stage}단계 매도", status)
+
+                        self._submit(
+                            "SPOT", ticker,
+                            lambda callback: self.order.sell(symbol=f"{ticker}USDT", quantity=quantity, callback=callback),
+                            on_partial_sell,
+                        )
                     else:
                         print(f"{ticker} 매도 실패: 최소 주문량({min_qty}) 미만 (수량={quantity})")
 
@@ -131,12 +204,21 @@ class TradeManager:
 
                     if quantity >= min_qty:
                         print(f"{ticker} 전량 매도 진행: 수량 {quantity}")
-                        status = self.order.sell(symbol=f"{ticker}USDT", quantity=quantity)
-                        if status and status.get("status") == "FILLED":
-                            buy_sell_status[ticker]["buy_stage"] = 0
-                            message = f"{ticker} 전량 매도 성공"
-                            print(message)
-                            self.notifier.send_slack_message(self.config.slack_trade_channel_id, message)
+                        def on_full_sell(status):
+                            if status and status.get("status") == "FILLED":
+                                with self.lock:
+                                    buy_sell_status[ticker]["buy_stage"] = 0
+                                message = f"{ticker} 전량 매도 성공"
+                                print(message)
+                                self.notifier.send_slack_message(self.config.slack_trade_channel_id, message)
+                            elif is_unconfirmed(status):
+                                self._report_unconfirmed(ticker, "전량 매도", status)
+
+                        self._submit(
+                            "SPOT", ticker,
+                            lambda callback: self.order.sell(symbol=f"{ticker}USDT", quantity=quantity, callback=callback),
+                            on_full_sell,
+                        )
                     else:
                         message = f"{ticker} 전량 매도 실패: 최소 주문량({min_qty}) 미만 (수량={quantity})"
                         print(message)
@@ -154,6 +236,35 @@ class TradeManager:
         except Exception as e:
             print(f"스팟 거래 처리 중 오류 발생: {e}")
 
+    def _on_spot_buy(self, ticker, stage, signal, buy_sell_status, status):
+        """
+        단계별 매수 주문 종료 시 호출. 체결되면 매수 단계 갱신 및 알림
+        """
+        if status and status.get("status") == "FILLED":
+            print(f"{ticker} {stage}단계 매수 성공")
+            message = (
+                f"매수 진행 신호 발생\n"
+                f"- 매수 비중(단계): {signal.get('weight')}\n"
+                f"- 매수 근거: {signal.get('reason')}\n"
+                f"- 손절 퍼센트: {signal.get('stop_loss')}\n"
+                f"- 익절 퍼센트: {signal.get('take_profit')}"
+            )
+            self.notifier.send_slack_message(self.config.slack_trade_channel_id, message)
+
+            # 스테이지 갱신 (여러 단계 주문이 동시에 체결 확인되므로 더 높은 단계만 반영)
+            with self.lock:
+                if stage > buy_sell_status[ticker]["buy_stage"]:
+                    buy_sell_status[ticker]["buy_stage"] = stage
+
+        elif is_unconfirmed(status):
+            self._report_unconfirmed(ticker, f"{stage}단계 매수", status)
+        else:
+            print(f"{ticker} {stage}단계 매수 실패: 주문 상태 미확인")
+            self.notifier.send_slack_message(
+                self.config.slack_error_channel_id,
+                f"{ticker} {stage}단계 매수 실패: 주문 상태 확인 필요"
+            )
+
     # --------------------------------------------------------
     #                   선물(Futures) 로직
     # --------------------------------------------------------
@@ -169,6 +280,145 @@ class TradeManager:
         truncated = value_dec.quantize(step_dec, rounding=ROUND_DOWN)
         return float(truncated)
 
+    def _open_futures(self, ticker, side, quantity, min_qty, current_price, reason, futures_status, min_notional=0.0):
+        """
+        롱/숏 진입(추가 진입 포함) 주문. side: "LONG" / "SHORT"
+        체결되면 포지션/단계/수량 갱신 및 알림
+        """
+        label = "롱" if side == "LONG" else "숏"
+        if quantity < min_qty:
+            print(f"{ticker} {label} 진입 실패: 최소 주문량({min_qty}) 미만 (계산수량={quantity})")
+            return
+        if quantity * current_price < min_notional:
+            print(f"{ticker} {label} 진입 실패: 최소 주문금액({min_notional}) 미만 (주문금액={quantity * current_price})")
+            return
+
+        def on_open(status):
+            if status and status.get("status") == "FILLED":
+                print(f"{ticker} {label} 진입/추가진입 성공!")
+                message = (
+                    f"[선물] {ticker} {label} 진입 성공\n"
+                    f"- 수량: {quantity}\n"
+                    f"- 현재가: {current_price}\n"
+                    f"- 이유: {reason}"
+                )
+                self.notifier.send_slack_message(self.config.slack_trade_channel_id, message)
+
+                # 체결 시점의 상태 기준으로 갱신 (반대 포지션 청산 직후에도 0단계부터 시작)
+                with self.lock:
+                    futures_status[ticker]["position"] = side
+                    futures_status[ticker]["stage"]    = futures_status[ticker].get("stage", 0) + 1
+                    futures_status[ticker]["quantity"] = futures_status[ticker].get("quantity", 0.0) + quantity
+            elif is_unconfirmed(status):
+                self._report_unconfirmed(ticker, f"선물 {label} 진입", status)
+            else:
+                print(f"{ticker} {label} 진입 실패")
+
+        place = self.order.L_buy if side == "LONG" else self.order.S_buy
+        self._submit(
+            "FUTURES", ticker,
+            lambda callback: place(symbol=f"{ticker}USDT", quantity=quantity, callback=callback),
+            on_open,
+        )
+
+    def _switch_futures(self, ticker, side, min_qty, futures_status, on_closed):
+        """
+        반대 포지션(side)을 전량 청산하고, 체결되면 on_closed() 로 새 포지션 진입
+        """
+        label, new_label = ("숏", "롱") if side == "SHORT" else ("롱", "숏")
+        close_qty = futures_status[ticker].get("quantity", 0.0)
+        if close_qty < min_qty:
+            print(f"{ticker} {label} 포지션 수량({close_qty})이 min_qty({min_qty}) 미만 -> 청산 불가, {new_label} 진입 중단")
+            return
+
+        def on_close(status):
+            if status and status.get("status") == "FILLED":
+                print(f"{ticker} {label} 포지션 청산 성공, {new_label} 전환 진행")
+                with self.lock:
+                    futures_status[ticker]["position"] = None
+                    futures_status[ticker]["stage"]    = 0
+                    futures_status[ticker]["quantity"] = 0
+                # 새 포지션 주문은 OrderTracker 스레드 밖에서 넣음
+                self._submit_later("FUTURES", ticker, on_closed)
+            elif is_unconfirmed(status):
+                # 청산 여부를 모르므로 새 포지션 진입은 하지 않음
+                self._report_unconfirmed(ticker, f"선물 {label} 청산({new_label} 전환)", status)
+            else:
+                print(f"{ticker} {label} 청산 실패 -> {new_label} 진입 중단")
+
+        # 숏 청산 = S_sell, 롱 청산 = L_sell
+        place = self.order.S_sell if side == "SHORT" else self.order.L_sell
+        self._submit(
+            "FUTURES", ticker,
+            lambda callback: place(symbol=f"{ticker}USDT", quantity=close_qty, callback=callback),
+            on_close,
+        )
+
+    def _close_futures(self, ticker, side, weight, min_qty, current_price, reason, futures_status):
+        """
+        롱/숏 포지션 weight 단계만큼 청산 (weight >= 현재 단계면 전량 청산)
+        """
+        label = "롱" if side == "LONG" else "숏"
+        current_stage = futures_status[ticker].get("stage", 0)
+        current_qty   = futures_status[ticker].get("quantity", 0.0)
+
+        # (1) partial or full close
+        #    - 현 스테이지 current_stage가 0~n
+        #    - 들어온 weight만큼만 청산
+        if weight >= current_stage:
+            # 전량 청산
+            close_qty = current_qty
+            final_stage = 0
+        else:
+            # 부분 청산
+            # 단계비율 = weight / current_stage
+            close_ratio = weight / current_stage
+            close_qty = current_qty * close_ratio
+            final_stage = current_stage - weight
+
+        # stepSize 반올림
+        close_qty = self._truncate_to_3decimals(close_qty)
+
+        if close_qty < min_qty:
+            print(f"{ticker} {label} 부분청산 실패: 최소 주문단위({min_qty}) 미만 (close_qty={close_qty})")
+            return
+
+        def on_close(status):
+            if status and status.get("status") == "FILLED":
+                print(f"{ticker} {label} 청산 성공 (수량={close_qty})")
+                message = (
+                    f"[선물] {ticker} {label} 청산(부분) 성공\n"
+                    f"- 청산 수량: {close_qty}\n"
+                    f"- 청산가: {current_price}\n"
+                    f"- 이유: {reason}"
+                )
+                self.notifier.send_slack_message(self.config.slack_trade_channel_id, message)
+
+                # 포지션 정보 갱신
+                with self.lock:
+                    new_qty = futures_status[ticker].get("quantity", 0.0) - close_qty
+                    # 주의: 부동소수점
+                    if new_qty < 1e-12:
+                        new_qty = 0.0
+
+                    futures_status[ticker]["quantity"] = new_qty
+                    futures_status[ticker]["stage"]    = final_stage
+                    if new_qty <= 0:
+                        # 전량 청산됐으면 포지션 해제
+                        futures_status[ticker]["position"] = None
+            elif is_unconfirmed(status):
+                self._report_unconfirmed(ticker, f"선물 {label} 청산", status)
+            else:
+                print(f"{ticker} {label} 청산 실패")
+
+        # 롱 청산 = L_sell, 숏 청산 = S_sell
+        place = self.order.L_sell if side == "LONG" else self.order.S_sell
+        self._submit(
+            "FUTURES", ticker,
+            lambda callback: place(symbol=f"{ticker}USDT", quantity=close_qty, callback=callback),
+            on_close,
+        )
+
     def process_futures_trade(self, ticker, signal, futures_limit_amount, futures_status, symbol_info):
         """
         선물 거래 로직
@@ -178,6 +428,7 @@ class TradeManager:
           - "S_buy"  : 숏 진입(추가 진입 포함)
           - "S_sell" : 숏 청산
           - "Hold"   : 아무 것도 안 함
+        주문은 넣고 바로 반환하며, 포지션 상태는 체결이 확인된 뒤 갱신됨.
         """
         try:
             leverage = self.config.futures_leverage
@@ -188,58 +439,33 @@ class TradeManager:
             reason        = signal.get("reason", "No reason")
 
             current_pos   = futures_status[ticker].get("position")   # "LONG" / "SHORT" / None
-            current_stage = futures_status[ticker].get("stage", 0)
-            current_qty   = futures_status[ticker].get("quantity", 0.0)
 
             step_size     = symbol_info["stepSize"]
             min_qty       = symbol_info["minQty"]
+            min_notional  = symbol_info.get("minNotional", 0.0)
+
+            # 이전 주문의 체결 확인이 끝나기 전에는 같은 코인에 새 주문을 넣지 않음
+            if signal_type in ("L_buy", "L_sell", "S_buy", "S_sell") and self.has_pending_order("FUTURES", ticker):
+                print(f"{ticker}: 체결 확인 중인 주문이 있어 {signal_type} 신호 스킵")
+                return
 
             # --------------------------
             #    롱 진입 (L_buy)
             # --------------------------
             if signal_type == "L_buy":
-                # (1) SHORT 포지션이면 자동 청산 후 롱 전환
-                if current_pos == "SHORT":
-                    print(f"{ticker}: 현재 숏 포지션 -> 자동으로 숏 청산 후 롱 전환 시도")
-                    short_qty = current_qty
-                    if short_qty >= min_qty:
-                        close_status = self.order.S_sell(symbol=f"{ticker}USDT", quantity=short_qty)
-                        if close_status and close_status.get("status") == "FILLED":
-                            print(f"{ticker} 숏 포지션 청산 성공, 롱 전환 진행")
-                            futures_status[ticker]["position"] = None
-                            futures_status[ticker]["stage"]    = 0
-                            futures_status[ticker]["quantity"] = 0
-                        else:
-                            print(f"{ticker} 숏 청산 실패 -> 롱 진입 중단")
-                            return
-                    else:
-                        print(f"{ticker} 숏 포지션 수량({short_qty})이 min_qty({min_qty}) 미만 -> 청산 불가, 롱 진입 중단")
-                        return
-
-                # (2) 현재 포지션이 LONG이면 추가 진입, None이면 신규 진입
+                # 현재 포지션이 LONG이면 추가 진입, None이면 신규 진입
                 raw_quantity = (int(futures_limit_amount.get(ticker, 0)) * leverage * 0.19 * weight) / current_price
                 quantity = self._truncate_to_3decimals(raw_quantity)
 
-                if quantity < min_qty:
-                    print(f"{ticker} 롱 진입 실패: 최소 주문량({min_qty}) 미만 (계산수량={quantity})")
-                    return
+                def open_long():
+                    self._open_futures(ticker, "LONG", quantity, min_qty, current_price, reason, futures_status, min_notional)
 
-                status = self.order.L_buy(symbol=f"{ticker}USDT", quantity=quantity)
-                if status and status.get("status") == "FILLED":
-                    print(f"{ticker} 롱 진입/추가진입 성공!")
-                    message = (
-                        f"[선물] {ticker} 롱 진입 성공\n"
-                        f"- 수량: {quantity}\n"
-                        f"- 현재가: {current_price}\n"
-                        f"- 이유: {reason}"
-                    )
-                    self.notifier.send_slack_message(self.config.slack_trade_channel_id, message)
-
-                    futures_status[ticker]["position"] = "LONG"
-                    futures_status[ticker]["stage"]    = current_stage + 1
-                    futures_status[ticker]["quantity"] = current_qty + quantity
+                # SHORT 포지션이면 자동 청산 후 (체결되면) 롱 전환
+                if current_pos == "SHORT":
+                    print(f"{ticker}: 현재 숏 포지션 -> 자동으로 숏 청산 후 롱 전환 시도")
+                    self._switch_futures(ticker, "SHORT", min_qty, futures_status, open_long)
                 else:
-                    print(f"{ticker} 롱 진입 실패")
+                    open_long()
 
             # --------------------------
             #    롱 청산 (L_sell)
@@ -248,98 +474,25 @@ class TradeManager:
                 if current_pos != "LONG":
                     print(f"{ticker}: 롱 포지션 없음 -> 청산 불가")
                     return
-
-                # (1) partial or full close
-                #    - 현 스테이지 current_stage가 0~n
-                #    - 들어온 weight만큼만 청산
-                if weight >= current_stage:
-                    # 전량 청산
-                    close_qty = current_qty
-                    final_stage = 0
-                else:
-                    # 부분 청산
-                    # 단계비율 = weight / current_stage
-                    close_ratio = weight / current_stage
-                    close_qty = current_qty * close_ratio
-                    final_stage = current_stage - weight
-
-                # stepSize 반올림
-                close_qty = self._truncate_to_3decimals(close_qty)
-
-                if close_qty < min_qty:
-                    print(f"{ticker} 롱 부분청산 실패: 최소 주문단위({min_qty}) 미만 (close_qty={close_qty})")
-                    return
-
-                status = self.order.L_sell(symbol=f"{ticker}USDT", quantity=close_qty)
-                if status and status.get("status") == "FILLED":
-                    print(f"{ticker} 롱 청산 성공 (수량={close_qty})")
-                    message = (
-                        f"[선물] {ticker} 롱 청산(부분) 성공\n"
-                        f"- 청산 수량: {close_qty}\n"
-                        f"- 청산가: {current_price}\n"
-                        f"- 이유: {reason}"
-                    )
-                    self.notifier.send_slack_message(self.config.slack_trade_channel_id, message)
-
-                    # 포지션 정보 갱신
-                    new_qty = current_qty - close_qty
-                    # 주의: 부동소수점
-                    if new_qty < 1e-12:
-                        new_qty = 0.0
-                    
-                    futures_status[ticker]["quantity"] = new_qty
-                    futures_status[ticker]["stage"]    = final_stage
-                    if new_qty <= 0:
-                        # 전량 청산됐으면 포지션 해제
-                        futures_status[ticker]["position"] = None
-                else:
-                    print(f"{ticker} 롱 청산 실패")
+                self._close_futures(ticker, "LONG", weight, min_qty, current_price, reason, futures_status)
 
             # --------------------------
             #    숏 진입 (S_buy)
             # --------------------------
             elif signal_type == "S_buy":
-                # (1) LONG 포지션이면 자동 청산 후 숏 전환
-                if current_pos == "LONG":
-                    print(f"{ticker}: 현재 롱 포지션 -> 자동으로 롱 청산 후 숏 전환 시도")
-                    long_qty = current_qty
-                    if long_qty >= min_qty:
-                        close_status = self.order.L_sell(symbol=f"{ticker}USDT", quantity=long_qty)
-                        if close_status and close_status.get("status") == "FILLED":
-                            print(f"{ticker} 롱 포지션 청산 성공, 숏 전환 진행")
-                            futures_status[ticker]["position"] = None
-                            futures_status[ticker]["stage"]    = 0
-                            futures_status[ticker]["quantity"] = 0
-                        else:
-                            print(f"{ticker} 롱 청산 실패 -> 숏 진입 중단")
-                            return
-                    else:
-                        print(f"{ticker} 롱 포지션 수량({long_qty})이 min_qty({min_qty}) 미만 -> 청산 불가, 숏 진입 중단")
-                        return
-
-                # (2) 현재 포지션이 SHORT면 추가 진입, None이면 신규 진입
+                # 현재 포지션이 SHORT면 추가 진입, None이면 신규 진입
                 raw_quantity = (int(futures_limit_amount.get(ticker, 0)) * leverage * weight * 0.19) / current_price
                 quantity = self._truncate_to_3decimals(raw_quantity)
 
-                if quantity < min_qty:
-                    print(f"{ticker} 숏 진입 실패: 최소 주문량({min_qty}) 미만 (계산수량={quantity})")
-                    return
+                def open_short():
+                    self._open_futures(ticker, "SHORT", quantity, min_qty, current_price, reason, futures_status, min_notional)
 
-                status = self.order.S_buy(symbol=f"{ticker}USDT", quantity=quantity)
-                if status and status.get("status") == "FILLED":
-                    print(f"{ticker} 숏 진입/추가진입 성공!")
-                    message = (
-                        f"[선물] {ticker} 숏 진입 성공\n"
-                        f"- 수량: {quantity}\n"
-                        f"- 현재가: {current_price}\n"
-                        f"- 이유: {reason}"
-                    )
-                    self.notifier.send_slack_message(self.config.slack_trade_channel_id, message)
-                    futures_status[ticker]["position"] = "SHORT"
-                    futures_status[ticker]["stage"]    = current_stage + 1
-                    futures_status[ticker]["quantity"] = current_qty + quantity
+                # LONG 포지션이면 자동 청산 후 (체결되면) 숏 전환
+                if current_pos == "LONG":
+                    print(f"{ticker}: 현재 롱 포지션 -> 자동으로 롱 청산 후 숏 전환 시도")
+                    self._switch_futures(ticker, "LONG", min_qty, futures_status, open_short)
                 else:
-                    print(f"{ticker} 숏 진입 실패")
+                    open_short()
 
             # --------------------------
             #    숏 청산 (S_sell)
@@ -348,45 +501,7 @@ class TradeManager:
                 if current_pos != "SHORT":
                     print(f"{ticker}: 숏 포지션 없음 -> 청산 불가")
                     return
-
-                # 스테이지 계산
-                if weight >= current_stage:
-                    # 전량 청산
-                    close_qty = current_qty
-                    final_stage = 0
-                else:
-                    # 부분 청산
-                    close_ratio = weight / current_stage
-                    close_qty = current_qty * close_ratio
-                    final_stage = current_stage - weight
-
-                close_qty = self._truncate_to_3decimals(close_qty)
-                if close_qty < min_qty:
-                    print(f"{ticker} 숏 부분청산 실패: 최소단위({min_qty}) 미만 (close_qty={close_qty})")
-                    return
-
-                status = self.order.S_sell(symbol=f"{ticker}USDT", quantity=close_qty)
-                if status and status.get("status") == "FILLED":
-                    print(f"{ticker} 숏 청산 성공 (수량={close_qty})")
-                    message = (
-                        f"[선물] {ticker} 숏 청산(부분) 성공\n"
-                        f"- 청산 수량: {close_qty}\n"
-                        f"- 청산가: {current_price}\n"
-                        f"- 이유: {reason}"
-                    )
-                    self.notifier.send_slack_message(self.config.slack_trade_channel_id, message)
-
-                    new_qty = current_qty - close_qty
-                    if new_qty < 1e-12:
-                        new_qty = 0.0
-
-                    futures_status[ticker]["quantity"] = new_qty
-                    futures_status[ticker]["stage"]    = final_stage
-                    if new_qty <= 0:
-                        # 전량 청산
-                        futures_status[ticker]["position"] = None
-                else:
-                    print(f"{ticker} 숏 청산 실패")
+                self._close_futures(ticker, "SHORT", weight, min_qty, current_price, reason, futures_status)
 
             # --------------------------
             #    그 외(Hold 등)
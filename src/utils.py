@@ -1,3 +1,12 @@
+import sys
+import os
+
+# 프로젝트 루트 디렉토리의 절대 경로를 구함
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from src.exchange_info import ExchangeInfoCache
+
 def get_trend_info(df):
     """
     df: trend 칼럼이 있는 데이터프레임 (예: 5분봉 등)
@@ -58,30 +67,95 @@ def get_trend_info(df):
         bars_since_t_minus_1,  # T-1 추세가 몇 봉 유지되었는지
     )
 
-def get_symbol_info(symbol, client):
+def allocate_limits(usdt_balance, coin_values):
+    """
+    코인별 매수 가능 금액 (균등 배분). Notifier.get_limit_amount / futures_get_limit_amount 와 백테스트에서 공통 사용.
+    usdt_balance : USDT 잔액
+    coin_values  : {코인: 보유 자산 가치(USDT 환산)}
+
+    총 자산(USDT + 코인 가치)을 코인 수로 나눈 목표 금액에서 보유 가치를 뺀 값이 한도.
+    목표를 초과 보유한 코인은 0으로 두고, 초과분은 나머지 코인들의 한도에서 똑같이 나눠 차감.
+    """
+    # 1. 코인 개수 및 자산 균등 배분 금액 계산
+    coin_count = len(coin_values)
+    if coin_count == 0:
+        raise ValueError("코인 개수가 0입니다")
+
+    total_asset = usdt_balance + sum(coin_values.values())
+    target_amount_per_coin = total_asset / coin_count
+
+    # 2. 매수 가능 금액 계산
+    limit_amounts = {}
+    negative_sum = 0
+    negative_count = 0
+
+    for symbol, coin_value in coin_values.items():
+        # 목표 금액에서 보유 자산 가치 차감
+        limit_amount = target_amount_per_coin - coin_value
+
+        # 초과 보유 시 0으로 설정하고, 초과분을 누적
+        if limit_amount < 0:
+            negative_sum += abs(limit_amount)
+            negative_count += 1
+            limit_amounts[symbol] = 0
+        else:
+            limit_amounts[symbol] = limit_amount
+
+    # 3. 초과 자산을 다른 코인들에게 분배
+    if negative_count > 0 and coin_count > negative_count:
+        additional_reduction = negative_sum / (coin_count - negative_count)
+        for symbol in limit_amounts:
+            if limit_amounts[symbol] > 0:
+                limit_amounts[symbol] -= additional_reduction
+
+    return limit_amounts
+
+# 시장별 exchangeInfo 캐시 (get_symbol_info 에서 처음 호출될 때 생성)
+exchange_info_cache = None
+
+def get_symbol_info(symbol, client, futures=False, cache=None):
     """
     심볼의 거래 제한 정보를 반환 (stepSize, minQty 포함)
+    exchangeInfo 는 시장별로 한 번만 조회하고 이후에는 캐시(src/exchange_info.py)에서 찾음
+    반환 dict 에는 PRICE_FILTER, MIN_NOTIONAL, MARKET_LOT_SIZE 값(tickSize, minNotional 등)도 포함
+    캐시에 없으면 REST 로 다시 조회하므로(블로킹) 이벤트 루프에서는 asyncio.to_thread 로 호출할 것
     """
+    global exchange_info_cache
     try:
-        exchange_info = client.get_exchange_info()
-        for symbol_info in exchange_info["symbols"]:
-            if symbol_info["symbol"] == symbol:
-                for filter in symbol_info["filters"]:
-                    if filter["filterType"] == "LOT_SIZE":
-                        return {
-                            "stepSize": float(filter["stepSize"]),
-                            "minQty": float(filter["minQty"])
-                        }
-        raise ValueError(f"{symbol}의 거래 제한 정보를 찾을 수 없습니다.")
+        if cache is None:
+            if exchange_info_cache is None or exchange_info_cache.client is not client:
+                exchange_info_cache = ExchangeInfoCache(client)
+            cache = exchange_info_cache
+        symbol_info = cache.get(symbol, futures)
+        if not symbol_info or "stepSize" not in symbol_info:
+            raise ValueError(f"{symbol}의 거래 제한 정보를 찾을 수 없습니다.")
+        return symbol_info
     except Exception as e:
         print(f"거래 제한 정보 조회 중 오류 발생: {e}")
         return {"stepSize": 1.0, "minQty": 0.0}
 
 import math
 
-def MACD_signal(data_dict, future, account_info):
+# MACD_signal 기본 파라미터 (Strategy(params=...) 로 일부만 바꿔서 백테스트/파라미터 스윕 가능)
+MACD_SIGNAL_PARAMS = {
+    "stop_loss": 0.97,         # 진입가 대비 손절 비율
+    "take_profit": 1.1,        # 진입가 대비 익절 비율
+    "profit_sell_rate": 0.5,   # 매수 후 처음 이 수익률(%) 돌파 시 일부 매도
+    "rsi_sell": 70,            # RSI 매도 기준
+    "rsi_strong_sell": 80,     # RSI 강한 매도 기준 (전량)
+    "rsi_sell_profit": 1.0,    # RSI 매도는 이 수익률(%) 이상일 때만
+    "max_loss_rate": -2,       # 이 수익률(%) 아래로 떨어지면 전량 매도
+    "trend_enabled": False,    # 추세 분기(ma_up/ma_down) 사용 여부 (현재 전략은 끔)
+}
+
+def MACD_signal(data_dict, future, account_info, params=None):
     global profit_sell
 
+    if params:
+        params = {**MACD_SIGNAL_PARAMS, **params}
+    else:
+        params = MACD_SIGNAL_PARAMS
+
     entry_price = account_info.get("entry_price", 0)
     holdings = account_info.get("holdings", 0)
 
@@ -115,8 +189,9 @@ def MACD_signal(data_dict, future, account_info):
     else:
         print("SMA20과 SMA60이 일정 거리 이상 떨어짐 (추세 진행 중)")
 
-        ma_up = False
-        ma_down = False
+        if not params["trend_enabled"]:
+            ma_up = False
+            ma_down = False
     
     # 최신 MACD, MACD_signal 값
     macd_curr = float(df['MACD'].iloc[-1])
@@ -127,8 +202,8 @@ def MACD_signal(data_dict, future, account_info):
     rsi_prev = df['rsi'].iloc[-2]
 
     # 기본 손절/익절 설정
-    stop_loss = 0.97
-    take_profit = 1.1
+    stop_loss = params["stop_loss"]
+    take_profit = params["take_profit"]
 
     # 최근 5봉(최신 봉 제외) 값 확보
     if len(df) >= 6:
@@ -145,6 +220,8 @@ def MACD_signal(data_dict, future, account_info):
     # 상승추세: 롱 포지션 관련 신호
     if ma_up:
         # 롱 진입 조건 (매수)
+        buy_weight = 0
+        reason_buy = ""
         if macd_curr > 0:
             buy_weight = 2
             reason_buy += ", MACD 양수 +2"
@@ -213,23 +290,23 @@ def MACD_signal(data_dict, future, account_info):
             signal = "hold"
         reason = "이동평균선 배치가 명확하지 않음"
 
-    # 매수 후 처음 수익률 0.5% 돌파 시 profit_sell 조건 적용 (단, 아직 sell 신호가 발생하지 않은 경우)
-    if profit_rate > 0.5 and not profit_sell:
+    # 매수 후 처음 수익률 profit_sell_rate(기본 0.5%) 돌파 시 profit_sell 조건 적용 (단, 아직 sell 신호가 발생하지 않은 경우)
+    if profit_rate > params["profit_sell_rate"] and not profit_sell:
         signal = "sell"
         weight = 2
-        reason = "수익률 0.5% 돌파"
+        reason = f"수익률 {params['profit_sell_rate']}% 돌파"
         profit_sell = True
 
     # 추가 RSI 조건
-    if rsi_curr > 70 and profit_rate > 1.0:
+    if rsi_curr > params["rsi_sell"] and profit_rate > params["rsi_sell_profit"]:
         signal = "sell" if not future else "L_sell"
         weight = 3
-        reason = "RSI 70 돌파"
-        if rsi_curr > 80:
+        reason = f"RSI {params['rsi_sell']} 돌파"
+        if rsi_curr > params["rsi_strong_sell"]:
             weight += 2
-            reason = "RSI 80 돌파"
+            reason = f"RSI {params['rsi_strong_sell']} 돌파"
 
-    if profit_rate < -2:
+    if profit_rate < params["max_loss_rate"]:
         signal = "sell" if not future else "close"
         weight = 5
 
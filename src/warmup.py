@@ -0,0 +1,125 @@
+"""
+시작 시 초기 데이터 준비 (준비가 끝난 심볼부터 매매 시작).
+
+기존에는 심볼마다 1m/5m/1h 캔들 조회 -> 지표 계산을 하나씩 순서대로 진행해서,
+심볼이 많으면 첫 매매 판단까지 백 번이 넘는 요청을 차례로 기다려야 했음.
+  - 모든 심볼/타임프레임의 캔들 조회를 동시에 보냄. 동시에 나가는 요청 수는 rest_limit,
+    요청 가중치는 rate_limiter 스케줄러가 한도 안에서 조절
+  - 받은 캔들의 지표 계산(Data_Control.init_data)은 계산용 스레드 풀에서 바로 시작
+    (조회용 스레드가 계산 때문에 묶이지 않음)
+  - 저장된 상태(StateStore)가 있는 key 는 빠진 캔들만 이어받음
+  - 거래 규칙(exchangeInfo)도 시장별로 함께 로드
+  - 심볼의 모든 타임프레임이 준비되면 ready 에 추가. 메인 루프는 준비된 심볼만 매매
+  - 실패한 타임프레임만 간격을 늘려 가며 다시 시도 (다른 심볼은 그대로 진행)
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src import metrics
+
+SPOT = "SPOT"
+FUTURES = "FUTURES"
+
+
+class StartupWarmup:
+    def __init__(self, client, data_control, timeframes, rest_limit, state_store=None, exchange_info=None,
+                 compute_workers=None, retry_delay=5, max_retry_delay=60):
+        self.client = client
+        self.data_control = data_control
+        self.timeframes = list(timeframes)
+        self.rest_limit = rest_limit
+        self.state_store = state_store
+        self.exchange_info = exchange_info
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        # 지표 계산은 CPU 작업이므로 코어 수 정도로 제한
+        self.compute_pool = ThreadPoolExecutor(
+            max_workers=compute_workers or min(4, os.cpu_count() or 1), thread_name_prefix="warmup")
+
+        self.frames = {SPOT: {}, FUTURES: {}}   # 시장 -> {심볼: {타임프레임: DataFrame}}
+        self.ready = {SPOT: set(), FUTURES: set()}
+        self.total = 0
+        self.market_tasks = {}                  # futures 여부 -> exchangeInfo 로드 태스크
+        self.started = None
+        self.finished = None
+
+    def is_ready(self, market, symbol):
+        return symbol in self.ready[market]
+
+    @property
+    def done(self):
+        return self.finished is not None
+
+    async def _frame(self, symbol, timeframe, futures):
+        """
+        key 하나의 초기 데이터. 조회는 스레드(rest_limit 안), 지표 계산은 계산용 스레드 풀
+        """
+        key = (symbol, timeframe, futures)
+        if self.state_store is not None and self.state_store.restorable(key):
+            # 빠진 캔들만 받아 새 캔들 몇 개의 지표만 계산하므로 조회 스레드에서 그대로 처리
+            async with self.rest_limit:
+                return await asyncio.to_thread(self.state_store.resume, self.client, symbol, timeframe, futures)
+
+        async with self.rest_limit:
+            data = await asyncio.to_thread(
+                self.data_control.data, self.client, symbol, timeframe, self.data_control.fetch_length, futures
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.compute_pool, self.data_control.init_data, key, data)
+
+    async def _symbol(self, symbol, futures):
+        market = FUTURES if futures else SPOT
+        started = time.monotonic()
+        frames = {}
+        delay = self.retry_delay
+        while True:
+            missing = [timeframe for timeframe in self.timeframes if timeframe not in frames]
+            results = await asyncio.gather(
+                *(self._frame(symbol, timeframe, futures) for timeframe in missing), return_exceptions=True
+            )
+            errors = []
+            for timeframe, result in zip(missing, results):
+                if isinstance(result, Exception):
+                    errors.append(f"{timeframe}: {result}")
+                else:
+                    frames[timeframe] = result
+            if not errors:
+                break
+            print(f"[{market}] {symbol} 초기 데이터 조회 실패, {delay}초 후 다시 시도합니다: {', '.join(errors)}")
+            metrics.STAGE_ERRORS.inc("warmup", market, symbol)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_retry_delay)
+
+        # 주문 수량 계산에 쓰는 거래 규칙이 로드된 뒤에 매매 시작
+        if futures in self.market_tasks:
+            await self.market_tasks[futures]
+
+        self.frames[market][symbol] = frames
+        self.ready[market].add(symbol)
+        elapsed = time.monotonic() - started
+        metrics.STAGE_SECONDS.observe(elapsed, "warmup", market, symbol)
+        count = len(self.ready[SPOT]) + len(self.ready[FUTURES])
+        print(f"[{market}] {symbol} 초기 데이터 준비 완료 ({elapsed:.1f}초, {count}/{self.total})")
+
+    async def run(self, ticker_list, future_ticker_list=()):
+        """
+        모든 심볼의 초기 데이터를 동시에 준비. 메인 루프와 함께 돌도록 태스크로 실행
+        """
+        self.started = time.monotonic()
+        if self.exchange_info is not None:
+            markets = (False, True) if future_ticker_list else (False,)
+            for futures in markets:
+                self.market_tasks[futures] = asyncio.create_task(asyncio.to_thread(self.exchange_info.load, futures))
+
+        jobs = [(symbol, False) for symbol in ticker_list if symbol != "USDT"]
+        jobs += [(symbol, True) for symbol in future_ticker_list if symbol != "USDT"]
+        self.total = len(jobs)
+        try:
+            await asyncio.gather(*(self._symbol(symbol, futures) for symbol, futures in jobs))
+        finally:
+            self.compute_pool.shutdown(wait=False)
+        self.finished = time.monotonic()
+        print(f"초기 데이터 준비 완료: 심볼 {self.total}개, {self.finished - self.started:.1f}초")